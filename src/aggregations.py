@@ -3,52 +3,161 @@ Description: Functions for creating aggregate data
 """
 
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 import numpy as np
 import pandas as pd
 
+from instrumentation import instrument
 
+
+def _aggregate_shard(
+        df: pd.DataFrame,
+        id_cols: list[str],
+        agg_type: str) -> pd.DataFrame:
+    """
+    Group a dataframe (or a shard of one) by the specified dimensions and
+    apply the requested aggregation. Kept at module level so that it can be
+    sent to worker processes.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe to aggregate.
+        id_cols (strList): The columns representing non-aggregated dimensions.
+        agg_type (str): The type of aggregation to perform on the data. Must
+            be one of either 'sum' or 'mean'.
+
+    Returns:
+        Dataframe indexed by the values of 'id_cols'.
+
+    Raises:
+        NONE
+    """
+
+    if agg_type == 'sum':
+        return df.groupby(by=id_cols).sum()
+
+    return df.groupby(by=id_cols).mean()
+
+
+def _partition_dataframe(
+        df: pd.DataFrame,
+        partition_col: str,
+        n_partitions: int) -> list[pd.DataFrame]:
+    """
+    Split a dataframe into disjoint shards by hashing the values of a single
+    column. Every row sharing a value of 'partition_col' ends up in the same
+    shard.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe to partition.
+        partition_col (str): The column to hash when assigning rows to
+            shards.
+        n_partitions (int): The number of shards to create.
+
+    Returns:
+        List of non-empty dataframes.
+
+    Raises:
+        NONE
+    """
+
+    shard_ids = pd.util.hash_pandas_object(
+        df[partition_col], index=False).to_numpy() % n_partitions
+
+    shards = []
+
+    for shard_id in range(n_partitions):
+        shard = df[shard_ids == shard_id]
+        if len(shard) > 0:
+            shards.append(shard)
+
+    return shards
+
+
+@instrument
 def aggregate_data(
         df: pd.DataFrame,
         agg_cols: list[str],
         id_cols: list[str],
-        agg_type: str) -> pd.DataFrame:
+        agg_type: str,
+        n_workers: int = 1) -> pd.DataFrame:
     """
     # Create aggregate ridership data by route, year for each service type
 
+    When 'n_workers' is greater than one, rows are hash-partitioned by the
+    first column of 'id_cols' (e.g. ROUTE) and each shard is aggregated in a
+    separate process. Since a group never spans more than one shard, the
+    aggregated shards are simply concatenated.
+
     Arguments:
         df (DataFrame): Pandas dataframe to aggregate.
         agg_cols (strList): The column to aggregate the data by.
         id_cols (strList): The columns representing non-aggregated dimensions.
         agg_type (str): The type of aggregation to perform on the data. Must
             be one of either 'sum' or 'mean'.
+        n_workers (int): The number of processes to use for the aggregation.
+            Defaults to one which aggregates the data in the current process.
 
     Returns:
         Dataframe that has been aggregated by the specified dimensions.
 
     Raises:
         ValueError if agg_type is not one of 'sum' or 'mean'.
+        ValueError if n_workers is less than one.
     """
 
+    if agg_type not in ['sum', 'mean']:
+        raise ValueError(
+            f"Unsupported agg_type of {agg_type}, please use either 'sum' "
+            f"or 'mean'")
+
+    if n_workers < 1:
+        raise ValueError("The value of 'n_workers' must be at least one")
+
     agg_df = df.copy()
     agg_df = agg_df.drop(columns=agg_cols)
 
-    if agg_type == 'sum':
-        agg_df = agg_df.groupby(by=id_cols).sum()
+    shards = []
+
+    if n_workers > 1:
+        shards = _partition_dataframe(
+            df=agg_df,
+            partition_col=id_cols[0],
+            n_partitions=n_workers)
+
+    if len(shards) > 1:
+        logging.info(
+            f'Aggregating {len(shards)} shards across {n_workers} processes')
+        # Data is aggregated while other stages run on threads, so new
+        # processes are spawned rather than forked from a process that may
+        # hold locks in other threads.
+        with ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=multiprocessing.get_context('spawn')) as executor:
+            agg_shards = list(executor.map(
+                _aggregate_shard,
+                shards,
+                repeat(id_cols),
+                repeat(agg_type)))
 
-    elif agg_type == 'mean':
-        agg_df = agg_df.groupby(by=id_cols).mean()
+        # Shards are disjoint by group so sorting restores the order a single
+        # groupby would have produced.
+        agg_df = pd.concat(agg_shards).sort_index()
 
     else:
-        raise ValueError(
-            f"Unsupported agg_type of {agg_type}, please use either 'sum' "
-            f"or 'mean'")
+        agg_df = _aggregate_shard(
+            df=agg_df,
+            id_cols=id_cols,
+            agg_type=agg_type)
 
     agg_df = agg_df.reset_index()
 
     return agg_df
 
 
+@instrument
 def get_route_count(
         df: pd.DataFrame,
         route_dims: list[str],
@@ -87,3 +196,504 @@ def get_route_count(
     route_count = route_count.drop_duplicates().reset_index(drop=True)
 
     return route_count
+
+
+def _get_group_starts(
+        df: pd.DataFrame,
+        group_cols: list[str]) -> np.ndarray:
+    """
+    Find the position of the first row of the group each row belongs to in a
+    dataframe that has already been sorted by 'group_cols'.
+
+    Arguments:
+        df (DataFrame): Sorted pandas dataframe.
+        group_cols (strList): The columns identifying each group.
+
+    Returns:
+        Array containing, for every row, the position of the first row of its
+        group.
+
+    Raises:
+        NONE
+    """
+
+    row_idx = np.arange(len(df))
+    is_start = np.zeros(len(df), dtype=bool)
+    is_start[:1] = True
+
+    for col in group_cols:
+        col_values = df[col].to_numpy()
+        is_start[1:] |= col_values[1:] != col_values[:-1]
+
+    return np.maximum.accumulate(np.where(is_start, row_idx, 0))
+
+
+@instrument
+def create_rolling_aggregates(
+        df: pd.DataFrame,
+        id_cols: list[str],
+        order_cols: list[str],
+        value_col: str,
+        windows: list[int],
+        agg_type: str,
+        ytd_col: str | None = None,
+        periods_per_year: int = 12) -> pd.DataFrame:
+    """
+    Create trailing-window aggregates (e.g. 3 and 12 month averages) and
+    optionally year-to-date aggregates for each group of rows (e.g. each
+    route and day type).
+
+    Rows are sorted once and every window is computed for all groups at the
+    same time using differences of cumulative sums. Windows are measured in
+    periods (e.g. months) rather than rows, so a window that spans a gap in
+    service only includes the periods with data inside the window. Missing
+    values are left out of every window they fall in.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe to create rolling aggregates for.
+        id_cols (strList): The columns identifying each group (e.g. ROUTE and
+            DAY_TYPE).
+        order_cols (strList): The columns that order rows within each group.
+            Either a year and a period within the year (e.g. YEAR and
+            MONTH, with numeric months) or a single column of consecutive
+            period numbers.
+        value_col (str): The name of the column to aggregate.
+        windows (intList): The sizes of the trailing windows to create in
+            periods.
+        agg_type (str): The type of aggregation to perform on each window.
+            Must be one of either 'sum' or 'mean'.
+        ytd_col (str): The name of the column that resets the year-to-date
+            aggregate (e.g. YEAR). If not specified, no year-to-date aggregate
+            is created. Defaults to None.
+        periods_per_year (int): The number of periods in a year when
+            'order_cols' contains a year and a period within the year.
+            Defaults to 12 (months).
+
+    Returns:
+        Dataframe sorted by 'id_cols' and 'order_cols' containing a column
+        named '{value_col}_{AGG_TYPE}_{window}' for each window and, if
+        'ytd_col' is specified, a column named '{value_col}_YTD_{AGG_TYPE}'.
+        Windows without any values are NaN.
+
+    Raises:
+        ValueError if agg_type is not one of 'sum' or 'mean'.
+        ValueError if any element of windows is less than one.
+        ValueError if order_cols does not contain one or two columns.
+    """
+
+    if agg_type not in ['sum', 'mean']:
+        raise ValueError(
+            f"Unsupported agg_type of {agg_type}, please use either 'sum' "
+            f"or 'mean'")
+
+    if any(window < 1 for window in windows):
+        raise ValueError("Elements of 'windows' must be at least one")
+
+    if len(order_cols) not in [1, 2]:
+        raise ValueError(
+            "'order_cols' must contain a year and a period within the year "
+            "or a single period column")
+
+    rolling_df = df.sort_values(by=id_cols + order_cols, kind='stable')
+    rolling_df = rolling_df.reset_index(drop=True)
+
+    values = rolling_df[value_col].to_numpy(dtype='float64')
+    is_valid = ~np.isnan(values)
+    row_idx = np.arange(len(rolling_df))
+
+    # Cumulative sums and counts of the values that are not missing, with a
+    # leading zero so that the sum of rows i to j (inclusive) is
+    # cum_values[j + 1] - cum_values[i].
+    cum_values = np.concatenate([[0.0], np.nancumsum(values)])
+    cum_counts = np.concatenate([[0], np.cumsum(is_valid)])
+
+    # Number each period so that consecutive periods differ by one (e.g.
+    # YEAR * 12 + MONTH).
+    periods = rolling_df[order_cols[-1]].to_numpy(dtype='int64')
+    if len(order_cols) == 2:
+        periods = periods + (
+            rolling_df[order_cols[0]].to_numpy(dtype='int64')
+            * periods_per_year)
+
+    # Offset the periods of each group so that the periods of every group
+    # are sorted and further apart than the largest window. The first row of
+    # each window can then be found with one binary search over all rows.
+    group_start = _get_group_starts(df=rolling_df, group_cols=id_cols)
+    group_number = np.cumsum(group_start == row_idx) - 1
+
+    if len(periods):
+        periods = periods - periods.min()
+        group_offset = periods.max() + max(windows, default=1) + 1
+        periods = periods + group_number * group_offset
+
+    # Each window is described by the index of its first row.
+    window_starts = {}
+
+    for window in windows:
+        window_starts[f'{value_col}_{agg_type.upper()}_{window}'] = \
+            np.searchsorted(periods, periods - window + 1, side='left')
+
+    if ytd_col is not None:
+        window_starts[f'{value_col}_YTD_{agg_type.upper()}'] = \
+            _get_group_starts(df=rolling_df, group_cols=id_cols + [ytd_col])
+
+    for col, window_start in window_starts.items():
+        window_sum = cum_values[row_idx + 1] - cum_values[window_start]
+        window_count = cum_counts[row_idx + 1] - cum_counts[window_start]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if agg_type == 'mean':
+                window_sum = window_sum / window_count
+            else:
+                window_sum = np.where(window_count > 0, window_sum, np.nan)
+
+        rolling_df[col] = window_sum
+
+    return rolling_df
+
+
+def _get_weighted_quantiles(
+        values: np.ndarray,
+        weights: np.ndarray,
+        quantiles: np.ndarray) -> np.ndarray:
+    """
+    Calculate quantiles of a dataset in which each value is repeated a given
+    number of times without expanding the repeated values. Results match
+    numpy's default (linear) interpolation on the expanded dataset.
+
+    Arguments:
+        values (ndarray): The distinct values of the dataset.
+        weights (ndarray): The number of times each value is repeated.
+        quantiles (ndarray): The quantiles to calculate, between 0 and 1.
+
+    Returns:
+        Array of values at each of the requested quantiles.
+
+    Raises:
+        NONE
+    """
+
+    sort_idx = np.argsort(values, kind='stable')
+    sorted_values = values[sort_idx]
+    cum_weights = np.cumsum(weights[sort_idx])
+
+    # Positions within the expanded (sorted) dataset and the values found
+    # at the positions either side of each quantile.
+    positions = (cum_weights[-1] - 1) * quantiles
+    lower_pos = np.floor(positions)
+    upper_pos = np.minimum(lower_pos + 1, cum_weights[-1] - 1)
+
+    lower = sorted_values[np.searchsorted(cum_weights, lower_pos, 'right')]
+    upper = sorted_values[np.searchsorted(cum_weights, upper_pos, 'right')]
+
+    return lower + (positions - lower_pos) * (upper - lower)
+
+
+@instrument
+def create_tiers(
+        df: pd.DataFrame,
+        id_cols: list[str],
+        value_col: str,
+        tier_col: str,
+        labels: list[str]) -> pd.DataFrame:
+    """
+    Assign each row to an equally sized tier (e.g. low, medium and high
+    ridership) based on the mean of 'value_col' for the group the row belongs
+    to (e.g. each route and day type).
+
+    Tiers are equivalent to running pd.qcut over the group means repeated for
+    every row, but the cut points are calculated from the per-group
+    aggregate and tiers are assigned to rows with a group to tier lookup, so
+    no merge or row level sort is required.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe to assign tiers for.
+        id_cols (strList): The columns identifying each group.
+        value_col (str): The name of the column used to calculate the group
+            means.
+        tier_col (str): The name of the new column that will contain the
+            tiers.
+        labels (strList): The labels of each tier in ascending order. The
+            number of labels determines the number of tiers.
+
+    Returns:
+        Dataframe containing an ordered categorical column of tiers.
+
+    Raises:
+        ValueError if there is already a column named 'tier_col' in 'df'.
+        ValueError if the tier cut points are not unique.
+    """
+
+    if tier_col in df.columns:
+        raise ValueError("tier_col should be a new column")
+
+    grouped = df.groupby(by=id_cols, sort=False)[value_col]
+    group_codes = grouped.ngroup().to_numpy(dtype='float64')
+    group_means = grouped.mean().to_numpy()
+    group_sizes = grouped.size().to_numpy()
+
+    cut_points = _get_weighted_quantiles(
+        values=group_means,
+        weights=group_sizes,
+        quantiles=np.linspace(0, 1, len(labels) + 1))
+
+    if len(np.unique(cut_points)) != len(cut_points):
+        raise ValueError(
+            f"Tier cut points {cut_points} are not unique, please use fewer "
+            f"labels")
+
+    logging.info(f'Assigning {len(group_means)} groups to {len(labels)} tiers')
+    group_tiers = pd.cut(
+        x=group_means,
+        bins=cut_points,
+        labels=False,
+        include_lowest=True)
+
+    # Rows belonging to groups with missing identifiers have no group code
+    # (NaN) and remain without a tier.
+    has_group = ~np.isnan(group_codes)
+    row_tiers = np.full(len(group_codes), np.nan)
+    row_tiers[has_group] = np.asarray(group_tiers, dtype='float64')[
+        group_codes[has_group].astype(int)]
+
+    tier_df = df.copy()
+    tier_df[tier_col] = pd.Categorical.from_codes(
+        codes=np.nan_to_num(row_tiers, nan=-1).astype(int),
+        categories=labels,
+        ordered=True)
+
+    return tier_df
+
+
+@instrument
+def create_grouping_sets(
+        df: pd.DataFrame,
+        agg_cols: list[str],
+        grouping_sets: list[list[str]],
+        agg_type: str,
+        level_col: str = 'LEVEL') -> pd.DataFrame:
+    """
+    Aggregate data for several sets of dimensions at once (e.g. by route,
+    year and day type, by year and day type, by year and a grand total).
+
+    The raw data is only grouped once by the finest set of dimensions (the
+    union of all grouping sets). Every other grouping set is derived from
+    that aggregate, which is much smaller than the raw data. Sums and counts
+    are carried through each level so means remain exact.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe to aggregate.
+        agg_cols (strList): The columns to aggregate the data by (i.e. the
+            columns to remove before aggregating).
+        grouping_sets (list): List of lists of columns to aggregate by. An
+            empty list creates a grand total.
+        agg_type (str): The type of aggregation to perform on the data. Must
+            be one of either 'sum' or 'mean'.
+        level_col (str): The name of the column identifying the grouping set
+            each row belongs to. Values are the grouping set columns joined
+            with ', ' or 'TOTAL' for the grand total. Defaults to 'LEVEL'.
+
+    Returns:
+        Dataframe containing every grouping set. Dimensions that are not part
+        of a row's grouping set are left empty.
+
+    Raises:
+        ValueError if agg_type is not one of 'sum' or 'mean'.
+        ValueError if grouping_sets is empty.
+    """
+
+    if agg_type not in ['sum', 'mean']:
+        raise ValueError(
+            f"Unsupported agg_type of {agg_type}, please use either 'sum' "
+            f"or 'mean'")
+
+    if len(grouping_sets) == 0:
+        raise ValueError("At least one grouping set must be specified")
+
+    # The finest level contains every dimension used by any grouping set.
+    id_cols = list(dict.fromkeys(
+        col for grouping_set in grouping_sets for col in grouping_set))
+    value_cols = [col for col in df.columns
+                  if col not in agg_cols and col not in id_cols]
+
+    logging.info(f'Aggregating data by {id_cols}')
+    if id_cols:
+        finest = df.groupby(by=id_cols)[value_cols].agg(['sum', 'count'])
+    else:
+        # Only a grand total was requested, so the whole dataframe is one
+        # group.
+        finest = df[value_cols].agg(['sum', 'count']).unstack().to_frame().T
+
+    levels = []
+
+    for grouping_set in grouping_sets:
+        if len(grouping_set) == 0:
+            level = finest.sum().to_frame().T
+        else:
+            level = finest.groupby(level=grouping_set).sum()
+
+        if agg_type == 'mean':
+            level_values = level.xs('sum', axis=1, level=1) / \
+                level.xs('count', axis=1, level=1)
+        else:
+            level_values = level.xs('sum', axis=1, level=1)
+
+        if len(grouping_set) == 0:
+            level_values = level_values.reset_index(drop=True)
+        else:
+            level_values = level_values.reset_index()
+
+        level_values[level_col] = ', '.join(grouping_set) or 'TOTAL'
+        levels.append(level_values)
+
+    rollup_df = pd.concat(levels, ignore_index=True)
+    rollup_df = rollup_df[id_cols + value_cols + [level_col]]
+
+    # Restore integer dimensions (e.g. YEAR) that were converted to floats
+    # to make room for empty values.
+    for col in id_cols:
+        if pd.api.types.is_integer_dtype(df[col]):
+            rollup_df[col] = rollup_df[col].astype('Int64')
+
+    return rollup_df
+
+
+@instrument
+def create_rollup(
+        df: pd.DataFrame,
+        agg_cols: list[str],
+        id_cols: list[str],
+        agg_type: str,
+        level_col: str = 'LEVEL') -> pd.DataFrame:
+    """
+    Aggregate data for each level of a hierarchy of dimensions, from the
+    finest level down to a grand total, in a single pass over the raw data.
+    For example, 'id_cols' of ['YEAR', 'DAY_TYPE', 'ROUTE'] creates
+    aggregates by (YEAR, DAY_TYPE, ROUTE), (YEAR, DAY_TYPE), (YEAR) and a
+    grand total.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe to aggregate.
+        agg_cols (strList): The columns to aggregate the data by (i.e. the
+            columns to remove before aggregating).
+        id_cols (strList): The columns representing the hierarchy of
+            non-aggregated dimensions, ordered from coarsest to finest.
+        agg_type (str): The type of aggregation to perform on the data. Must
+            be one of either 'sum' or 'mean'.
+        level_col (str): The name of the column identifying the level each
+            row belongs to. Defaults to 'LEVEL'.
+
+    Returns:
+        Dataframe containing every level of the hierarchy.
+
+    Raises:
+        ValueError if agg_type is not one of 'sum' or 'mean'.
+    """
+
+    grouping_sets = [id_cols[:i] for i in range(len(id_cols), -1, -1)]
+
+    rollup_df = create_grouping_sets(
+        df=df,
+        agg_cols=agg_cols,
+        grouping_sets=grouping_sets,
+        agg_type=agg_type,
+        level_col=level_col)
+
+    return rollup_df
+
+
+@instrument
+def create_recovery_ratios(
+        df: pd.DataFrame,
+        id_cols: list[str],
+        value_col: str,
+        year_col: str = 'YEAR',
+        year_pairs: list[tuple[int, int]] | None = None,
+        ratio_col: str = 'PERCENT_RECOVERED') -> pd.DataFrame:
+    """
+    Calculate the percent of a value in a baseline year that was recovered in
+    a comparison year (e.g. ridership in 2023 as a percent of ridership in
+    2019) for each route (or route and day type) and pair of years.
+
+    The data is pivoted once into a matrix with one row per route and one
+    column per year, so every pair of years is calculated by dividing two
+    columns of the matrix instead of filtering and merging the data again.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe of yearly values (e.g. ridership by
+            route, year and day type) with one row for each combination of
+            'id_cols' and 'year_col'.
+        id_cols (strList): The columns identifying each route.
+        value_col (str): The name of the column containing the values to
+            compare.
+        year_col (str): The name of the column containing years. Defaults to
+            'YEAR'.
+        year_pairs (list): List of (baseline year, comparison year) tuples.
+            If not specified, every pair of years in the data with the
+            baseline before the comparison year is calculated. Defaults to
+            None.
+        ratio_col (str): The name of the column that will contain the percent
+            recovered. Defaults to 'PERCENT_RECOVERED'.
+
+    Returns:
+        Dataframe containing the values of 'id_cols', BASELINE_YEAR,
+        COMPARISON_YEAR and 'ratio_col' for each route and pair of years.
+        Rows are ordered by pair of years, then by route. Routes without a
+        value in both years of a pair are left out of that pair, while
+        routes with a baseline value of 0 are kept with a NaN (0 / 0) or
+        infinite ratio.
+
+    Raises:
+        ValueError if 'df' contains more than one row for a route and year.
+        ValueError if a year in 'year_pairs' is not in the data.
+    """
+
+    if df.duplicated(subset=id_cols + [year_col]).any():
+        raise ValueError(
+            f"The data should contain one row for each combination of "
+            f"{id_cols + [year_col]}")
+
+    year_matrix = df.set_index(id_cols + [year_col])[value_col]
+    year_matrix = year_matrix.unstack(year_col)
+    years = year_matrix.columns.to_list()
+
+    if year_pairs is None:
+        year_pairs = [(baseline, comparison)
+                      for i, baseline in enumerate(years)
+                      for comparison in years[i + 1:]]
+
+    missing_years = sorted({year for year_pair in year_pairs
+                            for year in year_pair if year not in years})
+    if missing_years:
+        raise ValueError(f"The years {missing_years} are not in the data")
+
+    baseline_idx = np.array([years.index(baseline)
+                             for baseline, _ in year_pairs], dtype=int)
+    comparison_idx = np.array([years.index(comparison)
+                               for _, comparison in year_pairs], dtype=int)
+
+    values = year_matrix.to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = values[:, comparison_idx] / values[:, baseline_idx] * 100
+    has_values = (~np.isnan(values[:, comparison_idx])
+                  & ~np.isnan(values[:, baseline_idx]))
+
+    # Flatten column by column so that rows are ordered by pair of years.
+    n_routes = len(year_matrix)
+    route_idx = np.tile(np.arange(n_routes), len(year_pairs))
+    pair_idx = np.repeat(np.arange(len(year_pairs)), n_routes)
+
+    recovery_df = year_matrix.index.to_frame(index=False).iloc[route_idx]
+    recovery_df = recovery_df.reset_index(drop=True)
+    recovery_df['BASELINE_YEAR'] = np.array(
+        [baseline for baseline, _ in year_pairs], dtype=int)[pair_idx]
+    recovery_df['COMPARISON_YEAR'] = np.array(
+        [comparison for _, comparison in year_pairs], dtype=int)[pair_idx]
+    recovery_df[ratio_col] = ratios.ravel(order='F')
+
+    # Only leave out routes that are missing a year, so that routes with a
+    # baseline of 0 keep their NaN (0 / 0) or infinite ratio.
+    recovery_df = recovery_df[has_values.ravel(order='F')]
+    recovery_df = recovery_df.reset_index(drop=True)
+
+    return recovery_df
@@ -0,0 +1,1614 @@
+"""
+Description: Stages of the transportation data analysis. Each stage prepares
+data for or creates one family of visualizations.
+"""
+
+import logging
+import re
+
+import numpy as np
+import pandas as pd
+
+from aggregations import (aggregate_data,
+                          create_recovery_ratios,
+                          create_tiers)
+from constants import (bus_data_day_types,
+                       chart_family_stages,
+                       data_file_names,
+                       shared_data_file_names,
+                       viz_file_names,
+                       AnalysisConfig,
+                       BusDataArguments,
+                       BarChartArguments,
+                       BumpChartArguments,
+                       LineChartArguments,
+                       HeatmapArguments,
+                       RouteCountArguments,
+                       RendererArguments,
+                       RidershipRecoveryArguments)
+from data_processing import (change_column_datatype,
+                             create_facet_pages,
+                             create_rankings,
+                             is_selected_data,
+                             select_chart_data,
+                             split_df,
+                             subset_dataframes_by_value)
+from file_io import (create_absolute_file_paths,
+                     create_page_file_paths,
+                     find_output_file_path,
+                     save_page_index)
+from pipeline import (Stage, run_stages, select_stages)
+from rendering import (configure_chart_renderer, render_charts)
+from route_lifecycle import (count_active_routes,
+                             create_route_lifecycle_index)
+from visualizations import (create_areachart,
+                            create_barchart,
+                            create_bumpchart,
+                            create_dashboard,
+                            create_heatmap,
+                            create_linechart,
+                            create_shared_dataset)
+
+
+def load_bus_data(bus_data_path: str) -> dict:
+    """
+    Load bus ridership data.
+
+    Arguments:
+        bus_data_path (str): The absolute file path to the bus data being
+            analyzed.
+
+    Returns:
+        Dictionary containing:
+            - raw_bus_data: Dataframe of bus ridership data.
+
+    Raises:
+        NONE
+    """
+
+    logging.info("Loading bus data")
+    cta_bus_data = pd.read_csv(bus_data_path, encoding='utf-8')
+
+    return {'raw_bus_data': cta_bus_data}
+
+
+def prep_bus_data(raw_bus_data: pd.DataFrame) -> dict:
+    """
+    Remove incomplete years from bus ridership data.
+
+    Arguments:
+        raw_bus_data (DataFrame): Dataframe of bus ridership data with
+            numeric months.
+
+    Returns:
+        Dictionary containing:
+            - bus_data: Dataframe of bus ridership data with numeric months.
+
+    Raises:
+        NONE
+    """
+
+    # Remove 2024 data since it is currently only for a few months
+    cta_bus_data = subset_dataframes_by_value(
+        dfs=[raw_bus_data],
+        operator=['<'],
+        target_col=['YEAR'],
+        filter_val=[2024])
+
+    return {'bus_data': cta_bus_data}
+
+
+def prep_route_index(bus_data: pd.DataFrame) -> dict:
+    """
+    Index the months in which each route was in service. This must be
+    created while months are still numeric.
+
+    Arguments:
+        bus_data (DataFrame): Dataframe of bus ridership data.
+
+    Returns:
+        Dictionary containing:
+            - route_index: Dataframe of spans of service for each route and
+                day type.
+
+    Raises:
+        NONE
+    """
+
+    route_index = create_route_lifecycle_index(
+        df=bus_data,
+        id_cols=['ROUTE', 'DAY_TYPE'])
+
+    return {'route_index': route_index}
+
+
+def prep_heatmap_data(
+        bus_data: pd.DataFrame,
+        bus_data_args: BusDataArguments,
+        day_types: list[str] | None = None,
+        periods: list[str] | None = None) -> dict:
+    """
+    Create subsets of ridership by month and year for each ridership tier,
+    day type and period. Ridership tiers are not created if none of the
+    heatmaps match the selected day types and periods.
+
+    Arguments:
+        bus_data (DataFrame): Dataframe of bus ridership data.
+        bus_data_args (BusDataArguments): Settings for the bus data.
+        day_types (strList): The day types heatmaps are created for. If not
+            specified, heatmaps are created for all day types. Defaults to
+            None.
+        periods (strList): The periods heatmaps are created for (e.g.
+            '2010_2023'). If not specified, heatmaps are created for all
+            periods. Defaults to None.
+
+    Returns:
+        Dictionary containing:
+            - heatmap_dfs: List of dataframes, one for each heatmap, or an
+                empty list if no heatmap is selected.
+            - tiered_bus_data: Dataframe of the bus data with month names and
+                the ridership tier of each route and day type, or None if no
+                heatmap is selected.
+
+    Raises:
+        NONE
+    """
+
+    # Each heatmap shows one day type for all years, the years until 2009 or
+    # the years from 2010, so the day types and years of the bus data are
+    # enough to tell whether any heatmap would be selected.
+    if day_types or periods:
+        day_years = bus_data[['DAY_TYPE', 'YEAR']].drop_duplicates()
+        day_year_dfs = list(split_df(df=day_years,
+                                     split_col='DAY_TYPE').values())
+        day_year_dfs += ([df[df['YEAR'] <= 2009] for df in day_year_dfs]
+                         + [df[df['YEAR'] >= 2010] for df in day_year_dfs])
+
+        if not any(is_selected_data(df=df,
+                                    day_types=day_types,
+                                    periods=periods)
+                   for df in day_year_dfs):
+            logging.info(
+                "No heatmaps match the selected day types and periods")
+            return {'heatmap_dfs': [], 'tiered_bus_data': None}
+
+    cta_bus_data = bus_data.copy()
+
+    # Change values in the month column so that they represent the actual
+    # names of each month instead of the numerical representation.
+    cta_bus_data['MONTH'] = cta_bus_data['MONTH'].replace(
+        bus_data_args.alpha_to_numeric_months)
+
+    # Create tiers for binning heatmaps:
+    # 1. Assign each route to one of three tiers (bins) for low, medium and
+    # high ridership using the mean ridership of each route.
+    # 2. Split data by ridership tiers.
+    # 3. Split data by day type.
+    logging.info("Subsetting data")
+
+    # 1. Assign each route to one of three tiers (bins) for low, medium and
+    # high ridership using the mean ridership of each route.
+    hm_rmy_data = create_tiers(
+        df=cta_bus_data,
+        id_cols=['ROUTE', 'DAY_TYPE'],
+        value_col='AVG_RIDES',
+        tier_col='RIDERSHIP_TIER',
+        labels=['low', 'medium', 'high'])
+
+    # 2. Split data by ridership tiers.
+    hm_rmy_data_tiers = split_df(df=hm_rmy_data, split_col='RIDERSHIP_TIER')
+    hm_rmy_data_tiers = list(hm_rmy_data_tiers.values())
+
+    # 3. Split data by day type.
+    hm_rmy_1999_2023 = []
+
+    for tier in hm_rmy_data_tiers:
+        tdt_split = split_df(df=tier, split_col='DAY_TYPE')
+        tdt_split = list(tdt_split.values())
+        hm_rmy_1999_2023 += tdt_split
+
+    # Create subsets for weekday, saturday and sunday - holiday ridership for
+    # the years 1999 - 2009.
+    hm_rmy_1999_2009 = subset_dataframes_by_value(
+        dfs=hm_rmy_1999_2023,
+        operator=['<='],
+        target_col=['YEAR'],
+        filter_val=[2009])
+
+    # Create subsets for weekday, saturday and sunday - holiday ridership for
+    # the years 2010 - 2023.
+    hm_rmy_2010_2023 = subset_dataframes_by_value(
+        dfs=hm_rmy_1999_2023,
+        operator=['>='],
+        target_col=['YEAR'],
+        filter_val=[2010])
+
+    # Create list of heatmap dataframes
+    hm_dfs = hm_rmy_1999_2023 + hm_rmy_1999_2009 + hm_rmy_2010_2023
+
+    return {'heatmap_dfs': hm_dfs, 'tiered_bus_data': hm_rmy_data}
+
+
+def prep_yearly_data(
+        bus_data: pd.DataFrame,
+        agg_workers: int) -> dict:
+    """
+    Create aggregate ridership data by route, year for each service type.
+
+    Arguments:
+        bus_data (DataFrame): Dataframe of bus ridership data.
+        agg_workers (int): The number of processes used to aggregate the bus
+            data.
+
+    Returns:
+        Dictionary containing:
+            - agg_year: Dataframe of ridership by route, year and day type.
+            - agg_year_dfs: List of dataframes of ridership by route and year
+                for each day type.
+
+    Raises:
+        NONE
+    """
+
+    agg_year = aggregate_data(
+        df=bus_data,
+        agg_cols=['MONTH'],
+        id_cols=['ROUTE', 'YEAR', 'DAY_TYPE'],
+        agg_type='sum',
+        n_workers=agg_workers)
+
+    # Create subsets for weekday, saturday and sunday - holiday ridership for
+    # the years 1999 - 2023.
+    agg_year_dfs = split_df(df=agg_year, split_col='DAY_TYPE')
+    agg_year_dfs = list(agg_year_dfs.values())
+
+    return {'agg_year': agg_year, 'agg_year_dfs': agg_year_dfs}
+
+
+def prep_barchart_data(agg_year_dfs: list[pd.DataFrame]) -> dict:
+    """
+    Create subsets of yearly ridership for each day type and period.
+
+    Arguments:
+        agg_year_dfs (DataFrameList): List of dataframes of ridership by
+            route and year for each day type.
+
+    Returns:
+        Dictionary containing:
+            - barchart_dfs: List of dataframes, one for each bar chart.
+
+    Raises:
+        NONE
+    """
+
+    # Create subsets for weekday, saturday and sunday - holiday ridership for
+    # the years 1999 - 2009.
+    agg_year_dfs_1999_2009 = subset_dataframes_by_value(
+        dfs=agg_year_dfs,
+        operator=['<'],
+        target_col=['YEAR'],
+        filter_val=[2010])
+
+    # Create subsets for weekday, saturday and sunday - holiday ridership for
+    # the years 2010 - 2019.
+    agg_year_dfs_2010_2019 = subset_dataframes_by_value(
+        dfs=agg_year_dfs,
+        operator=['>', '<'],
+        target_col=['YEAR', 'YEAR'],
+        filter_val=[2009, 2020])
+
+    # Create subsets for weekday, saturday and sunday - holiday ridership for
+    # the years 2020 - 2023.
+    agg_year_dfs_2020_2023 = subset_dataframes_by_value(
+        dfs=agg_year_dfs,
+        operator=['>'],
+        target_col=['YEAR'],
+        filter_val=[2019])
+
+    # Change values in the "YEAR" column from integers to strings to improve
+    # plot readability for barcharts representing more than one year of data.
+    # Please note that this must be executed after subsetting each dataframe
+    # by the relevant years to avoid raising a TypeError.
+    ts_bc_dfs = agg_year_dfs + agg_year_dfs_1999_2009 + agg_year_dfs_2010_2019 + agg_year_dfs_2020_2023
+    ts_bc_dfs = change_column_datatype(
+        df_list=ts_bc_dfs,
+        col='YEAR',
+        datatype='str')
+
+    return {'barchart_dfs': ts_bc_dfs}
+
+
+def prep_linechart_data(
+        agg_year_dfs: list[pd.DataFrame],
+        rrtsa_args: LineChartArguments) -> dict:
+    """
+    Rank routes by ridership for each year and day type.
+
+    Arguments:
+        agg_year_dfs (DataFrameList): List of dataframes of ridership by
+            route and year for each day type.
+        rrtsa_args (LineChartArguments): Settings for the line charts.
+
+    Returns:
+        Dictionary containing:
+            - linechart_dfs: List of dataframes, one for each line chart.
+
+    Raises:
+        NONE
+    """
+
+    # Add a rank column based off of ridership.
+    ts_dfs = []
+
+    for df in agg_year_dfs:
+        ts_rankings = create_rankings(
+            df=df,
+            value_col=rrtsa_args.value_col,
+            rank_col=rrtsa_args.rank_col,
+            group_col=rrtsa_args.group_col,
+            num_rankings=rrtsa_args.num_rankings)
+
+        ts_dfs.append(ts_rankings)
+
+    return {'linechart_dfs': ts_dfs}
+
+
+def prep_bumpchart_data(
+        agg_year_dfs: list[pd.DataFrame],
+        linechart_dfs: list[pd.DataFrame],
+        rrtsa_args: LineChartArguments,
+        bumpchart_args: BumpChartArguments) -> dict:
+    """
+    Rank routes by ridership for each year and day type for plotting as bump
+    charts. If the bump charts rank routes the same way as the line charts,
+    the rankings of the line charts are reused instead of being created
+    again.
+
+    Arguments:
+        agg_year_dfs (DataFrameList): List of dataframes of ridership by
+            route and year for each day type.
+        linechart_dfs (DataFrameList): List of dataframes of routes ranked
+            by ridership for each line chart.
+        rrtsa_args (LineChartArguments): Settings for the line charts.
+        bumpchart_args (BumpChartArguments): Settings for the bump charts.
+
+    Returns:
+        Dictionary containing:
+            - bumpchart_dfs: List of dataframes, one for each bump chart.
+
+    Raises:
+        NONE
+    """
+
+    ranking_settings = ['value_col', 'rank_col', 'group_col', 'num_rankings']
+
+    if all(getattr(bumpchart_args, setting) == getattr(rrtsa_args, setting)
+           for setting in ranking_settings):
+        ranked_dfs = linechart_dfs
+    else:
+        ranked_dfs = [
+            create_rankings(
+                df=df,
+                value_col=bumpchart_args.value_col,
+                rank_col=bumpchart_args.rank_col,
+                group_col=bumpchart_args.group_col,
+                num_rankings=bumpchart_args.num_rankings)
+            for df in agg_year_dfs]
+
+    # Change values in the "YEAR" column from integers to strings to improve
+    # plot readability for bump charts representing more than one year of
+    # data. Please note that this must be executed after subsetting each
+    # dataframe by the relevant years to avoid raising a TypeError.
+    ts_bpc_dfs = change_column_datatype(
+        df_list=ranked_dfs,
+        col='YEAR',
+        datatype='str')
+
+    return {'bumpchart_dfs': ts_bpc_dfs}
+
+
+def prep_recovery_data(
+        agg_year: pd.DataFrame,
+        ridership_recovery_args: RidershipRecoveryArguments) -> dict:
+    """
+    Create the percent of ridership recovered between two years (e.g. 2019
+    and 2023) for each route and day type.
+
+    Arguments:
+        agg_year (DataFrame): Dataframe of ridership by route, year and day
+            type.
+        ridership_recovery_args (RidershipRecoveryArguments): Settings for
+            the ridership recovery bar charts.
+
+    Returns:
+        Dictionary containing:
+            - recovery_dfs: List of dataframes, one for each day type.
+
+    Raises:
+        NONE
+    """
+
+    recovery_ratio_2019_2023 = create_recovery_ratios(
+        df=agg_year,
+        id_cols=['ROUTE', 'DAY_TYPE'],
+        value_col='AVG_RIDES',
+        year_pairs=[(ridership_recovery_args.baseline_year,
+                     ridership_recovery_args.comparison_year)])
+    recovery_ratio_2019_2023 = recovery_ratio_2019_2023.drop(
+        labels=['BASELINE_YEAR', 'COMPARISON_YEAR'],
+        axis=1)
+
+    # Create subsets for weekday, saturday and sunday - holiday ridership for
+    # the years 1999 - 2023.
+    rr_2019_2023_dfs = split_df(
+        df=recovery_ratio_2019_2023,
+        split_col='DAY_TYPE')
+    rr_2019_2023_dfs = list(rr_2019_2023_dfs.values())
+
+    return {'recovery_dfs': rr_2019_2023_dfs}
+
+
+def prep_route_count_data(
+        route_index: pd.DataFrame,
+        route_count_args: RouteCountArguments) -> dict:
+    """
+    Create year over year data for the change in the number of bus routes.
+
+    Arguments:
+        route_index (DataFrame): Dataframe of spans of service for each
+            route.
+        route_count_args (RouteCountArguments): Settings for the route count
+            area chart.
+
+    Returns:
+        Dictionary containing:
+            - route_count_df: Dataframe of the number of routes in service
+                each year.
+
+    Raises:
+        NONE
+    """
+
+    route_counts = count_active_routes(
+        route_index=route_index,
+        route_col='ROUTE',
+        count_col=route_count_args.count_col,
+        year_col=route_count_args.count_dim)
+
+    route_counts = route_counts.sort_values(by='YEAR', ascending=True)
+    route_counts['YOY'] = route_counts['COUNT'].diff()
+    route_counts = route_counts.reset_index(drop=True)
+    year_start = route_counts['YEAR'][0]
+    year_end = route_counts['YEAR'][len(route_counts['YEAR']) - 1]
+
+    route_yoy = route_counts.copy()
+    route_yoy.loc[route_yoy['YEAR'] == year_start, 'YOY'] = \
+        route_yoy['COUNT'].loc[route_yoy['YEAR'] == year_start]
+
+    route_yoy.loc[route_yoy['YEAR'] == year_end, 'YOY'] = \
+        route_yoy['COUNT'].loc[route_yoy['YEAR'] == year_end]
+
+    # Change values in the "YEAR" column from integers to strings to improve
+    # plot readability for bump charts representing more than one year of
+    # data. Please note that this must be executed after subsetting each
+    # dataframe by the relevant years to avoid raising a TypeError.
+    route_yoy = change_column_datatype(
+        df_list=[route_yoy],
+        col='YEAR',
+        datatype='str')
+
+    return {'route_count_df': route_yoy}
+
+
+def _select_chart_outputs(
+        dfs: list[pd.DataFrame],
+        file_paths: list[str],
+        label_cols: list[str],
+        day_types: list[str] | None = None,
+        periods: list[str] | None = None,
+        years: list[int] | None = None) -> list[tuple[pd.DataFrame, str]]:
+    """
+    Select the charts of a family whose data matches a selection of day types
+    and periods and find the output file of each chart from its data.
+
+    The output file of a chart is the file whose name contains the values of
+    'label_cols' in its data (e.g. its day type). Files whose names contain a
+    period (e.g. '1999_2009') list one period after another in the same
+    order as the dataframes, so the period of each chart is the period of
+    its position. Charts whose data does not contain a single value of each
+    label column (e.g. because they are empty) keep the file at their
+    position.
+
+    Arguments:
+        dfs (DataFrameList): List of dataframes, one for each chart.
+        file_paths (strList): The file paths of the charts of the family.
+        label_cols (strList): The columns whose values are part of the file
+            name of each chart (e.g. 'DAY_TYPE').
+        day_types (strList): The day types to select, as in
+            is_selected_data. Defaults to None.
+        periods (strList): The periods to select, as in is_selected_data.
+            Defaults to None.
+        years (intList): The years every chart shows, for charts whose data
+            does not contain them. Defaults to None.
+
+    Returns:
+        List of tuples of the dataframe and file path of each selected
+        chart.
+
+    Raises:
+        ValueError if no file name matches the data of a chart.
+    """
+
+    file_periods = list(dict.fromkeys(
+        period for file_path in file_paths
+        for period in re.findall(r'\d{4}_\d{4}', file_path.split('/')[-1])))
+    charts_per_period = max(len(dfs) // max(len(file_periods), 1), 1)
+
+    selected_outputs = []
+
+    for position, (df, file_path) in enumerate(zip(dfs, file_paths)):
+        if not is_selected_data(df=df,
+                                day_types=day_types,
+                                periods=periods,
+                                years=years):
+            continue
+
+        labels = []
+        for label_col in label_cols:
+            label_values = df[label_col].dropna().unique()
+            if len(label_values) == 1:
+                labels.append(str(label_values[0]))
+
+        if len(labels) == len(label_cols):
+            if file_periods:
+                labels.append(file_periods[min(position // charts_per_period,
+                                               len(file_periods) - 1)])
+            file_path = find_output_file_path(file_paths=file_paths,
+                                              labels=labels)
+
+        selected_outputs.append((df, file_path))
+
+    return selected_outputs
+
+
+def _share_chart_data(
+        chart_kwargs: list[dict],
+        columns: list[str],
+        subset_cols: list[str],
+        output_path: str,
+        sum_col: str | None = None) -> list[str]:
+    """
+    Save the data of a family of charts as one shared data file and point
+    the keyword arguments of each chart at its subset of the file instead of
+    its dataframe.
+
+    Arguments:
+        chart_kwargs (dictList): Keyword arguments of each chart. Updated in
+            place.
+        columns (strList): The columns encoded by the charts.
+        subset_cols (strList): The columns whose values distinguish the data
+            of each chart.
+        output_path (str): The absolute file path to save the shared data
+            file to.
+        sum_col (str): The name of the column to sum across rows that are
+            stacked into one mark, as in select_chart_data. Defaults to None.
+
+    Returns:
+        List containing the file path of the shared data file, or an empty
+        list if there are no charts.
+
+    Raises:
+        NONE
+    """
+
+    if not chart_kwargs:
+        return []
+
+    chart_dfs = [select_chart_data(df=kwargs['data'],
+                                   columns=[*columns, *subset_cols],
+                                   sum_col=sum_col)
+                 for kwargs in chart_kwargs]
+
+    chart_shared_data = create_shared_dataset(
+        dfs=chart_dfs,
+        columns=columns,
+        subset_cols=subset_cols,
+        output_path=output_path)
+
+    for kwargs, shared_data in zip(chart_kwargs, chart_shared_data):
+        if shared_data is not None:
+            kwargs.update(data=None, shared_data=shared_data)
+
+    return [output_path]
+
+
+def render_heatmaps(
+        heatmap_dfs: list[pd.DataFrame],
+        output_dir: str,
+        heatmap_args: HeatmapArguments,
+        day_types: list[str] | None = None,
+        periods: list[str] | None = None,
+        render_workers: int = 1,
+        output_format: str = 'png',
+        shared_data: bool = False,
+        renderer_args: RendererArguments | None = None) -> dict:
+    """
+    Create heatmaps for ridership by month and year (1999-2023).
+
+    - 1999-2023 (Weekday, Saturday, Sunday)
+    - 1999-2009 (Weekday, Saturday, Sunday)
+    - 2010-2023 (Weekday, Saturday, Sunday)
+
+    If the settings limit the number of facets per page, heatmaps with more
+    routes than fit on one page are split into pages that are created as
+    separate charts, along with a JSON index of the routes on each page.
+
+    Arguments:
+        heatmap_dfs (DataFrameList): List of dataframes, one for each
+            heatmap.
+        output_dir (str): The absolute file path to output directory where
+            the plots will be saved.
+        heatmap_args (HeatmapArguments): Settings for the heatmaps.
+        day_types (strList): The day types to create charts for. If not
+            specified, charts are created for all day types. Defaults to
+            None.
+        periods (strList): The periods to create charts for (e.g.
+            '2020_2023'). If not specified, charts are created for all
+            periods. Defaults to None.
+        render_workers (int): The number of processes used to create
+            charts. Defaults to 1.
+        output_format (str): The format to save charts in. One of 'png',
+            'svg', 'html' or 'json'. Defaults to 'png'.
+        shared_data (bool): Whether charts saved as HTML or JSON read their
+            data from one data file shared by every chart of the family
+            instead of embedding it. Defaults to False.
+        renderer_args (RendererArguments): Settings of the renderer (e.g. the
+            scale of PNG images). If not specified, the renderer configured
+            in this process is used. Defaults to None.
+
+    Returns:
+        Dictionary containing:
+            - heatmap_paths: List of file paths of each heatmap, page, page
+                index and shared data file created.
+
+    Raises:
+        RuntimeError if any chart could not be created.
+    """
+
+    if renderer_args is not None:
+        configure_chart_renderer(renderer_args=renderer_args)
+
+    hm_file_paths = create_absolute_file_paths(
+        file_list=viz_file_names['heatmap_args'],
+        file_path=output_dir,
+        extension=output_format)
+
+    logging.info(
+        "Creating heatmaps for ridership by month and year (1999-2023)")
+    chart_kwargs = []
+    page_indexes = []
+
+    for hm_df, hm_op in _select_chart_outputs(
+            dfs=heatmap_dfs,
+            file_paths=hm_file_paths,
+            label_cols=['DAY_TYPE', 'RIDERSHIP_TIER'],
+            day_types=day_types,
+            periods=periods):
+        heatmap_kwargs = dict(
+            x_value=heatmap_args.x_value,
+            x_value_type=heatmap_args.x_value_type,
+            y_value=heatmap_args.y_value,
+            y_value_type=heatmap_args.y_value_type,
+            x_axis_title=heatmap_args.x_axis_title,
+            y_axis_title=heatmap_args.y_axis_title,
+            color_title=heatmap_args.color_title,
+            color_values=heatmap_args.color_values,
+            facet_values=heatmap_args.facet_values,
+            facet_columns=heatmap_args.facet_columns,
+            scheme=heatmap_args.scheme,
+            x_axis_sort_order=heatmap_args.x_axis_sort_order)
+
+        hm_pages = []
+        if heatmap_args.facets_per_page is not None:
+            hm_pages = create_facet_pages(
+                df=hm_df,
+                facet_col=heatmap_args.facet_values,
+                page_size=heatmap_args.facets_per_page)
+
+        if len(hm_pages) < 2:
+            chart_kwargs.append(dict(
+                data=hm_df, output_path=hm_op, **heatmap_kwargs))
+            continue
+
+        # Each page is a separate chart, so every page uses the color scale
+        # of the whole heatmap to keep colors comparable between pages.
+        # Heatmaps without any values keep the default scale of each page.
+        color_min = hm_df[heatmap_args.color_values].min()
+        color_max = hm_df[heatmap_args.color_values].max()
+        color_domain = None
+        if not (pd.isna(color_min) or pd.isna(color_max)):
+            color_domain = [float(color_min), float(color_max)]
+        page_paths = create_page_file_paths(
+            file_path=hm_op,
+            n_pages=len(hm_pages))
+
+        for page_df, page_path in zip(hm_pages, page_paths):
+            chart_kwargs.append(dict(
+                data=page_df,
+                output_path=page_path,
+                color_domain=color_domain,
+                **heatmap_kwargs))
+
+        page_indexes.append((hm_op, page_paths, [
+            page_df[heatmap_args.facet_values].drop_duplicates()
+            .sort_values().tolist()
+            for page_df in hm_pages]))
+
+    data_paths = []
+    if shared_data and output_format in ['html', 'json']:
+        # Pages of a heatmap are subsets of the same routes, so they are
+        # also distinguished by the routes they show.
+        subset_cols = heatmap_args.subset_cols
+        if heatmap_args.facets_per_page is not None:
+            subset_cols = [*subset_cols, heatmap_args.facet_values]
+
+        data_paths = _share_chart_data(
+            chart_kwargs=chart_kwargs,
+            columns=[heatmap_args.facet_values,
+                     heatmap_args.x_value,
+                     heatmap_args.y_value,
+                     heatmap_args.color_values],
+            subset_cols=subset_cols,
+            output_path=f"{output_dir}{shared_data_file_names['heatmap']}")
+
+    output_paths = render_charts(
+        chart_func=create_heatmap,
+        chart_kwargs=chart_kwargs,
+        n_workers=render_workers) + data_paths
+
+    for hm_op, page_paths, page_facets in page_indexes:
+        output_paths.append(save_page_index(
+            file_path=hm_op,
+            page_paths=page_paths,
+            page_facets=page_facets))
+
+    return {'heatmap_paths': output_paths}
+
+
+def render_barcharts(
+        barchart_dfs: list[pd.DataFrame],
+        output_dir: str,
+        barchart_args: BarChartArguments,
+        day_types: list[str] | None = None,
+        periods: list[str] | None = None,
+        render_workers: int = 1,
+        output_format: str = 'png',
+        shared_data: bool = False,
+        renderer_args: RendererArguments | None = None) -> dict:
+    """
+    Create stacked bar charts for routes by ridership.
+
+    - 1999-2023 (Weekday, Saturday, Sunday)
+    - 1999-2009 (Weekday, Saturday, Sunday)
+    - 2010-2019 (Weekday, Saturday, Sunday)
+    - 2020-2023 (Weekday, Saturday, Sunday)
+
+    Arguments:
+        barchart_dfs (DataFrameList): List of dataframes, one for each bar
+            chart.
+        output_dir (str): The absolute file path to output directory where
+            the plots will be saved.
+        barchart_args (BarChartArguments): Settings for the bar charts.
+        day_types (strList): The day types to create charts for. If not
+            specified, charts are created for all day types. Defaults to
+            None.
+        periods (strList): The periods to create charts for (e.g.
+            '2020_2023'). If not specified, charts are created for all
+            periods. Defaults to None.
+        render_workers (int): The number of processes used to create
+            charts. Defaults to 1.
+        output_format (str): The format to save charts in. One of 'png',
+            'svg', 'html' or 'json'. Defaults to 'png'.
+        shared_data (bool): Whether charts saved as HTML or JSON read their
+            data from one data file shared by every chart of the family
+            instead of embedding it. Defaults to False.
+        renderer_args (RendererArguments): Settings of the renderer (e.g. the
+            scale of PNG images). If not specified, the renderer configured
+            in this process is used. Defaults to None.
+
+    Returns:
+        Dictionary containing:
+            - barchart_paths: List of file paths of each bar chart and
+                shared data file created.
+
+    Raises:
+        RuntimeError if any chart could not be created.
+    """
+
+    if renderer_args is not None:
+        configure_chart_renderer(renderer_args=renderer_args)
+
+    ts_bc_file_paths = create_absolute_file_paths(
+        file_list=viz_file_names['bar_chart_args'],
+        file_path=output_dir,
+        extension=output_format)
+
+    logging.info("Creating stacked bar charts for routes by ridership")
+    chart_kwargs = []
+
+    for ts_bc_df, ts_bc_op in _select_chart_outputs(
+            dfs=barchart_dfs,
+            file_paths=ts_bc_file_paths,
+            label_cols=['DAY_TYPE'],
+            day_types=day_types,
+            periods=periods):
+        chart_kwargs.append(dict(
+            data=ts_bc_df,
+            output_path=ts_bc_op,
+            x_value=barchart_args.x_value,
+            y_value=barchart_args.y_value,
+            x_value_type=barchart_args.x_value_type,
+            y_value_type=barchart_args.y_value_type,
+            color_values=barchart_args.color_values,
+            title=barchart_args.title,
+            x_axis_title=barchart_args.x_axis_title,
+            y_axis_title=barchart_args.y_axis_title,
+            color_title=barchart_args.color_title,
+            color_value_type=barchart_args.color_value_type,
+            scheme=barchart_args.scheme))
+
+    data_paths = []
+    if shared_data and output_format in ['html', 'json']:
+        data_paths = _share_chart_data(
+            chart_kwargs=chart_kwargs,
+            columns=[barchart_args.y_value,
+                     barchart_args.color_values,
+                     barchart_args.x_value],
+            subset_cols=barchart_args.subset_cols,
+            output_path=f"{output_dir}{shared_data_file_names['bar']}",
+            sum_col=(barchart_args.x_value
+                     if barchart_args.x_value_type == 'quantitative'
+                     else None))
+
+    output_paths = render_charts(
+        chart_func=create_barchart,
+        chart_kwargs=chart_kwargs,
+        n_workers=render_workers) + data_paths
+
+    return {'barchart_paths': output_paths}
+
+
+def render_recovery_charts(
+        recovery_dfs: list[pd.DataFrame],
+        output_dir: str,
+        ridership_recovery_args: RidershipRecoveryArguments,
+        day_types: list[str] | None = None,
+        periods: list[str] | None = None,
+        render_workers: int = 1,
+        output_format: str = 'png',
+        renderer_args: RendererArguments | None = None) -> dict:
+    """
+    Create bar charts for ridership recovery by route.
+
+    - 2019-2023 (Weekday, Saturday, Sunday)
+
+    Arguments:
+        recovery_dfs (DataFrameList): List of dataframes, one for each day
+            type.
+        output_dir (str): The absolute file path to output directory where
+            the plots will be saved.
+        ridership_recovery_args (RidershipRecoveryArguments): Settings for
+            the ridership recovery bar charts.
+        day_types (strList): The day types to create charts for. If not
+            specified, charts are created for all day types. Defaults to
+            None.
+        periods (strList): The periods to create charts for (e.g.
+            '2020_2023'). If not specified, charts are created for all
+            periods. Defaults to None.
+        render_workers (int): The number of processes used to create
+            charts. Defaults to 1.
+        output_format (str): The format to save charts in. One of 'png',
+            'svg', 'html' or 'json'. Defaults to 'png'.
+        renderer_args (RendererArguments): Settings of the renderer (e.g. the
+            scale of PNG images). If not specified, the renderer configured
+            in this process is used. Defaults to None.
+
+    Returns:
+        Dictionary containing:
+            - recovery_paths: List of file paths of each bar chart created.
+
+    Raises:
+        RuntimeError if any chart could not be created.
+    """
+
+    if renderer_args is not None:
+        configure_chart_renderer(renderer_args=renderer_args)
+
+    rrbc_file_paths = create_absolute_file_paths(
+        file_list=viz_file_names['ridership_recovery_args'],
+        file_path=output_dir,
+        extension=output_format)
+
+    logging.info("Creating bar charts for ridership recovery by route")
+    chart_kwargs = []
+
+    for rr_2019_2023_df, rr_bc_op in _select_chart_outputs(
+            dfs=recovery_dfs,
+            file_paths=rrbc_file_paths,
+            label_cols=['DAY_TYPE'],
+            day_types=day_types,
+            periods=periods,
+            years=[ridership_recovery_args.baseline_year,
+                   ridership_recovery_args.comparison_year]):
+        chart_kwargs.append(dict(
+            data=rr_2019_2023_df,
+            output_path=rr_bc_op,
+            x_value=ridership_recovery_args.x_value,
+            y_value=ridership_recovery_args.y_value,
+            x_value_type=ridership_recovery_args.x_value_type,
+            y_value_type=ridership_recovery_args.y_value_type,
+            color_values=ridership_recovery_args.color_values,
+            title=ridership_recovery_args.title,
+            x_axis_title=ridership_recovery_args.x_axis_title,
+            y_axis_title=ridership_recovery_args.y_axis_title,
+            color_title=ridership_recovery_args.color_title,
+            scheme=ridership_recovery_args.scheme))
+
+    output_paths = render_charts(
+        chart_func=create_barchart,
+        chart_kwargs=chart_kwargs,
+        n_workers=render_workers)
+
+    return {'recovery_paths': output_paths}
+
+
+def render_bumpcharts(
+        bumpchart_dfs: list[pd.DataFrame],
+        output_dir: str,
+        bumpchart_args: BumpChartArguments,
+        day_types: list[str] | None = None,
+        periods: list[str] | None = None,
+        render_workers: int = 1,
+        output_format: str = 'png',
+        renderer_args: RendererArguments | None = None) -> dict:
+    """
+    Create bump charts for routes by ridership and year.
+
+    - 1999-2023 (Weekday, Saturday, Sunday)
+
+    Arguments:
+        bumpchart_dfs (DataFrameList): List of dataframes of ranked routes,
+            one for each bump chart.
+        output_dir (str): The absolute file path to output directory where
+            the plots will be saved.
+        bumpchart_args (BumpChartArguments): Settings for the bump charts.
+        day_types (strList): The day types to create charts for. If not
+            specified, charts are created for all day types. Defaults to
+            None.
+        periods (strList): The periods to create charts for (e.g.
+            '2020_2023'). If not specified, charts are created for all
+            periods. Defaults to None.
+        render_workers (int): The number of processes used to create
+            charts. Defaults to 1.
+        output_format (str): The format to save charts in. One of 'png',
+            'svg', 'html' or 'json'. Defaults to 'png'.
+        renderer_args (RendererArguments): Settings of the renderer (e.g. the
+            scale of PNG images). If not specified, the renderer configured
+            in this process is used. Defaults to None.
+
+    Returns:
+        Dictionary containing:
+            - bumpchart_paths: List of file paths of each bump chart created.
+
+    Raises:
+        RuntimeError if any chart could not be created.
+    """
+
+    if renderer_args is not None:
+        configure_chart_renderer(renderer_args=renderer_args)
+
+    bpc_file_paths = create_absolute_file_paths(
+        file_list=viz_file_names['bump_chart_args'],
+        file_path=output_dir,
+        extension=output_format)
+
+    logging.info("Creating bump charts for routes by ridership and year")
+    chart_kwargs = []
+
+    for ts_bpc_df, ts_bpc_op in _select_chart_outputs(
+            dfs=bumpchart_dfs,
+            file_paths=bpc_file_paths,
+            label_cols=['DAY_TYPE'],
+            day_types=day_types,
+            periods=periods):
+        chart_kwargs.append(dict(
+            data=ts_bpc_df,
+            output_path=ts_bpc_op,
+            x_value=bumpchart_args.x_value,
+            y_value=bumpchart_args.y_value,
+            x_value_type=bumpchart_args.x_value_type,
+            y_value_type=bumpchart_args.y_value_type,
+            color_values=bumpchart_args.color_values,
+            x_axis_title=bumpchart_args.x_axis_title,
+            y_axis_title=bumpchart_args.y_axis_title,
+            color_title=bumpchart_args.color_title,
+            title=bumpchart_args.title,
+            scheme=bumpchart_args.scheme,
+            value_col=bumpchart_args.value_col,
+            rank_col=bumpchart_args.rank_col,
+            group_col=bumpchart_args.group_col,
+            num_rankings=bumpchart_args.num_rankings,
+            ranked=True))
+
+    output_paths = render_charts(
+        chart_func=create_bumpchart,
+        chart_kwargs=chart_kwargs,
+        n_workers=render_workers)
+
+    return {'bumpchart_paths': output_paths}
+
+
+def render_linecharts(
+        linechart_dfs: list[pd.DataFrame],
+        output_dir: str,
+        rrtsa_args: LineChartArguments,
+        day_types: list[str] | None = None,
+        periods: list[str] | None = None,
+        render_workers: int = 1,
+        output_format: str = 'png',
+        renderer_args: RendererArguments | None = None) -> dict:
+    """
+    Create line plots for routes by ridership and year. These plots
+    represent a time series analysis of route ridership or for our purposes
+    a route ridership time series analysis (rrtsa).
+
+    - 1999-2023 (Weekday, Saturday, Sunday)
+
+    Arguments:
+        linechart_dfs (DataFrameList): List of dataframes, one for each line
+            chart.
+        output_dir (str): The absolute file path to output directory where
+            the plots will be saved.
+        rrtsa_args (LineChartArguments): Settings for the line charts.
+        day_types (strList): The day types to create charts for. If not
+            specified, charts are created for all day types. Defaults to
+            None.
+        periods (strList): The periods to create charts for (e.g.
+            '2020_2023'). If not specified, charts are created for all
+            periods. Defaults to None.
+        render_workers (int): The number of processes used to create
+            charts. Defaults to 1.
+        output_format (str): The format to save charts in. One of 'png',
+            'svg', 'html' or 'json'. Defaults to 'png'.
+        renderer_args (RendererArguments): Settings of the renderer (e.g. the
+            scale of PNG images). If not specified, the renderer configured
+            in this process is used. Defaults to None.
+
+    Returns:
+        Dictionary containing:
+            - linechart_paths: List of file paths of each line chart created.
+
+    Raises:
+        RuntimeError if any chart could not be created.
+    """
+
+    if renderer_args is not None:
+        configure_chart_renderer(renderer_args=renderer_args)
+
+    rrtsa_file_paths = create_absolute_file_paths(
+        file_list=viz_file_names['line_chart_args'],
+        file_path=output_dir,
+        extension=output_format)
+
+    logging.info("Creating line plots for routes by ridership and year")
+    chart_kwargs = []
+
+    for ts_df, ts_op in _select_chart_outputs(
+            dfs=linechart_dfs,
+            file_paths=rrtsa_file_paths,
+            label_cols=['DAY_TYPE'],
+            day_types=day_types,
+            periods=periods):
+        chart_kwargs.append(dict(
+            data=ts_df,
+            output_path=ts_op,
+            x_value=rrtsa_args.x_value,
+            y_value=rrtsa_args.y_value,
+            x_value_type=rrtsa_args.x_value_type,
+            y_value_type=rrtsa_args.y_value_type,
+            x_axis_title=rrtsa_args.x_axis_title,
+            y_axis_title=rrtsa_args.y_axis_title,
+            color_title=rrtsa_args.color_title,
+            color_values=rrtsa_args.color_values,
+            title=rrtsa_args.title,
+            scheme=rrtsa_args.scheme))
+
+    output_paths = render_charts(
+        chart_func=create_linechart,
+        chart_kwargs=chart_kwargs,
+        n_workers=render_workers)
+
+    return {'linechart_paths': output_paths}
+
+
+def render_areachart(
+        route_count_df: pd.DataFrame,
+        output_dir: str,
+        route_count_args: RouteCountArguments,
+        day_types: list[str] | None = None,
+        periods: list[str] | None = None,
+        render_workers: int = 1,
+        output_format: str = 'png',
+        renderer_args: RendererArguments | None = None) -> dict:
+    """
+    Create an area chart for the number of bus routes in service during the
+    period for which data is available.
+
+    - 1999-2023
+
+    Arguments:
+        route_count_df (DataFrame): Dataframe of the number of routes in
+            service each year.
+        output_dir (str): The absolute file path to output directory where
+            the plots will be saved.
+        route_count_args (RouteCountArguments): Settings for the route count
+            area chart.
+        day_types (strList): The day types to create charts for. If not
+            specified, charts are created for all day types. Defaults to
+            None.
+        periods (strList): The periods to create charts for (e.g.
+            '2020_2023'). If not specified, charts are created for all
+            periods. Defaults to None.
+        render_workers (int): The number of processes used to create
+            charts. Defaults to 1.
+        output_format (str): The format to save charts in. One of 'png',
+            'svg', 'html' or 'json'. Defaults to 'png'.
+        renderer_args (RendererArguments): Settings of the renderer (e.g. the
+            scale of PNG images). If not specified, the renderer configured
+            in this process is used. Defaults to None.
+
+    Returns:
+        Dictionary containing:
+            - areachart_paths: List of file paths of each area chart created.
+
+    Raises:
+        RuntimeError if any chart could not be created.
+    """
+
+    if renderer_args is not None:
+        configure_chart_renderer(renderer_args=renderer_args)
+
+    rctsa_file_path = create_absolute_file_paths(
+        file_list=viz_file_names['route_count_area_chart_args'],
+        file_path=output_dir,
+        extension=output_format)
+
+    if not is_selected_data(
+            df=route_count_df,
+            day_types=day_types,
+            periods=periods):
+        return {'areachart_paths': []}
+
+    logging.info("Creating area chart for the number of bus routes")
+    output_paths = render_charts(
+        chart_func=create_areachart,
+        chart_kwargs=[dict(
+            data=route_count_df,
+            output_path=rctsa_file_path,
+            x_value=route_count_args.x_value,
+            y_value=route_count_args.y_value,
+            x_value_type=route_count_args.x_value_type,
+            y_value_type=route_count_args.y_value_type,
+            x_axis_title=route_count_args.x_axis_title,
+            y_axis_title=route_count_args.y_axis_title,
+            title=route_count_args.title,
+            color=route_count_args.color)],
+        n_workers=render_workers)
+
+    return {'areachart_paths': output_paths}
+
+
+def create_stages() -> list[Stage]:
+    """
+    Create the stages of the transportation data analysis. Stages that
+    create visualizations only depend on the data they plot, so each family
+    of visualizations can be created independently once the data is loaded.
+
+    Arguments:
+        NONE
+
+    Returns:
+        List of stages.
+
+    Raises:
+        NONE
+    """
+
+    stages = [
+        Stage(name='load_bus_data',
+              func=load_bus_data,
+              inputs=['bus_data_path'],
+              outputs=['raw_bus_data']),
+        Stage(name='prep_bus_data',
+              func=prep_bus_data,
+              inputs=['raw_bus_data'],
+              outputs=['bus_data']),
+        Stage(name='prep_route_index',
+              func=prep_route_index,
+              inputs=['bus_data'],
+              outputs=['route_index']),
+        Stage(name='prep_heatmap_data',
+              func=prep_heatmap_data,
+              inputs=['bus_data', 'bus_data_args', 'day_types', 'periods'],
+              outputs=['heatmap_dfs', 'tiered_bus_data']),
+        Stage(name='prep_yearly_data',
+              func=prep_yearly_data,
+              inputs=['bus_data', 'agg_workers'],
+              outputs=['agg_year', 'agg_year_dfs']),
+        Stage(name='prep_barchart_data',
+              func=prep_barchart_data,
+              inputs=['agg_year_dfs'],
+              outputs=['barchart_dfs']),
+        Stage(name='prep_linechart_data',
+              func=prep_linechart_data,
+              inputs=['agg_year_dfs', 'rrtsa_args'],
+              outputs=['linechart_dfs']),
+        Stage(name='prep_bumpchart_data',
+              func=prep_bumpchart_data,
+              inputs=['agg_year_dfs',
+                      'linechart_dfs',
+                      'rrtsa_args',
+                      'bumpchart_args'],
+              outputs=['bumpchart_dfs']),
+        Stage(name='prep_recovery_data',
+              func=prep_recovery_data,
+              inputs=['agg_year', 'ridership_recovery_args'],
+              outputs=['recovery_dfs']),
+        Stage(name='prep_route_count_data',
+              func=prep_route_count_data,
+              inputs=['route_index', 'route_count_args'],
+              outputs=['route_count_df']),
+        Stage(name='render_heatmaps',
+              func=render_heatmaps,
+              inputs=['heatmap_dfs',
+                      'output_dir',
+                      'heatmap_args',
+                      'day_types',
+                      'periods',
+                      'render_workers',
+                      'output_format',
+                      'shared_data',
+                      'renderer_args'],
+              outputs=['heatmap_paths'],
+              file_outputs=['heatmap_paths']),
+        Stage(name='render_barcharts',
+              func=render_barcharts,
+              inputs=['barchart_dfs',
+                      'output_dir',
+                      'barchart_args',
+                      'day_types',
+                      'periods',
+                      'render_workers',
+                      'output_format',
+                      'shared_data',
+                      'renderer_args'],
+              outputs=['barchart_paths'],
+              file_outputs=['barchart_paths']),
+        Stage(name='render_recovery_charts',
+              func=render_recovery_charts,
+              inputs=['recovery_dfs',
+                      'output_dir',
+                      'ridership_recovery_args',
+                      'day_types',
+                      'periods',
+                      'render_workers',
+                      'output_format',
+                      'renderer_args'],
+              outputs=['recovery_paths'],
+              file_outputs=['recovery_paths']),
+        Stage(name='render_bumpcharts',
+              func=render_bumpcharts,
+              inputs=['bumpchart_dfs',
+                      'output_dir',
+                      'bumpchart_args',
+                      'day_types',
+                      'periods',
+                      'render_workers',
+                      'output_format',
+                      'renderer_args'],
+              outputs=['bumpchart_paths'],
+              file_outputs=['bumpchart_paths']),
+        Stage(name='render_linecharts',
+              func=render_linecharts,
+              inputs=['linechart_dfs',
+                      'output_dir',
+                      'rrtsa_args',
+                      'day_types',
+                      'periods',
+                      'render_workers',
+                      'output_format',
+                      'renderer_args'],
+              outputs=['linechart_paths'],
+              file_outputs=['linechart_paths']),
+        Stage(name='render_areachart',
+              func=render_areachart,
+              inputs=['route_count_df',
+                      'output_dir',
+                      'route_count_args',
+                      'day_types',
+                      'periods',
+                      'render_workers',
+                      'output_format',
+                      'renderer_args'],
+              outputs=['areachart_paths'],
+              file_outputs=['areachart_paths'])]
+
+    return stages
+
+
+def _create_initial_values(
+        df_or_path: pd.DataFrame | str,
+        output_dir: str,
+        config: AnalysisConfig) -> tuple[list[Stage], dict]:
+    """
+    Create the stages of the analysis and the values available before any
+    stage runs.
+
+    Arguments:
+        df_or_path (DataFrame or str): Dataframe of bus ridership data or the
+            absolute file path to a CSV file of bus ridership data.
+        output_dir (str): The absolute file path to the output directory.
+        config (AnalysisConfig): Settings for the analysis.
+
+    Returns:
+        Tuple of the list of stages and the dictionary of initial values.
+
+    Raises:
+        NONE
+    """
+
+    stages = create_stages()
+
+    initial_values = {
+        'output_dir': output_dir,
+        'agg_workers': config.agg_workers,
+        'render_workers': config.render_workers,
+        'output_format': config.renderer_args.output_format,
+        'shared_data': config.renderer_args.shared_data,
+        'renderer_args': config.renderer_args,
+        'day_types': config.day_types,
+        'periods': config.periods,
+        'bus_data_args': config.bus_data_args,
+        'barchart_args': config.barchart_args,
+        'bumpchart_args': config.bumpchart_args,
+        'rrtsa_args': config.rrtsa_args,
+        'heatmap_args': config.heatmap_args,
+        'route_count_args': config.route_count_args,
+        'ridership_recovery_args': config.ridership_recovery_args}
+
+    if isinstance(df_or_path, pd.DataFrame):
+        stages = [stage for stage in stages if stage.name != 'load_bus_data']
+        initial_values['raw_bus_data'] = df_or_path
+    else:
+        initial_values['bus_data_path'] = df_or_path
+
+    return stages, initial_values
+
+
+def run_analysis(
+        df_or_path: pd.DataFrame | str,
+        output_dir: str,
+        config: AnalysisConfig | None = None,
+        memory_cache: dict | None = None) -> dict:
+    """
+    Run the transportation data analysis and create the visualizations
+    selected in the configuration. The analysis can be run repeatedly in the
+    same process (e.g. by a long running service) on bus data that is
+    already loaded.
+
+    Arguments:
+        df_or_path (DataFrame or str): Dataframe of bus ridership data with
+            numeric months or the absolute file path to a CSV file of bus
+            ridership data.
+        output_dir (str): The absolute file path to output directory where
+            the plots will be saved.
+        config (AnalysisConfig): Settings for the analysis. Defaults to the
+            settings in constants.py.
+        memory_cache (dict): Dictionary to keep the outputs of each stage in
+            between runs so that later runs only repeat the stages whose
+            inputs changed. Defaults to None.
+
+    Returns:
+        Dictionary containing the configured values and the output of every
+        stage that was run keyed by name (e.g. 'agg_year' or 'heatmap_paths').
+
+    Raises:
+        ValueError if a chart family in the configuration is unknown.
+        ValueError if the output format in the configuration is not
+            supported.
+        ValueError if the configuration resumes a run without a checkpoint
+            directory.
+        RuntimeError if any chart could not be created.
+    """
+
+    if config is None:
+        config = AnalysisConfig()
+
+    configure_chart_renderer(renderer_args=config.renderer_args)
+
+    stages, initial_values = _create_initial_values(
+        df_or_path=df_or_path,
+        output_dir=output_dir,
+        config=config)
+
+    if config.chart_families is not None:
+        unknown_families = [family for family in config.chart_families
+                            if family not in chart_family_stages]
+        if unknown_families:
+            raise ValueError(
+                f"Unknown chart families {unknown_families}. Choose from "
+                f"{list(chart_family_stages)}")
+
+        stages = select_stages(
+            stages=stages,
+            targets=[chart_family_stages[family]
+                     for family in config.chart_families])
+
+    return run_stages(
+        stages=stages,
+        initial_values=initial_values,
+        max_workers=config.workers,
+        cache_dir=config.cache_dir,
+        memory_cache=memory_cache,
+        checkpoint_dir=config.checkpoint_dir,
+        resume=config.resume,
+        rerun_stages=(list(chart_family_stages.values())
+                      if not config.renderer_args.skip_unchanged
+                      else None))
+
+
+def export_analysis_data(
+        df_or_path: pd.DataFrame | str,
+        output_dir: str,
+        config: AnalysisConfig | None = None) -> dict:
+    """
+    Prepare the yearly ridership aggregates, the route service spans and the
+    yearly route counts and save each as a CSV file without creating any
+    visualizations.
+
+    Arguments:
+        df_or_path (DataFrame or str): Dataframe of bus ridership data with
+            numeric months or the absolute file path to a CSV file of bus
+            ridership data.
+        output_dir (str): The absolute file path to output directory where
+            the data files will be saved.
+        config (AnalysisConfig): Settings for the analysis. Only the settings
+            used to prepare data apply. Defaults to the settings in
+            constants.py.
+
+    Returns:
+        Dictionary containing the file path of each data file keyed by the
+        name of the value it contains.
+
+    Raises:
+        ValueError if the configuration resumes a run without a checkpoint
+            directory.
+    """
+
+    if config is None:
+        config = AnalysisConfig()
+
+    stages, initial_values = _create_initial_values(
+        df_or_path=df_or_path,
+        output_dir=output_dir,
+        config=config)
+
+    producers = {output: stage.name
+                 for stage in stages for output in stage.outputs}
+    stages = select_stages(
+        stages=stages,
+        targets=[producers[name] for name in data_file_names])
+
+    values = run_stages(
+        stages=stages,
+        initial_values=initial_values,
+        max_workers=config.workers,
+        cache_dir=config.cache_dir,
+        checkpoint_dir=config.checkpoint_dir,
+        resume=config.resume)
+
+    data_file_paths = create_absolute_file_paths(
+        file_list=list(data_file_names.values()),
+        file_path=output_dir)
+    data_file_paths = dict(zip(data_file_names, data_file_paths))
+
+    for name, data_file_path in data_file_paths.items():
+        logging.info(f'Saving {name} to {data_file_path}')
+        values[name].to_csv(data_file_path, index=False)
+
+    return data_file_paths
+
+
+def save_analysis_dashboard(
+        df_or_path: pd.DataFrame | str,
+        output_dir: str,
+        config: AnalysisConfig | None = None) -> str:
+    """
+    Prepare the monthly ridership data and save it as one interactive HTML
+    dashboard, in which the day type, ridership tier and period are selected
+    in the browser, instead of creating a separate visualization for each.
+
+    Arguments:
+        df_or_path (DataFrame or str): Dataframe of bus ridership data with
+            numeric months or the absolute file path to a CSV file of bus
+            ridership data.
+        output_dir (str): The absolute file path to output directory where
+            the dashboard will be saved.
+        config (AnalysisConfig): Settings for the analysis. The day types in
+            the configuration limit the day types that can be selected and
+            its periods are not used. Defaults to the settings in
+            constants.py.
+
+    Returns:
+        The absolute file path of the dashboard.
+
+    Raises:
+        ValueError if a day type in the configuration is not in the bus data.
+        ValueError if the configuration resumes a run without a checkpoint
+            directory.
+    """
+
+    if config is None:
+        config = AnalysisConfig()
+
+    configure_chart_renderer(renderer_args=config.renderer_args)
+
+    stages, initial_values = _create_initial_values(
+        df_or_path=df_or_path,
+        output_dir=output_dir,
+        config=config)
+
+    # The day types of the dashboard are selected in the browser, so the
+    # monthly ridership data is prepared for every day type and period.
+    initial_values.update(day_types=None, periods=None)
+
+    stages = select_stages(stages=stages, targets=['prep_heatmap_data'])
+
+    values = run_stages(
+        stages=stages,
+        initial_values=initial_values,
+        max_workers=config.workers,
+        cache_dir=config.cache_dir,
+        checkpoint_dir=config.checkpoint_dir,
+        resume=config.resume)
+
+    tiered_bus_data = values['tiered_bus_data']
+    data_day_types = set(
+        tiered_bus_data[config.dashboard_args.day_type_col].unique())
+
+    if config.day_types is not None:
+        unknown_day_types = [day_type for day_type in config.day_types
+                             if day_type not in data_day_types]
+        if unknown_day_types:
+            raise ValueError(
+                f"Day types {unknown_day_types} are not in the bus data")
+        day_types = config.day_types
+    else:
+        day_types = [day_type for day_type in bus_data_day_types
+                     if day_type in data_day_types]
+
+    dashboard_path = create_absolute_file_paths(
+        file_list=[config.dashboard_args.output_file],
+        file_path=output_dir)
+
+    logging.info(f'Creating dashboard {dashboard_path}')
+    create_dashboard(
+        data=tiered_bus_data,
+        output_path=dashboard_path,
+        day_types=day_types,
+        dashboard_args=config.dashboard_args,
+        heatmap_args=config.heatmap_args,
+        barchart_args=config.barchart_args,
+        linechart_args=config.rrtsa_args)
+
+    return dashboard_path
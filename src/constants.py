@@ -56,6 +56,43 @@ viz_file_names = {
                      'sunday_ridership_heatmap_2010_2023_high.png'],
     'route_count_area_chart_args': ['route_count_1999_2023.png']}
 
+# Data files written by the export command, keyed by the analysis value each
+# file contains.
+data_file_names = {
+    'agg_year': 'ridership_by_route_and_year.csv',
+    'route_index': 'route_service_spans.csv',
+    'route_count_df': 'route_count_by_year.csv'}
+
+# Columns of the bus ridership data and whether their values are numeric.
+bus_data_columns = {
+    'ROUTE': False,
+    'YEAR': True,
+    'MONTH': True,
+    'DAY_TYPE': False,
+    'AVG_RIDES': True}
+
+bus_data_day_types = ['Weekday', 'Saturday', 'Sunday - Holiday']
+
+# Formats charts can be saved in. Only PNG and SVG files are rendered, JSON
+# files contain the Vega-Lite specification and HTML files render the
+# specification in the browser.
+chart_output_formats = ['png', 'svg', 'html', 'json']
+
+# Data files shared by the charts of a family when charts read their data
+# from a file instead of embedding it.
+shared_data_file_names = {
+    'heatmap': 'ridership_heatmap_data.json',
+    'bar': 'ridership_barchart_data.json'}
+
+# The analysis stage that creates each family of visualizations.
+chart_family_stages = {
+    'heatmap': 'render_heatmaps',
+    'bar': 'render_barcharts',
+    'recovery': 'render_recovery_charts',
+    'bump': 'render_bumpcharts',
+    'line': 'render_linecharts',
+    'area': 'render_areachart'}
+
 
 @dataclass
 class Months(TypedDict):
@@ -90,8 +127,11 @@ class BarChartArguments:
     y_axis_title: str = 'Route'
     color_title: str = 'Year'
     color_values: str = 'YEAR'
+    color_value_type: str = 'nominal'
     scheme: str = 'tableau20'
     title: str = "Number of rides per CTA bus route"
+    subset_cols: list[str] = field(
+        default_factory=lambda: ['DAY_TYPE', 'YEAR'])
 
 
 @dataclass
@@ -144,6 +184,9 @@ class HeatmapArguments:
     color_values: str = 'AVG_RIDES'
     facet_values: str = 'ROUTE'
     facet_columns: int = 3
+    facets_per_page: int | None = None
+    subset_cols: list[str] = field(
+        default_factory=lambda: ['RIDERSHIP_TIER', 'DAY_TYPE', 'YEAR'])
     scheme: str = 'yelloworangebrown'
     output_file: str = 'ridership_heatmap.png'
     x_axis_sort_order: list[str] = field(default_factory=lambda: [
@@ -190,3 +233,58 @@ class RidershipRecoveryArguments:
     scheme: str = 'tableau20'
     title: str = ("Percent of ridership recovery between 2019 and 2023 by "
                   "CTA bus route")
+    baseline_year: int = 2019
+    comparison_year: int = 2023
+
+
+@dataclass
+class DashboardArguments:
+    title: str = "Chicago Transit Authority bus ridership"
+    day_type_col: str = 'DAY_TYPE'
+    tier_col: str = 'RIDERSHIP_TIER'
+    year_col: str = 'YEAR'
+    tiers: list[str] = field(
+        default_factory=lambda: ['low', 'medium', 'high'])
+    output_file: str = 'ridership_dashboard.html'
+
+
+@dataclass
+class RendererArguments:
+    output_format: str = 'png'
+    scale_factor: float = 1.0
+    ppi: int = 72
+    theme: str | None = None
+    font_dirs: list[str] = field(default_factory=list)
+    skip_unchanged: bool = True
+    shared_data: bool = False
+
+
+@dataclass
+class AnalysisConfig:
+    chart_families: list[str] | None = None
+    day_types: list[str] | None = None
+    periods: list[str] | None = None
+    workers: int = 1
+    agg_workers: int = 1
+    render_workers: int = 1
+    cache_dir: str | None = None
+    checkpoint_dir: str | None = None
+    resume: bool = False
+    bus_data_args: BusDataArguments = field(
+        default_factory=BusDataArguments)
+    barchart_args: BarChartArguments = field(
+        default_factory=BarChartArguments)
+    bumpchart_args: BumpChartArguments = field(
+        default_factory=BumpChartArguments)
+    rrtsa_args: LineChartArguments = field(
+        default_factory=LineChartArguments)
+    heatmap_args: HeatmapArguments = field(
+        default_factory=HeatmapArguments)
+    route_count_args: RouteCountArguments = field(
+        default_factory=RouteCountArguments)
+    ridership_recovery_args: RidershipRecoveryArguments = field(
+        default_factory=RidershipRecoveryArguments)
+    dashboard_args: DashboardArguments = field(
+        default_factory=DashboardArguments)
+    renderer_args: RendererArguments = field(
+        default_factory=RendererArguments)
@@ -7,7 +7,10 @@ import logging
 import numpy as np
 import pandas as pd
 
+from instrumentation import instrument
 
+
+@instrument
 def change_column_datatype(
         df_list: list[pd.DataFrame],
         col: str,
@@ -64,6 +67,7 @@ def change_column_datatype(
         return updated_dfs[0]
 
 
+@instrument
 def create_rankings(
         df: pd.DataFrame,
         value_col: str,
@@ -120,6 +124,7 @@ def create_rankings(
     return rank_df
 
 
+@instrument
 def subset_dataframes_by_value(
         dfs: list[pd.DataFrame],
         operator: list[str],
@@ -177,6 +182,7 @@ def subset_dataframes_by_value(
             "the same length")
 
 
+@instrument
 def split_df(
         df: pd.DataFrame,
         split_col: str) -> dict:
@@ -203,3 +209,213 @@ def split_df(
         df_dict[key] = df_dict[key].reset_index(drop=True)
 
     return df_dict
+
+
+@instrument
+def select_chart_data(
+        df: pd.DataFrame,
+        columns: list[str],
+        sum_col: str | None = None) -> pd.DataFrame:
+    """
+    Reduce a dataframe to the columns a chart encodes before it is embedded
+    in the chart specification. Optionally combine rows that would be drawn
+    as separate segments of the same stacked mark (e.g. a bar) by summing
+    them.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe to plot.
+        columns (strList): The columns encoded by the chart. Repeated columns
+            are only included once.
+        sum_col (str): The name of the column to sum across rows sharing the
+            values of every other column in 'columns'. If not specified, rows
+            are not combined. Defaults to None.
+
+    Returns:
+        Dataframe containing only the specified columns, with rows in the
+        order they first appear in 'df'.
+
+    Raises:
+        ValueError if 'sum_col' is not one of 'columns'.
+    """
+
+    columns = list(dict.fromkeys(columns))
+
+    if sum_col is not None and sum_col not in columns:
+        raise ValueError("The value of 'sum_col' must be one of 'columns'")
+
+    chart_df = df[columns]
+
+    group_cols = [col for col in columns if col != sum_col]
+    if (sum_col is not None
+            and group_cols
+            and chart_df.duplicated(subset=group_cols).any()):
+        chart_df = chart_df.groupby(
+            group_cols, sort=False, dropna=False, observed=True)[
+            sum_col].sum().reset_index()[columns]
+
+    return chart_df
+
+
+@instrument
+def create_facet_pages(
+        df: pd.DataFrame,
+        facet_col: str,
+        page_size: int) -> list[pd.DataFrame]:
+    """
+    Split a dataframe into pages of facets so that a faceted chart can be
+    created as several smaller charts. Facet values are assigned to pages in
+    ascending order, the order in which they are drawn in a chart.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe to split.
+        facet_col (str): The name of the column a chart is faceted by.
+        page_size (int): The maximum number of facet values on each page.
+
+    Returns:
+        List of dataframes, one for each page.
+
+    Raises:
+        ValueError if the value of 'page_size' is less than one.
+    """
+
+    if page_size < 1:
+        raise ValueError("The value of 'page_size' must be at least one")
+
+    facet_codes, _ = pd.factorize(df[facet_col], sort=True)
+    page_numbers = facet_codes // page_size
+
+    pages = [page_df.reset_index(drop=True)
+             for _, page_df in df.groupby(page_numbers, sort=True)]
+
+    return pages
+
+
+@instrument
+def is_selected_data(
+        df: pd.DataFrame,
+        day_types: list[str] | None = None,
+        periods: list[str] | None = None,
+        day_type_col: str = 'DAY_TYPE',
+        year_col: str = 'YEAR',
+        years: list[int] | None = None) -> bool:
+    """
+    Determine whether the data of a chart matches a selection of day types
+    and periods. A chart matches a day type if it shows that day type and a
+    period if every year it shows is within the period, so charts of all
+    years (e.g. the line charts) are only selected by a period that contains
+    every year of the data (e.g. '1999_2023'). Data without a day type or
+    year column (e.g. the number of routes in service each year for all day
+    types) is not filtered by that criterion.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe of the data of the chart.
+        day_types (strList): The day types to select (e.g. 'Weekday' or
+            'Sunday - Holiday'). Only the first word of each day type is
+            compared and comparisons are not case sensitive. If not
+            specified, all day types are selected. Defaults to None.
+        periods (strList): The periods to select, written as the first and
+            last year joined by an underscore (e.g. '2020_2023'). If not
+            specified, all periods are selected. Defaults to None.
+        day_type_col (str): The name of the column containing day types.
+            Defaults to 'DAY_TYPE'.
+        year_col (str): The name of the column containing years, as integers
+            or strings. Defaults to 'YEAR'.
+        years (intList): The years the chart shows, for charts whose data
+            does not contain them (e.g. the years compared by the ridership
+            recovery charts). Defaults to None.
+
+    Returns:
+        True if the chart matches the selection, otherwise False.
+
+    Raises:
+        ValueError if a period is not written as two years joined by an
+            underscore.
+    """
+
+    if day_types and day_type_col in df.columns:
+        selected_day_types = {day_type.split()[0].lower()
+                              for day_type in day_types}
+        chart_day_types = {str(day_type).split()[0].lower()
+                           for day_type in df[day_type_col].dropna().unique()}
+        if not chart_day_types & selected_day_types:
+            return False
+
+    if periods:
+        period_bounds = []
+        for period in periods:
+            bounds = period.split('_')
+            if len(bounds) != 2 or not all(bound.isdigit()
+                                           for bound in bounds):
+                raise ValueError(
+                    f"Period {period} must be written as the first and last "
+                    f"year joined by an underscore (e.g. '2020_2023')")
+            period_bounds.append((int(bounds[0]), int(bounds[1])))
+
+        if years is None and year_col in df.columns:
+            years = pd.to_numeric(df[year_col]).dropna().astype(int)
+            years = years.unique().tolist()
+
+        if years is not None:
+            if not years:
+                return False
+            if not any(start <= min(years) and max(years) <= end
+                       for start, end in period_bounds):
+                return False
+
+    return True
+
+
+@instrument
+def validate_bus_data(
+        df: pd.DataFrame,
+        columns: dict[str, bool],
+        day_types: list[str]) -> list[str]:
+    """
+    Check bus ridership data for problems that would cause the analysis to
+    fail or produce misleading results.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe of bus ridership data.
+        columns (dict): Required columns mapped to whether their values must
+            be numeric.
+        day_types (strList): The day types the data may contain.
+
+    Returns:
+        List of descriptions of each problem found. The list is empty if the
+        data is valid.
+
+    Raises:
+        NONE
+    """
+
+    missing_cols = [col for col in columns if col not in df.columns]
+    if missing_cols:
+        return [f'Missing columns {missing_cols}']
+
+    problems = []
+
+    for col, is_numeric in columns.items():
+        null_count = df[col].isna().sum()
+        if null_count:
+            problems.append(f'{null_count} rows are missing values of {col}')
+        if is_numeric and not pd.api.types.is_numeric_dtype(df[col]):
+            problems.append(f'The values of {col} are not numeric')
+
+    if pd.api.types.is_numeric_dtype(df['MONTH']):
+        invalid_months = (~df['MONTH'].between(1, 12)).sum()
+        if invalid_months:
+            problems.append(
+                f'{invalid_months} rows have months outside of 1 to 12')
+
+    unknown_day_types = sorted(
+        set(df['DAY_TYPE'].dropna()) - set(day_types))
+    if unknown_day_types:
+        problems.append(f'Unknown day types {unknown_day_types}')
+
+    duplicate_count = df.duplicated(
+        subset=['ROUTE', 'YEAR', 'MONTH', 'DAY_TYPE']).sum()
+    if duplicate_count:
+        problems.append(
+            f'{duplicate_count} rows repeat a route, year, month and day type')
+
+    return problems
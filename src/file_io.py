@@ -3,11 +3,15 @@ Description: Functions for handeling processing related to input and output
 files.
 """
 
+import json
 import logging
+import os
+
 
 def create_absolute_file_paths(
         file_list: list[str],
-        file_path: str) -> list[str] | str:
+        file_path: str,
+        extension: str | None = None) -> list[str] | str:
     """
 
     Arguments:
@@ -15,6 +19,9 @@ def create_absolute_file_paths(
             path.
         file_path (str): The file path to join the files specified in
         'file_list' to.
+        extension (str): The file extension (e.g. 'svg') to replace the
+            extension of each file with. If not specified, the extensions are
+            kept. Defaults to None.
 
     Returns:
         Either a list of absolute file paths or a single absolute file
@@ -52,6 +59,9 @@ def create_absolute_file_paths(
                 f'File name {file_name} only contains the file extension and '
                 f'is missing an actual file name.')
 
+        if extension is not None:
+            file_name = f"{file_name.rsplit('.', 1)[0]}.{extension}"
+
         logging.info(
             f'Joining file path {file_path} with file {file_name}')
         abs_path = f'{file_path}{file_name}'
@@ -62,3 +72,95 @@ def create_absolute_file_paths(
         return abs_file_paths
     else:
         return abs_file_paths[0]
+
+
+def find_output_file_path(
+        file_paths: list[str],
+        labels: list[str]) -> str:
+    """
+    Find the output file whose name contains every label of a chart (e.g.
+    its day type, period and ridership tier), so that each chart is saved
+    under the name of the data it shows rather than its position in a list.
+    Only the first word of each label is compared (e.g. 'Sunday - Holiday'
+    matches 'sunday_ridership_bump_chart.png') and comparisons are not case
+    sensitive.
+
+    Arguments:
+        file_paths (strList): The file paths (or names) to search.
+        labels (strList): The labels the file name must contain (e.g.
+            'Weekday', '1999_2009' or 'medium').
+
+    Returns:
+        The first file path whose name contains every label.
+
+    Raises:
+        ValueError if no file name contains every label.
+    """
+
+    name_labels = [f"_{label.split()[0].lower()}_" for label in labels]
+
+    for file_path in file_paths:
+        base_name = file_path.split('/')[-1].lower().rsplit('.', 1)[0]
+        if all(label in f'_{base_name}_' for label in name_labels):
+            return file_path
+
+    raise ValueError(f"No output file name contains all of {labels}")
+
+
+def create_page_file_paths(file_path: str, n_pages: int) -> list[str]:
+    """
+    Create the file paths of the pages of a chart that is split into several
+    pages (e.g. '/dir1/heatmap.png' becomes '/dir1/heatmap_page_1.png',
+    '/dir1/heatmap_page_2.png', ...).
+
+    Arguments:
+        file_path (str): The file path of the whole chart.
+        n_pages (int): The number of pages.
+
+    Returns:
+        List of the file paths of each page.
+
+    Raises:
+        NONE
+    """
+
+    base_path, extension = os.path.splitext(file_path)
+
+    return [f'{base_path}_page_{page}{extension}'
+            for page in range(1, n_pages + 1)]
+
+
+def save_page_index(
+        file_path: str,
+        page_paths: list[str],
+        page_facets: list[list]) -> str:
+    """
+    Save a JSON index of the pages of a chart that is split into several
+    pages, listing the file and facet values of each page. The index is
+    saved next to the pages with the name of the whole chart followed by
+    '_index.json'.
+
+    Arguments:
+        file_path (str): The file path of the whole chart.
+        page_paths (strList): The file paths of each page.
+        page_facets (list): The facet values shown on each page.
+
+    Returns:
+        The file path of the index.
+
+    Raises:
+        NONE
+    """
+
+    index_path = f'{os.path.splitext(file_path)[0]}_index.json'
+
+    index = {
+        'chart': os.path.basename(file_path),
+        'pages': [{'file': os.path.basename(page_path), 'facets': facets}
+                  for page_path, facets in zip(page_paths, page_facets)]}
+
+    logging.info(f'Saving page index {index_path}')
+    with open(index_path, 'w') as file:
+        json.dump(index, file, indent=2)
+
+    return index_path
@@ -0,0 +1,263 @@
+"""
+Description: Functions for recording the run time, memory use and number of
+rows processed by each step of an analysis and saving them as a run report.
+"""
+
+import functools
+import json
+import logging
+import os
+import platform
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import pandas as pd
+
+
+# Records of the current run. Instrumentation is disabled (and adds no
+# overhead beyond a single check) while this is None.
+_run_report = None
+_open_records = []
+_report_lock = threading.Lock()
+
+
+def _count_rows(value) -> int | None:
+    """
+    Count the number of rows in a dataframe or a list of dataframes.
+
+    Arguments:
+        value: The value to count the rows of.
+
+    Returns:
+        Number of rows or None if the value does not contain any dataframes.
+
+    Raises:
+        NONE
+    """
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+
+    if isinstance(value, (list, tuple)):
+        row_counts = [_count_rows(element) for element in value]
+        row_counts = [count for count in row_counts if count is not None]
+        return sum(row_counts) if row_counts else None
+
+    if isinstance(value, dict):
+        return _count_rows(list(value.values()))
+
+    return None
+
+
+def start_run_report() -> None:
+    """
+    Start recording instrumented function calls and tracing memory
+    allocations. Any previously recorded calls are discarded.
+
+    Arguments:
+        NONE
+
+    Returns:
+        None
+
+    Raises:
+        NONE
+    """
+
+    global _run_report
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    with _report_lock:
+        _open_records.clear()
+        _run_report = {
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'python_version': platform.python_version(),
+            'pandas_version': pd.__version__,
+            'start_time': time.perf_counter(),
+            'start_cpu_time': time.process_time(),
+            'peak_memory': 0,
+            'records': []}
+
+
+def stop_run_report() -> dict | None:
+    """
+    Stop recording instrumented function calls and tracing memory
+    allocations.
+
+    Arguments:
+        NONE
+
+    Returns:
+        Dictionary containing the run report or None if no report was
+        started. The report contains a record of every instrumented call and a
+        summary of the calls to each function.
+
+    Raises:
+        NONE
+    """
+
+    global _run_report
+
+    with _report_lock:
+        if _run_report is None:
+            return None
+
+        run_report = _run_report
+        _run_report = None
+
+        # Instrumented calls reset the traced peak, so the peak of the run is
+        # the highest of the peaks they read before each reset and the peak
+        # since the last reset.
+        _, peak_memory = tracemalloc.get_traced_memory()
+        peak_memory = max(peak_memory, run_report.pop('peak_memory'))
+
+    tracemalloc.stop()
+
+    summary = {}
+    for record in run_report['records']:
+        function_summary = summary.setdefault(
+            record['name'],
+            {'calls': 0, 'wall_time': 0.0, 'cpu_time': 0.0,
+             'peak_memory': 0})
+        function_summary['calls'] += 1
+        function_summary['wall_time'] += record['wall_time']
+        function_summary['cpu_time'] += record['cpu_time']
+        function_summary['peak_memory'] = max(
+            function_summary['peak_memory'], record['peak_memory'])
+
+    run_report['wall_time'] = (time.perf_counter()
+                               - run_report.pop('start_time'))
+    run_report['cpu_time'] = (time.process_time()
+                              - run_report.pop('start_cpu_time'))
+    run_report['peak_memory'] = peak_memory
+    run_report['summary'] = summary
+
+    return run_report
+
+
+def save_run_report(
+        run_report: dict,
+        output_path: str) -> None:
+    """
+    Save a run report as a JSON file.
+
+    Arguments:
+        run_report (dict): Run report returned by stop_run_report.
+        output_path (str): The file path to save the run report to.
+
+    Returns:
+        None
+
+    Raises:
+        NONE
+    """
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    with open(output_path, 'w') as file:
+        json.dump(run_report, file, indent=2)
+
+    logging.info(f'Saved run report to {output_path}')
+
+
+def instrument(func=None, *, name: str | None = None, kind: str = 'function'):
+    """
+    Decorate a function so that each call records its wall time, CPU time,
+    number of rows in and out and peak memory allocated while a run report is
+    being recorded. Rows in are counted from the first dataframe argument and
+    rows out from the dataframes returned.
+
+    Memory is traced for the whole process, so the peak memory of calls that
+    run at the same time on different threads includes each other's
+    allocations. CPU time is measured for the calling thread and does not
+    include work done in other processes.
+
+    Arguments:
+        func (Callable): The function to decorate.
+        name (str): The name to record calls under. Defaults to the module
+            and name of the function.
+        kind (str): The kind of step being recorded (e.g. 'function' or
+            'stage'). Defaults to 'function'.
+
+    Returns:
+        The decorated function.
+
+    Raises:
+        NONE
+    """
+
+    if func is None:
+        return functools.partial(instrument, name=name, kind=kind)
+
+    record_name = name or f'{func.__module__}.{func.__qualname__}'
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+
+        if _run_report is None:
+            return func(*args, **kwargs)
+
+        rows_in = None
+        for value in list(args) + list(kwargs.values()):
+            rows_in = _count_rows(value)
+            if rows_in is not None:
+                break
+
+        record = {'name': record_name,
+                  'kind': kind,
+                  'thread': threading.current_thread().name}
+
+        # Memory peaks are process wide, so resetting the peak for this call
+        # first carries the peak seen so far over to every open call.
+        with _report_lock:
+            current_memory, peak_memory = tracemalloc.get_traced_memory()
+            for open_record in _open_records:
+                open_record['peak'] = max(open_record['peak'], peak_memory)
+            _run_report['peak_memory'] = max(_run_report['peak_memory'],
+                                             peak_memory)
+            tracemalloc.reset_peak()
+            record['start_memory'] = current_memory
+            record['peak'] = current_memory
+            _open_records.append(record)
+
+        start_time = time.perf_counter()
+        start_cpu_time = time.thread_time()
+
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            wall_time = time.perf_counter() - start_time
+            cpu_time = time.thread_time() - start_cpu_time
+
+            with _report_lock:
+                _, peak_memory = tracemalloc.get_traced_memory()
+                record['peak'] = max(record['peak'], peak_memory)
+                _open_records.remove(record)
+
+                if _run_report is not None:
+                    _run_report['records'].append({
+                        'name': record_name,
+                        'kind': kind,
+                        'thread': record['thread'],
+                        'wall_time': wall_time,
+                        'cpu_time': cpu_time,
+                        'rows_in': rows_in,
+                        'rows_out': None,
+                        'peak_memory': record['peak']
+                        - record['start_memory']})
+                    finished_record = _run_report['records'][-1]
+                else:
+                    finished_record = None
+
+        if finished_record is not None:
+            finished_record['rows_out'] = _count_rows(result)
+
+        return result
+
+    return wrapper
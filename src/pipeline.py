@@ -0,0 +1,788 @@
+"""
+Description: Functions for defining and running the stages of an analysis as
+a dependency graph.
+"""
+
+import dataclasses
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+from concurrent.futures import (FIRST_COMPLETED,
+                                ThreadPoolExecutor,
+                                wait)
+from dataclasses import (dataclass, field)
+from datetime import (datetime, timezone)
+from typing import Callable
+
+import pandas as pd
+
+from instrumentation import instrument
+
+
+@dataclass
+class Stage:
+    """
+    A named step of an analysis. The stage function is called with the
+    values named in 'inputs' as keyword arguments and must return a
+    dictionary containing a value for each name in 'outputs'. Outputs listed
+    in 'file_outputs' are file paths (or lists of file paths) written by the
+    stage, which must still exist for a cached result to be reused.
+    """
+    name: str
+    func: Callable[..., dict]
+    inputs: list[str] = field(default_factory=list)
+    outputs: list[str] = field(default_factory=list)
+    file_outputs: list[str] = field(default_factory=list)
+
+
+def fingerprint_value(value) -> str:
+    """
+    Create a hash of the content of a value used as a stage input. Dataframes
+    are hashed by their values, columns and data types, dataclasses (e.g. the
+    chart arguments in constants.py) by their fields and strings that are
+    paths to existing files by the content of the file.
+
+    Arguments:
+        value: The value to hash.
+
+    Returns:
+        Hexadecimal SHA-256 hash of the value.
+
+    Raises:
+        NONE
+    """
+
+    hasher = hashlib.sha256()
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        hasher.update(b'frame')
+        hasher.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+        if isinstance(value, pd.DataFrame):
+            hasher.update(repr(list(value.columns)).encode())
+            hasher.update(repr(list(value.dtypes.astype(str))).encode())
+        else:
+            hasher.update(repr((value.name, str(value.dtype))).encode())
+
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        hasher.update(type(value).__name__.encode())
+        hasher.update(fingerprint_value(dataclasses.asdict(value)).encode())
+
+    elif isinstance(value, dict):
+        hasher.update(b'dict')
+        for key in sorted(value, key=repr):
+            hasher.update(repr(key).encode())
+            hasher.update(fingerprint_value(value[key]).encode())
+
+    elif isinstance(value, (list, tuple)):
+        hasher.update(type(value).__name__.encode())
+        for element in value:
+            hasher.update(fingerprint_value(element).encode())
+
+    elif isinstance(value, str) and os.path.isfile(value):
+        hasher.update(b'file')
+        with open(value, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                hasher.update(chunk)
+
+    else:
+        hasher.update(repr(value).encode())
+
+    return hasher.hexdigest()
+
+
+def _get_global_names(code) -> set[str]:
+    """
+    Get the names of the globals and attributes used by a code object,
+    including those used by the functions and comprehensions defined in it.
+
+    Arguments:
+        code (CodeType): The code object of a function.
+
+    Returns:
+        Set of names.
+
+    Raises:
+        NONE
+    """
+
+    names = set(code.co_names)
+    for constant in code.co_consts:
+        if inspect.iscode(constant):
+            names |= _get_global_names(constant)
+
+    return names
+
+
+def _is_project_code(value, code_dir: str) -> bool:
+    """
+    Check whether a function, class or module is defined in a module of a
+    directory.
+
+    Arguments:
+        value: The function, class or module to check.
+        code_dir (str): The directory containing the modules of the project.
+
+    Returns:
+        True if 'value' is defined in a module of 'code_dir', otherwise
+        False.
+
+    Raises:
+        NONE
+    """
+
+    try:
+        source_file = inspect.getsourcefile(value)
+    except TypeError:
+        return False
+
+    return (source_file is not None
+            and os.path.dirname(os.path.abspath(source_file)) == code_dir)
+
+
+@functools.lru_cache
+def _get_code_fingerprint(func: Callable) -> str:
+    """
+    Create a hash of the source of a stage function and of every function in
+    the same directory that it calls, directly or through other functions
+    (e.g. in visualizations.py), so that changes to any of them change the
+    key of the stage.
+
+    Public module level values the functions use (e.g. viz_file_names) are
+    hashed by their content instead of their module's source, so editing a
+    data-only module like constants.py only changes the keys of the stages
+    that use the edited value. Dataclasses are left out, since their
+    instances are fingerprinted as stage inputs, as is private module state
+    (e.g. caches), which changes while the analysis runs.
+
+    Arguments:
+        func (Callable): The stage function.
+
+    Returns:
+        Hexadecimal SHA-256 hash.
+
+    Raises:
+        OSError if the source of the stage function is not available.
+        TypeError if the stage function is a built-in function.
+    """
+
+    func = inspect.unwrap(func)
+    code_dir = os.path.dirname(os.path.abspath(inspect.getsourcefile(func)))
+
+    hasher = hashlib.sha256()
+    hasher.update(inspect.getsource(func).encode())
+
+    visited = {id(func)}
+    pending = [func]
+
+    while pending:
+        current = pending.pop()
+        global_values = getattr(current, '__globals__', {})
+
+        for name in sorted(_get_global_names(current.__code__)):
+            values = []
+            if name in global_values:
+                values.append(global_values[name])
+            values += [getattr(value, name) for value in global_values.values()
+                       if inspect.ismodule(value)
+                       and _is_project_code(value, code_dir)
+                       and hasattr(value, name)]
+
+            for value in values:
+                if id(value) in visited:
+                    continue
+                visited.add(id(value))
+
+                if inspect.isfunction(inspect.unwrap(value)):
+                    value = inspect.unwrap(value)
+                    if _is_project_code(value, code_dir):
+                        hasher.update(name.encode())
+                        hasher.update(inspect.getsource(value).encode())
+                        pending.append(value)
+
+                elif inspect.isclass(value):
+                    if (not dataclasses.is_dataclass(value)
+                            and _is_project_code(value, code_dir)):
+                        hasher.update(name.encode())
+                        hasher.update(inspect.getsource(value).encode())
+
+                elif not (inspect.ismodule(value)
+                          or callable(value)
+                          or name.startswith('_')
+                          or dataclasses.is_dataclass(value)):
+                    hasher.update(name.encode())
+                    hasher.update(fingerprint_value(value).encode())
+
+    return hasher.hexdigest()
+
+
+def _get_stage_key(
+        stage: Stage,
+        input_fingerprints: dict) -> str:
+    """
+    Create a hash identifying a stage run from the stage's code, the code and
+    values it uses and the fingerprints of its inputs.
+
+    Arguments:
+        stage (Stage): The stage to create a key for.
+        input_fingerprints (dict): Fingerprints of the stage inputs keyed by
+            name.
+
+    Returns:
+        Hexadecimal SHA-256 hash.
+
+    Raises:
+        NONE
+    """
+
+    hasher = hashlib.sha256()
+    hasher.update(stage.name.encode())
+
+    try:
+        hasher.update(_get_code_fingerprint(stage.func).encode())
+    except (OSError, TypeError):
+        hasher.update(stage.func.__qualname__.encode())
+
+    for name in stage.inputs:
+        hasher.update(name.encode())
+        hasher.update(input_fingerprints[name].encode())
+
+    return hasher.hexdigest()
+
+
+def _files_exist(paths) -> bool:
+    """
+    Check whether a file path or every file path in a (nested) list exists.
+
+    Arguments:
+        paths (str or strList): File paths to check.
+
+    Returns:
+        True if every file exists, otherwise False.
+
+    Raises:
+        NONE
+    """
+
+    if isinstance(paths, (list, tuple)):
+        return all(_files_exist(path) for path in paths)
+
+    return os.path.isfile(paths)
+
+
+def _load_cached_outputs(
+        stage: Stage,
+        cache_path: str) -> dict | None:
+    """
+    Load the outputs of a previous run of a stage if they are still valid.
+
+    Arguments:
+        stage (Stage): The stage to load outputs for.
+        cache_path (str): The file path the outputs were cached to.
+
+    Returns:
+        Dictionary of stage outputs or None if there is no valid cached
+        result.
+
+    Raises:
+        NONE
+    """
+
+    if not os.path.isfile(cache_path):
+        return None
+
+    try:
+        with open(cache_path, 'rb') as file:
+            stage_outputs = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        logging.warning(f'Ignoring unreadable cache file {cache_path}')
+        return None
+
+    for name in stage.file_outputs:
+        if not _files_exist(stage_outputs.get(name, [])):
+            return None
+
+    return stage_outputs
+
+
+def _save_cached_outputs(
+        stage_outputs: dict,
+        cache_path: str) -> None:
+    """
+    Save the outputs of a stage so that they can be reused by later runs.
+    Outputs are written to a temporary file first so that an interrupted
+    write never leaves a partial cache file behind.
+
+    Arguments:
+        stage_outputs (dict): The outputs of the stage keyed by name.
+        cache_path (str): The file path to cache the outputs to.
+
+    Returns:
+        None
+
+    Raises:
+        NONE
+    """
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f'{cache_path}.tmp'
+
+    with open(tmp_path, 'wb') as file:
+        pickle.dump(stage_outputs, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    os.replace(tmp_path, cache_path)
+
+
+def load_run_manifest(checkpoint_dir: str) -> dict | None:
+    """
+    Load the manifest of the last run that saved checkpoints to a directory.
+
+    Arguments:
+        checkpoint_dir (str): The directory checkpoints were saved to.
+
+    Returns:
+        Dictionary containing the status of the run and of each stage that
+        started or None if there is no readable manifest.
+
+    Raises:
+        NONE
+    """
+
+    manifest_path = os.path.join(checkpoint_dir, 'run_manifest.json')
+
+    if not os.path.isfile(manifest_path):
+        return None
+
+    try:
+        with open(manifest_path) as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        logging.warning(f'Ignoring unreadable run manifest {manifest_path}')
+        return None
+
+
+def _save_run_manifest(
+        run_manifest: dict,
+        checkpoint_dir: str) -> None:
+    """
+    Save the manifest of a run. The manifest is written to a temporary file
+    first so that an interrupted write never leaves a partial manifest
+    behind.
+
+    Arguments:
+        run_manifest (dict): The status of the run and of each stage.
+        checkpoint_dir (str): The directory to save the manifest to.
+
+    Returns:
+        None
+
+    Raises:
+        NONE
+    """
+
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    manifest_path = os.path.join(checkpoint_dir, 'run_manifest.json')
+    tmp_path = f'{manifest_path}.tmp'
+
+    with open(tmp_path, 'w') as file:
+        json.dump(run_manifest, file, indent=2)
+
+    os.replace(tmp_path, manifest_path)
+
+
+def validate_stages(
+        stages: list[Stage],
+        initial_values: list[str]) -> None:
+    """
+    Confirm that a list of stages forms a valid dependency graph.
+
+    Arguments:
+        stages (StageList): The stages to validate.
+        initial_values (strList): The names of values that are available
+            before any stage runs (e.g. input file paths).
+
+    Returns:
+        None
+
+    Raises:
+        ValueError if two stages have the same name.
+        ValueError if a value is produced by more than one stage or is both
+            produced by a stage and provided as an initial value.
+        ValueError if a stage requires a value that is never produced.
+        ValueError if the stages contain a cycle.
+    """
+
+    stage_names = [stage.name for stage in stages]
+    if len(stage_names) != len(set(stage_names)):
+        raise ValueError("Stage names must be unique")
+
+    producers = {name: None for name in initial_values}
+
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producers:
+                raise ValueError(
+                    f"The value '{output}' of stage '{stage.name}' is "
+                    f"already provided elsewhere")
+            producers[output] = stage.name
+
+    for stage in stages:
+        for stage_input in stage.inputs:
+            if stage_input not in producers:
+                raise ValueError(
+                    f"The input '{stage_input}' of stage '{stage.name}' is "
+                    f"not produced by any stage")
+
+    # Repeatedly remove stages whose inputs are all available. Any stages
+    # left over depend on each other.
+    available = set(initial_values)
+    remaining = list(stages)
+
+    while remaining:
+        ready = [stage for stage in remaining
+                 if set(stage.inputs) <= available]
+        if not ready:
+            raise ValueError(
+                f"The stages {[stage.name for stage in remaining]} contain "
+                f"a cycle")
+        for stage in ready:
+            available.update(stage.outputs)
+            remaining.remove(stage)
+
+
+def select_stages(
+        stages: list[Stage],
+        targets: list[str]) -> list[Stage]:
+    """
+    Select the stages required to run a set of target stages, i.e. the
+    targets and every stage they depend on directly or indirectly. All other
+    stages are removed.
+
+    Arguments:
+        stages (StageList): The stages to select from.
+        targets (strList): The names of the stages to run.
+
+    Returns:
+        List of the selected stages in their original order.
+
+    Raises:
+        ValueError if a target is not the name of a stage.
+    """
+
+    stages_by_name = {stage.name: stage for stage in stages}
+    producers = {output: stage.name
+                 for stage in stages for output in stage.outputs}
+
+    unknown_targets = [name for name in targets if name not in stages_by_name]
+    if unknown_targets:
+        raise ValueError(f"Unknown stages {unknown_targets}")
+
+    selected = set()
+    to_visit = list(targets)
+
+    while to_visit:
+        name = to_visit.pop()
+        if name in selected:
+            continue
+        selected.add(name)
+        to_visit += [producers[stage_input]
+                     for stage_input in stages_by_name[name].inputs
+                     if stage_input in producers]
+
+    return [stage for stage in stages if stage.name in selected]
+
+
+def _record_stage_outputs(
+        stage: Stage,
+        stage_outputs: dict,
+        stage_key: str | None,
+        memory_cache: dict | None,
+        checkpoint_dir: str | None,
+        run_manifest: dict | None) -> None:
+    """
+    Keep the outputs of a completed stage in the memory cache and save them
+    as a checkpoint recorded in the run manifest.
+
+    Arguments:
+        stage (Stage): The completed stage.
+        stage_outputs (dict): The outputs of the stage keyed by name.
+        stage_key (str): The hash identifying the stage run.
+        memory_cache (dict): Dictionary caching stage outputs in memory or
+            None.
+        checkpoint_dir (str): The directory to save checkpoints to or None.
+        run_manifest (dict): The manifest of the current run or None.
+
+    Returns:
+        None
+
+    Raises:
+        NONE
+    """
+
+    if memory_cache is not None:
+        memory_cache[stage.name] = (stage_key, stage_outputs)
+
+    if checkpoint_dir is None:
+        return
+
+    checkpoint_path = os.path.join(
+        checkpoint_dir, 'stages', f'{stage.name}.pkl')
+    _save_cached_outputs(
+        stage_outputs=stage_outputs,
+        cache_path=checkpoint_path)
+
+    run_manifest['stages'][stage.name] = {
+        'status': 'completed',
+        'key': stage_key,
+        'checkpoint': checkpoint_path,
+        'files': {name: stage_outputs[name] for name in stage.file_outputs}}
+    _save_run_manifest(
+        run_manifest=run_manifest,
+        checkpoint_dir=checkpoint_dir)
+
+
+def run_stages(
+        stages: list[Stage],
+        initial_values: dict,
+        max_workers: int = 1,
+        cache_dir: str | None = None,
+        memory_cache: dict | None = None,
+        checkpoint_dir: str | None = None,
+        resume: bool = False,
+        rerun_stages: list[str] | None = None) -> dict:
+    """
+    Run a list of stages, starting each stage as soon as all of its inputs
+    are available. Independent stages run concurrently on a pool of worker
+    threads so the total run time follows the longest chain of dependent
+    stages rather than the sum of all stages.
+
+    If a cache directory is specified, the outputs of each stage are saved
+    under a hash of the stage's code and the content of its inputs. Stages
+    whose code and inputs have not changed since a previous run reuse the
+    saved outputs instead of running again. A memory cache works the same
+    way for repeated runs in one process (e.g. while watching for new data)
+    and holds the latest outputs of each stage.
+
+    If a checkpoint directory is specified, the outputs of each completed
+    stage are saved to it and a run manifest records the status of every
+    stage and the files it wrote. Resuming a run that failed or was
+    interrupted reuses the checkpoints of its completed stages, as long as
+    their code and inputs have not changed, and continues from the first
+    incomplete stage.
+
+    Arguments:
+        stages (StageList): The stages to run.
+        initial_values (dict): Values available before any stage runs, keyed
+            by name.
+        max_workers (int): The maximum number of stages to run at the same
+            time. Defaults to one which runs stages one at a time.
+        cache_dir (str): The directory to cache stage outputs in. If not
+            specified, stage outputs are not cached. Defaults to None.
+        memory_cache (dict): Dictionary to cache stage outputs in between
+            calls. It is updated with the key and outputs of each stage that
+            runs. If not specified, stage outputs are not cached in memory.
+            Defaults to None.
+        checkpoint_dir (str): The directory to save the run manifest and the
+            outputs of each completed stage to. If not specified, no
+            checkpoints are saved. Defaults to None.
+        resume (bool): Whether to reuse the checkpoints of the previous run
+            saved to 'checkpoint_dir'. Defaults to False.
+        rerun_stages (strList): The names of stages that always run instead
+            of reusing cached outputs or checkpoints (e.g. stages that save
+            files that must be written again). Their outputs are still
+            cached. Defaults to None.
+
+    Returns:
+        Dictionary containing the initial values and the outputs of every
+        stage keyed by name.
+
+    Raises:
+        ValueError if the stages do not form a valid dependency graph.
+        ValueError if max_workers is less than one.
+        ValueError if resume is True and checkpoint_dir is not specified.
+        KeyError if a stage does not return one of its outputs.
+    """
+
+    if max_workers < 1:
+        raise ValueError("The value of 'max_workers' must be at least one")
+
+    if resume and checkpoint_dir is None:
+        raise ValueError("A 'checkpoint_dir' is required to resume a run")
+
+    validate_stages(stages=stages, initial_values=list(initial_values))
+
+    values = dict(initial_values)
+    fingerprints = {}
+    stage_keys = {}
+    cache_paths = {}
+    pending = list(stages)
+    running = {}
+
+    use_keys = (cache_dir is not None
+                or memory_cache is not None
+                or checkpoint_dir is not None)
+
+    previous_manifest = None
+    run_manifest = None
+
+    if checkpoint_dir is not None:
+        if resume:
+            previous_manifest = load_run_manifest(
+                checkpoint_dir=checkpoint_dir)
+            if previous_manifest is None:
+                logging.info(
+                    f'No run to resume in {checkpoint_dir}, starting a new '
+                    f'run')
+
+        run_manifest = {
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'status': 'running',
+            'stages': {}}
+        _save_run_manifest(
+            run_manifest=run_manifest,
+            checkpoint_dir=checkpoint_dir)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or running:
+
+                # Start every stage whose inputs are available.
+                for stage in [stage for stage in pending
+                              if all(name in values
+                                     for name in stage.inputs)]:
+                    pending.remove(stage)
+
+                    if use_keys:
+                        for name in stage.inputs:
+                            if name not in fingerprints:
+                                fingerprints[name] = fingerprint_value(
+                                    values[name])
+
+                        stage_keys[stage.name] = _get_stage_key(
+                            stage=stage,
+                            input_fingerprints=fingerprints)
+
+                    stage_outputs = None
+                    reuse_outputs = stage.name not in (rerun_stages or [])
+
+                    if reuse_outputs and previous_manifest is not None:
+                        stage_record = previous_manifest['stages'].get(
+                            stage.name, {})
+                        if (stage_record.get('status') == 'completed'
+                                and stage_record.get('key')
+                                == stage_keys[stage.name]):
+                            stage_outputs = _load_cached_outputs(
+                                stage=stage,
+                                cache_path=stage_record['checkpoint'])
+
+                    if (reuse_outputs
+                            and stage_outputs is None
+                            and memory_cache is not None):
+                        cached_key, cached_outputs = memory_cache.get(
+                            stage.name, (None, None))
+                        if (cached_key == stage_keys[stage.name]
+                                and all(_files_exist(cached_outputs[name])
+                                        for name in stage.file_outputs)):
+                            stage_outputs = cached_outputs
+
+                    if stage_outputs is None and cache_dir is not None:
+                        cache_paths[stage.name] = os.path.join(
+                            cache_dir,
+                            stage.name,
+                            f'{stage_keys[stage.name]}.pkl')
+
+                        if reuse_outputs:
+                            stage_outputs = _load_cached_outputs(
+                                stage=stage,
+                                cache_path=cache_paths[stage.name])
+
+                    if stage_outputs is not None:
+                        logging.info(
+                            f'Reusing cached outputs of stage {stage.name}')
+                        values.update(
+                            {name: stage_outputs[name]
+                             for name in stage.outputs})
+                        _record_stage_outputs(
+                            stage=stage,
+                            stage_outputs=stage_outputs,
+                            stage_key=stage_keys.get(stage.name),
+                            memory_cache=memory_cache,
+                            checkpoint_dir=checkpoint_dir,
+                            run_manifest=run_manifest)
+                        continue
+
+                    logging.info(f'Starting stage {stage.name}')
+                    stage_inputs = {name: values[name]
+                                    for name in stage.inputs}
+                    stage_func = instrument(
+                        stage.func, name=stage.name, kind='stage')
+                    running[executor.submit(stage_func, **stage_inputs)] = \
+                        stage
+
+                    if run_manifest is not None:
+                        run_manifest['stages'][stage.name] = {
+                            'status': 'running'}
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    stage = running.pop(future)
+
+                    try:
+                        stage_outputs = future.result()
+                    except Exception as error:
+                        if run_manifest is not None:
+                            run_manifest['stages'][stage.name] = {
+                                'status': 'failed',
+                                'error': repr(error)}
+                        raise
+
+                    for name in stage.outputs:
+                        if name not in stage_outputs:
+                            raise KeyError(
+                                f"Stage '{stage.name}' did not return its "
+                                f"output '{name}'")
+                        values[name] = stage_outputs[name]
+
+                    stage_outputs = {name: stage_outputs[name]
+                                     for name in stage.outputs}
+
+                    if cache_dir is not None:
+                        _save_cached_outputs(
+                            stage_outputs=stage_outputs,
+                            cache_path=cache_paths[stage.name])
+
+                    _record_stage_outputs(
+                        stage=stage,
+                        stage_outputs=stage_outputs,
+                        stage_key=stage_keys.get(stage.name),
+                        memory_cache=memory_cache,
+                        checkpoint_dir=checkpoint_dir,
+                        run_manifest=run_manifest)
+
+                    logging.info(f'Finished stage {stage.name}')
+
+    except BaseException:
+        if run_manifest is not None:
+            run_manifest['status'] = 'failed'
+            for stage_record in run_manifest['stages'].values():
+                if stage_record['status'] == 'running':
+                    stage_record['status'] = 'interrupted'
+            _save_run_manifest(
+                run_manifest=run_manifest,
+                checkpoint_dir=checkpoint_dir)
+        raise
+
+    if run_manifest is not None:
+        run_manifest['status'] = 'completed'
+        _save_run_manifest(
+            run_manifest=run_manifest,
+            checkpoint_dir=checkpoint_dir)
+
+    return values
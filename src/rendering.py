@@ -0,0 +1,536 @@
+"""
+Description: Functions for rendering charts to image files, either in the
+current process or in parallel across processes.
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import (ProcessPoolExecutor, as_completed)
+from typing import Callable
+
+from constants import (RendererArguments, chart_output_formats)
+
+
+# Worker processes are shared by every call to render_charts so that each
+# worker only pays the cost of importing altair and starting the renderer
+# once per run.
+_executor = None
+_executor_workers = 0
+_executor_renderer_args = None
+_executor_lock = threading.Lock()
+
+# Renderer shared by every chart created in this process.
+_chart_renderer = None
+_renderer_args = RendererArguments()
+_renderer_lock = threading.Lock()
+_registered_font_dirs = set()
+
+
+class ChartRenderer:
+    """
+    Converts altair charts to PNG, SVG, HTML or Vega-Lite JSON files with
+    settings shared by every chart (scale factor, pixels per inch, theme and
+    fonts).
+
+    Charts are converted directly from their Vega-Lite specification rather
+    than through chart.save, which repeats the same lookups and conversions
+    for every chart. Only PNG and SVG files are rendered with vl-convert. Its
+    engine is started once when the renderer is warmed up and reused for
+    every chart after that. Charts whose specification, data and settings
+    match an existing output are not converted again.
+    """
+
+    def __init__(self, renderer_args: RendererArguments | None = None):
+        """
+        Arguments:
+            renderer_args (RendererArguments): Settings shared by every
+                chart. Defaults to the settings in constants.py.
+
+        Raises:
+            ValueError if the output format of 'renderer_args' is not
+                supported.
+        """
+
+        import vl_convert as vlc
+        from altair.utils._importers import vl_version_for_vl_convert
+
+        self.renderer_args = renderer_args or RendererArguments()
+        self._vlc = vlc
+        self._vl_version = vl_version_for_vl_convert()
+
+        if self.renderer_args.output_format not in chart_output_formats:
+            raise ValueError(
+                f"Unsupported output format "
+                f"{self.renderer_args.output_format}. Choose from "
+                f"{chart_output_formats}")
+
+        for font_dir in self.renderer_args.font_dirs:
+            if font_dir not in _registered_font_dirs:
+                vlc.register_font_directory(font_dir)
+                _registered_font_dirs.add(font_dir)
+
+    def warm_up(self) -> None:
+        """
+        Start the vl-convert engine by rendering an empty chart so that the
+        first chart of a batch is not slowed down by engine start up. The
+        engine is not started if the configured output format is not
+        rendered.
+
+        Arguments:
+            NONE
+
+        Returns:
+            None
+
+        Raises:
+            NONE
+        """
+
+        if self.renderer_args.output_format not in ['png', 'svg']:
+            return
+
+        self._vlc.vegalite_to_png(
+            {'mark': 'point', 'data': {'values': []}},
+            vl_version=self._vl_version)
+
+    def get_spec_hash(self, spec: dict, output_format: str) -> str:
+        """
+        Hash a Vega-Lite specification (including its data) together with
+        every setting that changes how it is saved, so that two charts with
+        the same hash produce identical files.
+
+        Arguments:
+            spec (dict): The Vega-Lite specification of the chart.
+            output_format (str): The format the chart is saved in.
+
+        Returns:
+            Hexadecimal SHA-256 hash.
+
+        Raises:
+            NONE
+        """
+
+        spec_hash = hashlib.sha256()
+        spec_hash.update(json.dumps(
+            [output_format,
+             self._vl_version,
+             self.renderer_args.scale_factor,
+             self.renderer_args.ppi,
+             self.renderer_args.theme,
+             self.renderer_args.font_dirs]).encode('utf-8'))
+        spec_hash.update(json.dumps(spec, sort_keys=True).encode('utf-8'))
+
+        return spec_hash.hexdigest()
+
+    def convert(self, spec: dict, output_format: str) -> bytes | str:
+        """
+        Convert a Vega-Lite specification to a file in the specified format.
+
+        Arguments:
+            spec (dict): The Vega-Lite specification of the chart.
+            output_format (str): One of 'png', 'svg', 'html' or 'json'.
+
+        Returns:
+            Bytes of the PNG image or text of the SVG image, HTML page or
+            JSON specification.
+
+        Raises:
+            ValueError if the output format is not supported.
+        """
+
+        if output_format == 'png':
+            return self._vlc.vegalite_to_png(
+                spec,
+                vl_version=self._vl_version,
+                scale=self.renderer_args.scale_factor,
+                ppi=self.renderer_args.ppi,
+                theme=self.renderer_args.theme)
+
+        if output_format == 'svg':
+            return self._vlc.vegalite_to_svg(
+                spec,
+                vl_version=self._vl_version,
+                theme=self.renderer_args.theme)
+
+        if output_format == 'html':
+            import altair as alt
+
+            return alt.utils.spec_to_html(
+                spec,
+                mode='vega-lite',
+                vegalite_version=alt.VEGALITE_VERSION,
+                vegaembed_version=alt.VEGAEMBED_VERSION,
+                vega_version=alt.VEGA_VERSION)
+
+        if output_format == 'json':
+            return json.dumps(spec)
+
+        raise ValueError(
+            f"Unsupported output format {output_format}. Choose from "
+            f"{chart_output_formats}")
+
+    def save(self, chart, output_path: str) -> bool:
+        """
+        Save a chart in the format given by the extension of the output path.
+
+        Arguments:
+            chart (Chart): The altair chart to save.
+            output_path (str): The file path to save the chart to. Must end
+                with '.png', '.svg', '.html' or '.json'.
+
+        Returns:
+            True if the chart was converted and saved, or False if an
+            identical output already existed.
+
+        Raises:
+            ValueError if the format of 'output_path' is not supported.
+        """
+
+        return self.save_spec(spec=chart.to_dict(), output_path=output_path)
+
+    def save_spec(self, spec: dict, output_path: str) -> bool:
+        """
+        Save a Vega-Lite specification in the format given by the extension
+        of the output path. If unchanged charts are skipped, the hash of the
+        chart is recorded in a sidecar file in a '.chart_hashes' directory
+        next to the output, and the chart is only converted if the hash or
+        the output file changed.
+
+        Arguments:
+            spec (dict): The Vega-Lite specification of the chart.
+            output_path (str): The file path to save the chart to. Must end
+                with '.png', '.svg', '.html' or '.json'.
+
+        Returns:
+            True if the chart was converted and saved, or False if an
+            identical output already existed.
+
+        Raises:
+            ValueError if the format of 'output_path' is not supported.
+        """
+
+        output_format = os.path.splitext(output_path)[1].lower().lstrip('.')
+
+        if output_format not in chart_output_formats:
+            raise ValueError(
+                f"Unsupported output file {output_path}, charts can only be "
+                f"saved as {chart_output_formats} files")
+
+        if not self.renderer_args.skip_unchanged:
+            _write_output(
+                output=self.convert(spec=spec, output_format=output_format),
+                output_path=output_path)
+            return True
+
+        spec_hash = self.get_spec_hash(spec=spec, output_format=output_format)
+        sidecar_path = _get_sidecar_path(output_path=output_path)
+
+        recorded_hash = _load_sidecar(
+            sidecar_path=sidecar_path,
+            output_path=output_path)
+
+        if recorded_hash == spec_hash:
+            logging.info(f'Skipping unchanged chart {output_path}')
+            return False
+
+        # The old sidecar is removed first so that a partially written output
+        # is never mistaken for a complete one.
+        if os.path.isfile(sidecar_path):
+            os.remove(sidecar_path)
+
+        _write_output(
+            output=self.convert(spec=spec, output_format=output_format),
+            output_path=output_path)
+
+        os.makedirs(os.path.dirname(sidecar_path), exist_ok=True)
+        with open(sidecar_path, 'w') as file:
+            json.dump({'spec_hash': spec_hash,
+                       'output_size': os.path.getsize(output_path)}, file)
+
+        return True
+
+    def save_batch(self, charts: list[tuple]) -> list[str]:
+        """
+        Save a batch of charts in the formats given by their output paths.
+
+        Arguments:
+            charts (list): List of (chart, output path) tuples.
+
+        Returns:
+            List of the output paths of each chart saved.
+
+        Raises:
+            ValueError if the format of an output path is not supported.
+        """
+
+        for chart, output_path in charts:
+            self.save(chart=chart, output_path=output_path)
+
+        return [output_path for _, output_path in charts]
+
+
+def _get_sidecar_path(output_path: str) -> str:
+    """
+    Get the file path of the sidecar file recording the hash of a chart.
+
+    Arguments:
+        output_path (str): The file path of the chart.
+
+    Returns:
+        File path of the sidecar file.
+
+    Raises:
+        NONE
+    """
+
+    output_dir, file_name = os.path.split(output_path)
+
+    return os.path.join(output_dir, '.chart_hashes', f'{file_name}.json')
+
+
+def _load_sidecar(sidecar_path: str, output_path: str) -> str | None:
+    """
+    Load the hash of the chart saved at an output path from its sidecar file.
+
+    Arguments:
+        sidecar_path (str): The file path of the sidecar file.
+        output_path (str): The file path of the chart.
+
+    Returns:
+        The recorded hash, or None if the sidecar file or the chart is
+        missing, or the chart's size differs from the one recorded.
+
+    Raises:
+        NONE
+    """
+
+    try:
+        with open(sidecar_path) as file:
+            sidecar = json.load(file)
+        output_size = os.path.getsize(output_path)
+    except (OSError, ValueError):
+        return None
+
+    if sidecar.get('output_size') != output_size:
+        return None
+
+    return sidecar.get('spec_hash')
+
+
+def _write_output(output: bytes | str, output_path: str) -> None:
+    """
+    Write a converted chart to a file.
+
+    Arguments:
+        output (bytes or str): Bytes of an image or text of a file.
+        output_path (str): The file path to write to.
+
+    Returns:
+        None
+
+    Raises:
+        NONE
+    """
+
+    if isinstance(output, bytes):
+        with open(output_path, 'wb') as file:
+            file.write(output)
+    else:
+        with open(output_path, 'w', encoding='utf-8') as file:
+            file.write(output)
+
+
+def configure_chart_renderer(
+        renderer_args: RendererArguments | None = None,
+        warm_up: bool = False) -> None:
+    """
+    Set the settings of the renderer shared by every chart created in this
+    process. The renderer is created when the first chart is saved, or
+    immediately if it should be warmed up, and is only replaced if the
+    settings change.
+
+    Arguments:
+        renderer_args (RendererArguments): Settings shared by every chart.
+            Defaults to the settings in constants.py.
+        warm_up (bool): Whether to create the renderer and start the
+            vl-convert engine immediately. Defaults to False.
+
+    Returns:
+        None
+
+    Raises:
+        ValueError if the output format of 'renderer_args' is not supported.
+    """
+
+    global _renderer_args
+
+    renderer_args = renderer_args or RendererArguments()
+    if renderer_args.output_format not in chart_output_formats:
+        raise ValueError(
+            f"Unsupported output format {renderer_args.output_format}. "
+            f"Choose from {chart_output_formats}")
+
+    with _renderer_lock:
+        _renderer_args = renderer_args
+
+    if warm_up:
+        get_chart_renderer().warm_up()
+
+
+def get_chart_renderer() -> ChartRenderer:
+    """
+    Get the renderer shared by every chart created in this process, creating
+    it with the configured settings if it does not exist yet.
+
+    Arguments:
+        NONE
+
+    Returns:
+        The shared chart renderer.
+
+    Raises:
+        NONE
+    """
+
+    global _chart_renderer
+
+    with _renderer_lock:
+        if (_chart_renderer is None
+                or _chart_renderer.renderer_args != _renderer_args):
+            _chart_renderer = ChartRenderer(renderer_args=_renderer_args)
+
+        return _chart_renderer
+
+
+def _get_executor(n_workers: int) -> ProcessPoolExecutor:
+    """
+    Get the shared pool of rendering processes, creating it if it does not
+    exist or has a different number of workers.
+
+    Arguments:
+        n_workers (int): The number of worker processes.
+
+    Returns:
+        Process pool executor.
+
+    Raises:
+        NONE
+    """
+
+    global _executor, _executor_workers, _executor_renderer_args
+
+    renderer_args = _renderer_args
+
+    with _executor_lock:
+        if (_executor is None
+                or _executor_workers != n_workers
+                or _executor_renderer_args != renderer_args):
+            if _executor is not None:
+                _executor.shutdown()
+
+            # Charts are rendered while other stages run on threads, so new
+            # processes are spawned rather than forked from a process that
+            # may hold locks in other threads. Each worker starts its
+            # renderer with the settings of this process.
+            _executor = ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=configure_chart_renderer,
+                initargs=(renderer_args, True))
+            _executor_workers = n_workers
+            _executor_renderer_args = renderer_args
+
+        return _executor
+
+
+def shutdown_render_executor() -> None:
+    """
+    Shut down the shared pool of rendering processes if it exists.
+
+    Arguments:
+        NONE
+
+    Returns:
+        None
+
+    Raises:
+        NONE
+    """
+
+    global _executor, _executor_workers, _executor_renderer_args
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+        _executor = None
+        _executor_workers = 0
+        _executor_renderer_args = None
+
+
+def render_charts(
+        chart_func: Callable[..., None],
+        chart_kwargs: list[dict],
+        n_workers: int = 1) -> list[str]:
+    """
+    Create a set of charts with the same chart function (e.g. create_heatmap)
+    and collect the result of each chart. If a chart fails, the remaining
+    charts are still created and every failure is reported together once all
+    charts are finished.
+
+    Arguments:
+        chart_func (Callable): Function that creates a chart and saves it to
+            the file path passed as 'output_path'. Must be defined at the top
+            level of a module so that it can be sent to worker processes.
+        chart_kwargs (dictList): Keyword arguments of each chart. Each must
+            contain an 'output_path'.
+        n_workers (int): The number of processes used to create charts. If
+            one, charts are created in the current process. Defaults to 1.
+
+    Returns:
+        List of the output paths of the charts created in the order of
+        'chart_kwargs'.
+
+    Raises:
+        ValueError if the value of 'n_workers' is less than one.
+        RuntimeError if any chart could not be created.
+    """
+
+    if n_workers < 1:
+        raise ValueError("The value of 'n_workers' must be at least one")
+
+    failures = {}
+
+    if n_workers == 1 or len(chart_kwargs) < 2:
+        for kwargs in chart_kwargs:
+            try:
+                chart_func(**kwargs)
+            except Exception as error:
+                logging.error(
+                    f"Failed to create {kwargs['output_path']}: {error!r}")
+                failures[kwargs['output_path']] = error
+
+    else:
+        executor = _get_executor(n_workers=n_workers)
+        futures = {executor.submit(chart_func, **kwargs): kwargs['output_path']
+                   for kwargs in chart_kwargs}
+
+        for future in as_completed(futures):
+            output_path = futures[future]
+            try:
+                future.result()
+            except Exception as error:
+                logging.error(f"Failed to create {output_path}: {error!r}")
+                failures[output_path] = error
+            else:
+                logging.info(f'Created {output_path}')
+
+    if failures:
+        raise RuntimeError(
+            f'Failed to create {len(failures)} of {len(chart_kwargs)} '
+            f'charts: {list(failures)}')
+
+    return [kwargs['output_path'] for kwargs in chart_kwargs]
@@ -0,0 +1,227 @@
+"""
+Description: Functions for creating and querying an index of the periods in
+which bus routes were in service.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import instrument
+
+
+@instrument
+def create_route_lifecycle_index(
+        df: pd.DataFrame,
+        id_cols: list[str],
+        year_col: str = 'YEAR',
+        month_col: str = 'MONTH') -> pd.DataFrame:
+    """
+    Create an index of the spans of consecutive months in which each route
+    (or route and day type) was in service. Routes that start, stop and
+    restart service have one span for each period of service.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe of ridership data.
+        id_cols (strList): The columns identifying each route (e.g. ROUTE or
+            ROUTE and DAY_TYPE).
+        year_col (str): The name of the column containing years. Defaults to
+            'YEAR'.
+        month_col (str): The name of the column containing numeric months.
+            Defaults to 'MONTH'.
+
+    Returns:
+        Dataframe containing one row per span of service with the following
+        columns in addition to 'id_cols':
+            - START_YEAR: The year the span of service started.
+            - START_MONTH: The month the span of service started.
+            - END_YEAR: The year of the last month of service in the span.
+            - END_MONTH: The last month of service in the span.
+
+    Raises:
+        TypeError if the values of 'month_col' are not numeric.
+    """
+
+    if not pd.api.types.is_numeric_dtype(df[month_col]):
+        raise TypeError(
+            f"The values of '{month_col}' should be numeric months")
+
+    # Represent each month as a single integer so that consecutive months
+    # differ by one.
+    periods = df[id_cols].copy()
+    periods['PERIOD'] = df[year_col] * 12 + df[month_col] - 1
+    periods = periods.drop_duplicates()
+    periods = periods.sort_values(by=id_cols + ['PERIOD'])
+    periods = periods.reset_index(drop=True)
+
+    period_values = periods['PERIOD'].to_numpy()
+
+    # A new span starts at the first row of each route or after a month
+    # without service.
+    is_start = np.ones(len(periods), dtype=bool)
+    is_start[1:] = period_values[1:] != period_values[:-1] + 1
+
+    for col in id_cols:
+        col_values = periods[col].to_numpy()
+        is_start[1:] |= col_values[1:] != col_values[:-1]
+
+    start_idx = np.flatnonzero(is_start)
+    end_idx = np.append(start_idx[1:] - 1, len(periods) - 1)
+
+    route_index = periods.iloc[start_idx][id_cols].reset_index(drop=True)
+    start_periods = period_values[start_idx]
+    end_periods = period_values[end_idx]
+
+    route_index['START_YEAR'] = start_periods // 12
+    route_index['START_MONTH'] = start_periods % 12 + 1
+    route_index['END_YEAR'] = end_periods // 12
+    route_index['END_MONTH'] = end_periods % 12 + 1
+
+    logging.info(
+        f'Indexed {len(route_index)} spans of service from '
+        f'{len(df)} rows')
+
+    return route_index
+
+
+@instrument
+def count_active_routes(
+        route_index: pd.DataFrame,
+        route_col: str,
+        count_col: str,
+        year_col: str = 'YEAR') -> pd.DataFrame:
+    """
+    Count the number of routes in service during each year using a route
+    lifecycle index. A route is counted for a year if it was in service for
+    at least one month of that year.
+
+    Arguments:
+        route_index (DataFrame): Index created by
+            create_route_lifecycle_index.
+        route_col (str): The name of the column identifying each route.
+        count_col (str): The name of the column that will contain the number
+            of bus routes.
+        year_col (str): The name of the year column of the output. Defaults
+            to 'YEAR'.
+
+    Returns:
+        Dataframe of the number of bus routes in service for each year.
+
+    Raises:
+        NONE
+    """
+
+    start_years = route_index['START_YEAR'].to_numpy()
+    span_years = route_index['END_YEAR'].to_numpy() - start_years + 1
+
+    # Expand each span into the years it covers. This is proportional to the
+    # number of route years rather than the number of rows of raw data.
+    span_idx = np.repeat(np.arange(len(route_index)), span_years)
+    year_offsets = np.arange(len(span_idx)) - np.repeat(
+        np.cumsum(span_years) - span_years, span_years)
+
+    route_years = pd.DataFrame({
+        route_col: route_index[route_col].to_numpy()[span_idx],
+        year_col: start_years[span_idx] + year_offsets})
+    route_years = route_years.drop_duplicates()
+
+    route_count = route_years.groupby(year_col).size()
+    route_count = route_count.rename(count_col).reset_index()
+
+    return route_count
+
+
+@instrument
+def get_routes_active_in_years(
+        route_index: pd.DataFrame,
+        id_cols: list[str],
+        years: list[int]) -> pd.DataFrame:
+    """
+    Find the routes (or routes and day types) that were in service during
+    every one of the specified years (e.g. both 2019 and 2023).
+
+    Arguments:
+        route_index (DataFrame): Index created by
+            create_route_lifecycle_index.
+        id_cols (strList): The columns identifying each route. Must be the
+            same columns used to create the index.
+        years (intList): The years in which routes must have been in service.
+
+    Returns:
+        Dataframe containing the values of 'id_cols' for each route in
+        service during every specified year.
+
+    Raises:
+        NONE
+    """
+
+    start_years = route_index['START_YEAR'].to_numpy()
+    end_years = route_index['END_YEAR'].to_numpy()
+
+    # Check every span against every year at once.
+    year_values = np.asarray(years)[:, np.newaxis]
+    span_active = (start_years <= year_values) & (end_years >= year_values)
+
+    active = pd.DataFrame(
+        span_active.T,
+        columns=list(range(len(years))))
+    active = active.groupby(
+        [route_index[col] for col in id_cols], sort=True).any()
+
+    active_routes = active[active.all(axis=1)].index.to_frame(index=False)
+
+    return active_routes
+
+
+@instrument
+def get_route_service_gaps(
+        route_index: pd.DataFrame,
+        id_cols: list[str]) -> pd.DataFrame:
+    """
+    Find the periods in which routes were temporarily out of service (i.e.
+    the months between consecutive spans of service for the same route).
+
+    Arguments:
+        route_index (DataFrame): Index created by
+            create_route_lifecycle_index.
+        id_cols (strList): The columns identifying each route. Must be the
+            same columns used to create the index.
+
+    Returns:
+        Dataframe containing one row per gap with the following columns in
+        addition to 'id_cols':
+            - GAP_START_YEAR: The year of the first month without service.
+            - GAP_START_MONTH: The first month without service.
+            - GAP_END_YEAR: The year of the last month without service.
+            - GAP_END_MONTH: The last month without service.
+
+    Raises:
+        NONE
+    """
+
+    # Spans are sorted by route and start date, so a gap exists wherever
+    # two consecutive spans belong to the same route.
+    same_route = np.ones(max(len(route_index) - 1, 0), dtype=bool)
+
+    for col in id_cols:
+        col_values = route_index[col].to_numpy()
+        same_route &= col_values[1:] == col_values[:-1]
+
+    gap_idx = np.flatnonzero(same_route)
+
+    end_periods = (route_index['END_YEAR'] * 12
+                   + route_index['END_MONTH'] - 1).to_numpy()
+    start_periods = (route_index['START_YEAR'] * 12
+                     + route_index['START_MONTH'] - 1).to_numpy()
+
+    gap_starts = end_periods[gap_idx] + 1
+    gap_ends = start_periods[gap_idx + 1] - 1
+
+    service_gaps = route_index.iloc[gap_idx][id_cols].reset_index(drop=True)
+    service_gaps['GAP_START_YEAR'] = gap_starts // 12
+    service_gaps['GAP_START_MONTH'] = gap_starts % 12 + 1
+    service_gaps['GAP_END_YEAR'] = gap_ends // 12
+    service_gaps['GAP_END_MONTH'] = gap_ends % 12 + 1
+
+    return service_gaps
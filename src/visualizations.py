@@ -2,15 +2,181 @@
 Description: Functions for creating analytical visualizations.
 """
 
+import hashlib
+import json
 import logging
+import os
+from typing import Callable
 
-from data_processing import (create_rankings)
+from constants import (BarChartArguments,
+                       DashboardArguments,
+                       HeatmapArguments,
+                       LineChartArguments)
+from data_processing import (create_rankings, select_chart_data)
+from instrumentation import instrument
+from rendering import get_chart_renderer
 
-import altair as alt
 import numpy as np
 import pandas as pd
 
+# altair (and through it jsonschema and vl-convert) is imported inside each
+# function so that data-only commands do not pay for loading the plotting
+# libraries.
 
+# altair embeds every row and column of a chart's data in its Vega-Lite
+# specification, so each function first reduces its data to the columns the
+# chart encodes, unless the chart reads its rows from a shared data file.
+
+# Vega-Lite templates of each chart keyed by the function that builds the
+# chart, its settings and the data types of its columns.
+_chart_templates = {}
+
+
+@instrument
+def create_shared_dataset(
+        dfs: list[pd.DataFrame],
+        columns: list[str],
+        subset_cols: list[str],
+        output_path: str) -> list[dict | None]:
+    """
+    Save the data of several charts that each plot a subset of the same data
+    (e.g. one heatmap for each day type and period) as one JSON data file,
+    so that the data is written once rather than embedded in every chart.
+    Each chart then selects its rows from the file with a filter on the
+    columns that distinguish the subsets.
+
+    Arguments:
+        dfs (DataFrameList): The data of each chart.
+        columns (strList): The columns encoded by the charts.
+        subset_cols (strList): The columns whose values distinguish the data
+            of each chart (e.g. 'DAY_TYPE' and 'YEAR').
+        output_path (str): Absolute file path (including the name of the
+            file) to save the data to. Charts refer to the file by its name,
+            so they must be saved in the same directory.
+
+    Returns:
+        List containing, for each chart, a dictionary of the 'url' of the
+        data file, the 'filter' selecting the rows of the chart and the
+        'version' (hash) of the data file. Charts whose rows cannot be
+        selected by 'subset_cols' alone are given None and should embed
+        their data instead.
+
+    Raises:
+        NONE
+    """
+
+    chart_cols = list(dict.fromkeys([*columns, *subset_cols]))
+    chart_dfs = [df[chart_cols] for df in dfs]
+
+    shared_df = pd.concat(chart_dfs, ignore_index=True).drop_duplicates(
+        ignore_index=True)
+    shared_json = shared_df.to_json(orient='records')
+
+    logging.info(f'Saving shared chart data to {output_path}')
+    with open(output_path, 'w', encoding='utf-8') as file:
+        file.write(shared_json)
+
+    data_url = os.path.basename(output_path)
+    data_version = hashlib.sha256(shared_json.encode('utf-8')).hexdigest()
+
+    shared_data = []
+
+    for chart_df in chart_dfs:
+        predicates = []
+        selected = np.ones(len(shared_df), dtype=bool)
+
+        for col in subset_cols:
+            values = chart_df[col].drop_duplicates().tolist()
+            selected &= shared_df[col].isin(values).to_numpy()
+
+            if len(values) == 1:
+                predicates.append({'field': col, 'equal': values[0]})
+            else:
+                predicates.append({'field': col, 'oneOf': values})
+
+        # Rows that are repeated within a chart are only saved once, and the
+        # filter must select exactly the rows of the chart.
+        if (chart_df.duplicated().any()
+                or selected.sum() != len(chart_df)):
+            shared_data.append(None)
+            continue
+
+        shared_data.append({'url': data_url,
+                            'filter': {'and': predicates},
+                            'version': data_version})
+
+    return shared_data
+
+
+def _save_chart(
+        build_chart: Callable,
+        chart_args: dict,
+        data: pd.DataFrame | None,
+        output_path: str,
+        shared_data: dict | None = None) -> None:
+    """
+    Build a chart and save it. Charts are built from a Vega-Lite template
+    created once for each chart function, set of chart settings and set of
+    column data types, so altair only builds and validates the chart the
+    first time and later charts only fill in their data.
+
+    Arguments:
+        build_chart (Callable): Function that adds the mark, encodings and
+            properties of the chart to an altair chart of its data.
+        chart_args (dict): The arguments the chart function was called with
+            (i.e. its locals() before any other variable or import is
+            defined). Every argument except 'data', 'output_path' and
+            'shared_data' must be a setting of the chart.
+        data (DataFrame): The data to embed in the chart.
+        output_path (str): Absolute file path (including the name of the file)
+            to save the plot to.
+        shared_data (dict): The shared data file to read the rows of the
+            chart from, as returned by create_shared_dataset. If specified,
+            'data' is not used and no template is used. Defaults to None.
+
+    Returns:
+        None
+
+    Raises:
+        NONE
+    """
+
+    import altair as alt
+    from altair.utils.core import sanitize_pandas_dataframe
+
+    if shared_data is not None:
+        # The version of the data file is recorded in the specification so
+        # that charts are saved again whenever the data file changes.
+        chart = build_chart(
+            alt.Chart(alt.UrlData(url=shared_data['url'])).transform_filter(
+                shared_data['filter']).properties(
+                usermeta={'data_version': shared_data['version']}))
+        get_chart_renderer().save(chart=chart, output_path=output_path)
+        return
+
+    chart_settings = {name: value for name, value in chart_args.items()
+                      if name not in ['data', 'output_path', 'shared_data']}
+    template_key = (
+        build_chart.__qualname__,
+        json.dumps(chart_settings, sort_keys=True, default=str),
+        tuple(data.dtypes.astype(str).items()))
+
+    template = _chart_templates.get(template_key)
+    if template is None:
+        # Types that are not specified are inferred from the data, so the
+        # template is built from the first row.
+        template = build_chart(alt.Chart(data.head(1))).to_dict()
+        template.pop('datasets', None)
+        _chart_templates[template_key] = template
+
+    spec = {**template,
+            'data': {'values': sanitize_pandas_dataframe(data).to_dict(
+                orient='records')}}
+
+    get_chart_renderer().save_spec(spec=spec, output_path=output_path)
+
+
+@instrument
 def create_heatmap(
     data: pd.DataFrame,
     output_path: str,
@@ -25,7 +191,9 @@ def create_heatmap(
     x_axis_sort_order: list[str],
     scheme: str,
     x_value_type: str,
-    y_value_type: str) -> None:
+    y_value_type: str,
+    color_domain: list[float] | None = None,
+    shared_data: dict | None = None) -> None:
     """
     Create a heatmap for specified data and columns.
 
@@ -34,7 +202,8 @@ def create_heatmap(
     Arguments:
         data (DataFrame): Input data to visualize.
         output_path (str): Absolute file path (including the name of the file)
-            to save the plot to.
+            to save the plot to. The file extension ('png', 'svg', 'html' or
+            'json') sets the format the plot is saved in.
         x_value (str): The name of the column representing the x-axis.
         y_value (str): The name of the column representing the y-axis.
         color_values (str): The name of column representing the values to
@@ -57,6 +226,13 @@ def create_heatmap(
         y_value_type (str): The type of data that will be plotted on the
             y-axis. Must be one of quantitative, ordinal, nominal, temporal,
             or geojson.
+        color_domain (floatList): The minimum and maximum of the color
+            scale. Used to keep colors comparable between heatmaps that each
+            show part of the same data. If not specified, the range of the
+            plotted values is used. Defaults to None.
+        shared_data (dict): The shared data file to read the rows of the
+            heatmap from, as returned by create_shared_dataset. If
+            specified, 'data' is not used and can be None. Defaults to None.
 
     Returns:
         None
@@ -65,28 +241,45 @@ def create_heatmap(
         None
     """
 
-    data = data.copy()
-
-    chart = alt.Chart(data).mark_rect().encode(
-        alt.X(x_value,
-              type=x_value_type,
-              title=x_axis_title,
-              sort=x_axis_sort_order),
-        alt.Y(y_value, type=y_value_type, title=y_axis_title),
-        alt.Color(color_values,
-                  type='quantitative',
-                  title=color_title,
-                  scale=alt.Scale(scheme=scheme)),
-        alt.Facet(facet_values,
-                  type='ordinal',
-                  columns=facet_columns),
-        stroke = alt.value('black'),
-        strokeWidth = alt.value(0.2),
-    )
-
-    chart.save(output_path)
+    chart_args = dict(locals())
+
+    import altair as alt
+
+    if shared_data is None:
+        data = select_chart_data(
+            df=data,
+            columns=[facet_values, x_value, y_value, color_values])
+
+    def build_chart(chart):
+        return chart.mark_rect().encode(
+            alt.X(x_value,
+                  type=x_value_type,
+                  title=x_axis_title,
+                  sort=x_axis_sort_order),
+            alt.Y(y_value, type=y_value_type, title=y_axis_title),
+            alt.Color(color_values,
+                      type='quantitative',
+                      title=color_title,
+                      scale=alt.Scale(
+                          scheme=scheme,
+                          domain=(color_domain if color_domain is not None
+                                  else alt.Undefined))),
+            alt.Facet(facet_values,
+                      type='ordinal',
+                      columns=facet_columns),
+            stroke = alt.value('black'),
+            strokeWidth = alt.value(0.2),
+        )
+
+    _save_chart(
+        build_chart=build_chart,
+        chart_args=chart_args,
+        data=data,
+        output_path=output_path,
+        shared_data=shared_data)
 
 
+@instrument
 def create_barchart(
         data: pd.DataFrame,
         output_path: str,
@@ -101,14 +294,17 @@ def create_barchart(
         y_axis_title: str,
         color_title: str,
         sort_order_y_axis: str = '-x',
-        sort_order_color: str | list[str] = 'ascending') -> None:
+        sort_order_color: str | list[str] = 'ascending',
+        color_value_type: str | None = None,
+        shared_data: dict | None = None) -> None:
     """
     Create a bar chart for specified data and columns.
 
     Arguments:
         data (DataFrame): Input data to visualize.
         output_path (str): Absolute file path (including the name of the file)
-            to save the plot to.
+            to save the plot to. The file extension ('png', 'svg', 'html' or
+            'json') sets the format the plot is saved in.
         x_value (str): The name of the column representing the x-axis.
         y_value (str): The name of the column representing the y-axis.
         color_values (str): The name of column representing the values to
@@ -131,6 +327,14 @@ def create_barchart(
         sort_order_color (str or strlist): The sort order for the color scheme
             and legend. One of "ascending", "descending", or a list of strings
             containing a custom order. Defaults to ascending.
+        color_value_type (str): The type of data represented by the colors.
+            Must be one of quantitative, ordinal, nominal, temporal, or
+            geojson. If not specified, the type is inferred from 'data'.
+            Defaults to None.
+        shared_data (dict): The shared data file to read the rows of the bar
+            chart from, as returned by create_shared_dataset. If specified,
+            'data' is not used and can be None, and 'color_value_type' must
+            be specified. Defaults to None.
 
     Returns:
         None
@@ -139,21 +343,42 @@ def create_barchart(
         None
     """
 
-    chart = alt.Chart(data).mark_bar().encode(
-        alt.X(x_value, type=x_value_type, title=x_axis_title),
-        alt.Y(y_value,
-              type=y_value_type,
-              title=y_axis_title,
-              sort=sort_order_y_axis),
-        alt.Color(color_values,
-                  sort=sort_order_color,
-                  title=color_title,
-                  scale=alt.Scale(scheme=scheme))
-    ).properties(title=title)
-
-    chart.save(output_path)
+    chart_args = dict(locals())
+
+    import altair as alt
+
+    # Bars sharing a y value and color are stacked into one segment, so they
+    # are summed in advance when the bar length is quantitative.
+    if shared_data is None:
+        data = select_chart_data(
+            df=data,
+            columns=[y_value, color_values, x_value],
+            sum_col=x_value if x_value_type == 'quantitative' else None)
+
+    def build_chart(chart):
+        return chart.mark_bar().encode(
+            alt.X(x_value, type=x_value_type, title=x_axis_title),
+            alt.Y(y_value,
+                  type=y_value_type,
+                  title=y_axis_title,
+                  sort=sort_order_y_axis),
+            alt.Color(color_values,
+                      type=(color_value_type if color_value_type is not None
+                            else alt.Undefined),
+                      sort=sort_order_color,
+                      title=color_title,
+                      scale=alt.Scale(scheme=scheme))
+        ).properties(title=title)
+
+    _save_chart(
+        build_chart=build_chart,
+        chart_args=chart_args,
+        data=data,
+        output_path=output_path,
+        shared_data=shared_data)
 
 
+@instrument
 def create_linechart(
         data: pd.DataFrame,
         output_path: str,
@@ -173,7 +398,8 @@ def create_linechart(
     Arguments:
         data (DataFrame): Input data to visualize.
         output_path (str): Absolute file path (including the name of the file)
-            to save the plot to.
+            to save the plot to. The file extension ('png', 'svg', 'html' or
+            'json') sets the format the plot is saved in.
         x_value (str): The name of the column representing the x-axis.
         y_value (str): The name of the column representing the y-axis.
         color_values (str): The name of column representing the values to
@@ -199,17 +425,31 @@ def create_linechart(
         None
     """
 
-    chart = alt.Chart(data).mark_line(point=True).encode(
-        x=alt.X(x_value, type=x_value_type, title=x_axis_title),
-        y=alt.Y(y_value, type=y_value_type, title=y_axis_title),
-        color=alt.Color(color_values,
-                        title=color_title,
-                        scale=alt.Scale(scheme=scheme))
-    ).properties(title=title)
+    chart_args = dict(locals())
+
+    import altair as alt
+
+    data = select_chart_data(
+        df=data,
+        columns=[color_values, x_value, y_value])
 
-    chart.save(output_path)
+    def build_chart(chart):
+        return chart.mark_line(point=True).encode(
+            x=alt.X(x_value, type=x_value_type, title=x_axis_title),
+            y=alt.Y(y_value, type=y_value_type, title=y_axis_title),
+            color=alt.Color(color_values,
+                            title=color_title,
+                            scale=alt.Scale(scheme=scheme))
+        ).properties(title=title)
 
+    _save_chart(
+        build_chart=build_chart,
+        chart_args=chart_args,
+        data=data,
+        output_path=output_path)
 
+
+@instrument
 def create_bumpchart(
         data: pd.DataFrame,
         output_path: str,
@@ -226,14 +466,16 @@ def create_bumpchart(
         value_col: str,
         rank_col: str,
         group_col: list[str],
-        num_rankings: int) -> None:
+        num_rankings: int,
+        ranked: bool = False) -> None:
     """
     Create a bump chart for specified data and columns.
 
     Arguments:
         data (DataFrame): Input data to visualize.
         output_path (str): Absolute file path (including the name of the file)
-            to save the plot to.
+            to save the plot to. The file extension ('png', 'svg', 'html' or
+            'json') sets the format the plot is saved in.
         x_value (str): The name of the column representing the x-axis.
         y_value (str): The name of the column representing the y-axis.
         color_values (str): The name of column representing the values to
@@ -261,7 +503,10 @@ def create_bumpchart(
         num_rankings (int): The number of rows to return rankings for. If set
             to zero, no limit will be applied and all rows will be ranked.
             Defaults to zero.
-
+        ranked (bool): Whether 'data' already contains the rankings in
+            'rank_col' (e.g. created once by create_rankings and shared with
+            other charts). If True, rankings are not created again. Defaults
+            to False.
 
     Returns:
         None
@@ -270,13 +515,19 @@ def create_bumpchart(
         None
     """
 
-    logging.info("Creating rankings for bumpchart")
-    ranked_data = create_rankings(
-        df=data,
-        value_col=value_col,
-        rank_col=rank_col,
-        group_col=group_col,
-        num_rankings=num_rankings)
+    if ranked:
+        ranked_data = data
+    else:
+        logging.info("Creating rankings for bumpchart")
+        ranked_data = create_rankings(
+            df=select_chart_data(
+                df=data,
+                columns=[*group_col, color_values, x_value, value_col,
+                         *([y_value] if y_value != rank_col else [])]),
+            value_col=value_col,
+            rank_col=rank_col,
+            group_col=group_col,
+            num_rankings=num_rankings)
 
     logging.info("Plotting bumpchart data")
     create_linechart(
@@ -294,6 +545,7 @@ def create_bumpchart(
         color_title=color_title)
 
 
+@instrument
 def create_areachart(
         data: pd.DataFrame,
         output_path: str,
@@ -311,7 +563,8 @@ def create_areachart(
     Arguments:
         data (DataFrame): Input data to visualize.
         output_path (str): Absolute file path (including the name of the file)
-            to save the plot to.
+            to save the plot to. The file extension ('png', 'svg', 'html' or
+            'json') sets the format the plot is saved in.
         x_value (str): The name of the column representing the x-axis.
         y_value (str): The name of the column representing the y-axis.
         title (str): The title of the plot.
@@ -333,13 +586,215 @@ def create_areachart(
         None
     """
 
-    chart = alt.Chart(data).mark_area(
-        color=color,
-        interpolate='step-after',
-        line=True
-    ).encode(
-        x=alt.X(x_value, type=x_value_type, title=x_axis_title),
-        y=alt.Y(y_value, type=y_value_type, title=y_axis_title)
-    ).properties(title=title)
+    chart_args = dict(locals())
+
+    import altair as alt
+
+    data = select_chart_data(df=data, columns=[x_value, y_value])
+
+    def build_chart(chart):
+        return chart.mark_area(
+            color=color,
+            interpolate='step-after',
+            line=True
+        ).encode(
+            x=alt.X(x_value, type=x_value_type, title=x_axis_title),
+            y=alt.Y(y_value, type=y_value_type, title=y_axis_title)
+        ).properties(title=title)
+
+    _save_chart(
+        build_chart=build_chart,
+        chart_args=chart_args,
+        data=data,
+        output_path=output_path)
+
+
+@instrument
+def create_dashboard(
+        data: pd.DataFrame,
+        output_path: str,
+        day_types: list[str],
+        dashboard_args: DashboardArguments,
+        heatmap_args: HeatmapArguments,
+        barchart_args: BarChartArguments,
+        linechart_args: LineChartArguments) -> None:
+    """
+    Create an interactive dashboard of a bar chart of yearly ridership, a
+    line chart of the routes with the highest ridership and a heatmap of
+    monthly ridership by route. The data is embedded once and filtered in
+    the browser by a day type, ridership tier and period (start and end
+    year) selected with controls under the charts, so the dashboard
+    replaces a separate chart for each day type, tier and period. Yearly
+    ridership and the rankings of routes are calculated in advance and
+    embedded next to the monthly data, so the browser only filters rows.
+
+    Arguments:
+        data (DataFrame): Monthly ridership data with a ridership tier
+            assigned to each route and day type.
+        output_path (str): Absolute file path (including the name of the file)
+            to save the dashboard to. Should end with '.html' to create an
+            interactive dashboard, or '.json' to save its Vega-Lite
+            specification.
+        day_types (strList): The day types that can be selected. The first
+            day type is selected initially.
+        dashboard_args (DashboardArguments): Settings for the dashboard.
+        heatmap_args (HeatmapArguments): Settings for the heatmap.
+        barchart_args (BarChartArguments): Settings for the bar chart.
+        linechart_args (LineChartArguments): Settings for the line chart.
+
+    Returns:
+        None
+
+    Raises:
+        ValueError if no day types are given.
+    """
+
+    import altair as alt
+    from altair.utils.core import sanitize_pandas_dataframe
 
-    chart.save(output_path)
+    if not day_types:
+        raise ValueError("At least one day type is required")
+
+    subset_cols = [dashboard_args.day_type_col,
+                   dashboard_args.tier_col,
+                   dashboard_args.year_col]
+
+    # The heatmap draws one rectangle for each monthly row.
+    monthly_data = select_chart_data(
+        df=data,
+        columns=list(dict.fromkeys([
+            *subset_cols,
+            heatmap_args.facet_values,
+            heatmap_args.x_value,
+            heatmap_args.y_value,
+            heatmap_args.color_values])))
+
+    # The bar and line charts draw one bar segment or point for each route
+    # and year, so yearly ridership and the rankings of routes (among all
+    # routes and among the routes of the same tier) are calculated here
+    # rather than from the monthly rows in the browser.
+    yearly_data = data.groupby(
+        by=list(dict.fromkeys([
+            *subset_cols,
+            barchart_args.y_value,
+            barchart_args.color_values,
+            linechart_args.color_values,
+            linechart_args.x_value,
+            *linechart_args.group_col])),
+        sort=False,
+        dropna=False,
+        observed=True)[list(dict.fromkeys([
+            barchart_args.x_value,
+            linechart_args.value_col]))].sum().reset_index()
+
+    tier_rank_col = f'{dashboard_args.tier_col}_{linechart_args.rank_col}'
+    yearly_data = create_rankings(
+        df=yearly_data,
+        value_col=linechart_args.value_col,
+        rank_col=linechart_args.rank_col,
+        group_col=[dashboard_args.day_type_col, *linechart_args.group_col])
+    yearly_data = create_rankings(
+        df=yearly_data,
+        value_col=linechart_args.value_col,
+        rank_col=tier_rank_col,
+        group_col=[dashboard_args.day_type_col,
+                   dashboard_args.tier_col,
+                   *linechart_args.group_col])
+
+    years = monthly_data[dashboard_args.year_col]
+    first_year = int(years.min())
+    last_year = int(years.max())
+
+    day_type = alt.param(
+        name='day_type',
+        value=day_types[0],
+        bind=alt.binding_select(options=day_types, name='Day type '))
+    tier = alt.param(
+        name='tier',
+        value='all',
+        bind=alt.binding_select(
+            options=['all', *dashboard_args.tiers],
+            name='Ridership tier '))
+    start_year = alt.param(
+        name='start_year',
+        value=first_year,
+        bind=alt.binding_range(
+            min=first_year, max=last_year, step=1, name='Start year '))
+    end_year = alt.param(
+        name='end_year',
+        value=last_year,
+        bind=alt.binding_range(
+            min=first_year, max=last_year, step=1, name='End year '))
+
+    # Every chart shows the rows of the selected day type, tier and period.
+    selected_rows = (
+        f"datum['{dashboard_args.day_type_col}'] == day_type"
+        f" && (tier == 'all' || datum['{dashboard_args.tier_col}'] == tier)"
+        f" && datum['{dashboard_args.year_col}'] >= start_year"
+        f" && datum['{dashboard_args.year_col}'] <= end_year")
+
+    # The data is only referred to by name and embedded once below, so
+    # altair does not copy (or limit the number of) its rows.
+    monthly_base = alt.Chart(alt.NamedData(name='monthly_ridership'))
+    yearly_base = alt.Chart(alt.NamedData(name='yearly_ridership'))
+
+    barchart = yearly_base.transform_filter(selected_rows).mark_bar().encode(
+        alt.X(barchart_args.x_value,
+              type=barchart_args.x_value_type,
+              title=barchart_args.x_axis_title),
+        alt.Y(barchart_args.y_value,
+              type=barchart_args.y_value_type,
+              title=barchart_args.y_axis_title),
+        alt.Color(barchart_args.color_values,
+                  type=barchart_args.color_value_type,
+                  title=barchart_args.color_title,
+                  scale=alt.Scale(scheme=barchart_args.scheme))
+    ).properties(title=barchart_args.title).add_params(
+        day_type, tier, start_year, end_year)
+
+    linechart = yearly_base.transform_filter(selected_rows).transform_filter(
+        f"(tier == 'all' ? datum['{linechart_args.rank_col}']"
+        f" : datum['{tier_rank_col}']) <= {linechart_args.num_rankings}"
+    ).mark_line(point=True).encode(
+        alt.X(linechart_args.x_value,
+              type=linechart_args.x_value_type,
+              title=linechart_args.x_axis_title),
+        alt.Y(linechart_args.y_value,
+              type=linechart_args.y_value_type,
+              title=linechart_args.y_axis_title),
+        alt.Color(linechart_args.color_values,
+                  type='nominal',
+                  title=linechart_args.color_title,
+                  scale=alt.Scale(scheme=linechart_args.scheme))
+    ).properties(title=linechart_args.title)
+
+    # The heatmap is filtered before it is faceted so that routes without
+    # selected rows do not appear as empty facets.
+    heatmap = monthly_base.mark_rect().encode(
+        alt.X(heatmap_args.x_value,
+              type=heatmap_args.x_value_type,
+              title=heatmap_args.x_axis_title,
+              sort=heatmap_args.x_axis_sort_order),
+        alt.Y(heatmap_args.y_value,
+              type=heatmap_args.y_value_type,
+              title=heatmap_args.y_axis_title),
+        alt.Color(heatmap_args.color_values,
+                  type='quantitative',
+                  title=heatmap_args.color_title,
+                  scale=alt.Scale(scheme=heatmap_args.scheme)),
+        stroke=alt.value('black'),
+        strokeWidth=alt.value(0.2)
+    ).facet(
+        facet=alt.Facet(heatmap_args.facet_values, type='ordinal'),
+        columns=heatmap_args.facet_columns
+    ).transform_filter(selected_rows)
+
+    spec = alt.vconcat(
+        barchart, linechart, heatmap, title=dashboard_args.title).to_dict()
+    spec['datasets'] = {
+        'monthly_ridership': sanitize_pandas_dataframe(monthly_data).to_dict(
+            orient='records'),
+        'yearly_ridership': sanitize_pandas_dataframe(yearly_data).to_dict(
+            orient='records')}
+
+    get_chart_renderer().save_spec(spec=spec, output_path=output_path)
@@ -0,0 +1,175 @@
+"""
+Description: Functions for rerunning the analysis whenever the bus data
+changes.
+"""
+
+import glob
+import logging
+import os
+import time
+
+import pandas as pd
+
+from analysis import run_analysis
+from constants import AnalysisConfig
+
+
+def get_input_files(input_path: str) -> list[str]:
+    """
+    Find the bus data files at an input path. The path can either be a single
+    CSV file or a directory of CSV files (e.g. one file per data release).
+
+    Arguments:
+        input_path (str): The absolute file path to a CSV file or a
+            directory containing CSV files.
+
+    Returns:
+        Sorted list of the absolute file paths of each CSV file.
+
+    Raises:
+        FileNotFoundError if the input path does not exist.
+    """
+
+    if os.path.isdir(input_path):
+        return sorted(glob.glob(os.path.join(input_path, '*.csv')))
+
+    if not os.path.isfile(input_path):
+        raise FileNotFoundError(f'No such file or directory: {input_path}')
+
+    return [input_path]
+
+
+def get_file_mtimes(file_paths: list[str]) -> dict:
+    """
+    Get the last modification time of each file.
+
+    Arguments:
+        file_paths (strList): The file paths to check.
+
+    Returns:
+        Dictionary of modification times in nanoseconds keyed by file path.
+        Files that were removed while checking are left out.
+
+    Raises:
+        NONE
+    """
+
+    file_mtimes = {}
+
+    for file_path in file_paths:
+        try:
+            file_mtimes[file_path] = os.stat(file_path).st_mtime_ns
+        except FileNotFoundError:
+            continue
+
+    return file_mtimes
+
+
+def load_input_files(
+        file_mtimes: dict,
+        loaded_files: dict) -> pd.DataFrame:
+    """
+    Load and combine the bus data files. Files that have not been modified
+    since they were last loaded are reused instead of being read again.
+
+    Arguments:
+        file_mtimes (dict): Modification times of the files to load keyed by
+            file path.
+        loaded_files (dict): Previously loaded files keyed by file path. Each
+            value is a tuple of the modification time and dataframe of the
+            file. Updated with the files loaded by this call and pruned of
+            files that no longer exist.
+
+    Returns:
+        Dataframe of the combined bus data.
+
+    Raises:
+        NONE
+    """
+
+    for file_path in list(loaded_files):
+        if file_path not in file_mtimes:
+            del loaded_files[file_path]
+
+    for file_path, mtime in file_mtimes.items():
+        if loaded_files.get(file_path, (None, None))[0] != mtime:
+            logging.info(f'Loading bus data from {file_path}')
+            loaded_files[file_path] = (
+                mtime, pd.read_csv(file_path, encoding='utf-8'))
+
+    bus_data = pd.concat(
+        [loaded_files[file_path][1] for file_path in sorted(file_mtimes)],
+        ignore_index=True)
+
+    return bus_data
+
+
+def watch_analysis(
+        input_path: str,
+        output_dir: str,
+        config: AnalysisConfig | None = None,
+        interval: float = 5.0,
+        max_runs: int | None = None) -> None:
+    """
+    Watch the bus data for changes and rerun the analysis after each change.
+    The loaded files and the outputs of each analysis stage are kept in
+    memory, so a change only reloads the modified files and repeats the
+    stages (e.g. visualizations) whose data changed. A change is processed
+    once the files have not been modified for one polling interval so that
+    partially written files are not loaded. Failed runs are logged and the
+    analysis is retried after the next change.
+
+    Arguments:
+        input_path (str): The absolute file path to a CSV file or a
+            directory containing CSV files of bus data.
+        output_dir (str): The absolute file path to output directory where
+            the plots will be saved.
+        config (AnalysisConfig): Settings for the analysis. Defaults to the
+            settings in constants.py.
+        interval (float): The number of seconds between checks for changes.
+            Defaults to 5.
+        max_runs (int): The number of runs after which to stop watching. If
+            not specified, the input is watched until the process is
+            interrupted. Defaults to None.
+
+    Returns:
+        None
+
+    Raises:
+        FileNotFoundError if the input path does not exist.
+    """
+
+    loaded_files = {}
+    memory_cache = {}
+    processed_mtimes = None
+    previous_mtimes = None
+    runs = 0
+
+    logging.info(f'Watching {input_path} for changes')
+
+    while max_runs is None or runs < max_runs:
+        file_mtimes = get_file_mtimes(get_input_files(input_path))
+
+        if (file_mtimes
+                and file_mtimes != processed_mtimes
+                and file_mtimes == previous_mtimes):
+            logging.info('Bus data changed, running analysis')
+            try:
+                run_analysis(
+                    df_or_path=load_input_files(
+                        file_mtimes=file_mtimes,
+                        loaded_files=loaded_files),
+                    output_dir=output_dir,
+                    config=config,
+                    memory_cache=memory_cache)
+            except Exception:
+                logging.exception('Analysis failed')
+            else:
+                logging.info('Analysis finished, waiting for changes')
+
+            processed_mtimes = file_mtimes
+            runs += 1
+            continue
+
+        previous_mtimes = file_mtimes
+        time.sleep(interval)
@@ -969,3 +969,562 @@ def expected_route_count_df() -> pd.DataFrame:
 
     expected_route_count_df = pd.DataFrame(expected_route_count_df)
     return expected_route_count_df
+
+
+@pytest.fixture
+def input_multi_route_agg_df() -> pd.DataFrame:
+    """
+    Creates a small dataframe of data covering several bus routes that can be
+    used for testing aggregations that partition data by route.
+
+    Arguments:
+        NONE
+
+    Returns:
+        Dataframe of generic test ridership data that includes the following:
+            - ROUTE: A subset of bus route numbers.
+            - YEAR: A subset of the years data was reported for.
+            - MONTH: A subset of the months data was reported for.
+            - DAY_TYPE: Each of the types of days that data was reported for
+                (Weekdays, Saturdays and Sunday Holidays).
+            - AVG_RIDES: A subset of ridership data.
+
+    NOTE: The ridership numbers used for this test dataset were created
+        specifically for testing purposes instead of being taken from the
+        actual CTA dataset.
+
+    """
+    input_multi_route_agg_df = {
+        'ROUTE': ['1', '1', '1', '3', '3', '3', '9', '9', 'X21', 'X21'],
+        'YEAR': [2019, 2019, 2023, 2019, 2023, 2023, 2019, 2023, 2019, 2019],
+        'MONTH': [1, 2, 1, 1, 1, 2, 1, 1, 1, 2],
+        'DAY_TYPE': ['Weekday',
+                     'Weekday',
+                     'Weekday',
+                     'Saturday',
+                     'Saturday',
+                     'Saturday',
+                     'Weekday',
+                     'Weekday',
+                     'Sunday - Holiday',
+                     'Sunday - Holiday'],
+        'AVG_RIDES': [812, 1076, 363, 312, 266, 107, 1000, 93, 234, 691]
+    }
+
+    input_multi_route_agg_df = pd.DataFrame(input_multi_route_agg_df)
+    return input_multi_route_agg_df
+
+
+@pytest.fixture
+def expected_rolling_mean_df() -> pd.DataFrame:
+    """
+    Creates a small dataframe of data that can be used for testing trailing
+    window and year-to-date mean aggregations by providing an expected test
+    case.
+
+    Arguments:
+        NONE
+
+    Returns:
+        Dataframe of generic test ridership data that includes the following:
+            - ROUTE: A subset of bus route numbers.
+            - YEAR: A subset of the years data was reported for.
+            - MONTH: A subset of the months data was reported for.
+            - DAY_TYPE: Each of the types of days that data was reported for
+                (Weekdays, Saturdays and Sunday Holidays).
+            - AVG_RIDES: A subset of ridership data.
+            - AVG_RIDES_MEAN_2: The mean ridership of the current and
+                previous month.
+            - AVG_RIDES_YTD_MEAN: The mean ridership of the year up to and
+                including the current month.
+
+    NOTE: The ridership numbers used for this test dataset were created
+        specifically for testing purposes instead of being taken from the
+        actual CTA dataset.
+
+    """
+    expected_rolling_mean_df = {
+        'ROUTE': ['1', '1', '1', '3', '3', '3', '9', '9', 'X21', 'X21'],
+        'YEAR': [2019, 2019, 2023, 2019, 2023, 2023, 2019, 2023, 2019, 2019],
+        'MONTH': [1, 2, 1, 1, 1, 2, 1, 1, 1, 2],
+        'DAY_TYPE': ['Weekday',
+                     'Weekday',
+                     'Weekday',
+                     'Saturday',
+                     'Saturday',
+                     'Saturday',
+                     'Weekday',
+                     'Weekday',
+                     'Sunday - Holiday',
+                     'Sunday - Holiday'],
+        'AVG_RIDES': [812, 1076, 363, 312, 266, 107, 1000, 93, 234, 691],
+        'AVG_RIDES_MEAN_2': [812.0,
+                             944.0,
+                             363.0,
+                             312.0,
+                             266.0,
+                             186.5,
+                             1000.0,
+                             93.0,
+                             234.0,
+                             462.5],
+        'AVG_RIDES_YTD_MEAN': [812.0,
+                               944.0,
+                               363.0,
+                               312.0,
+                               266.0,
+                               186.5,
+                               1000.0,
+                               93.0,
+                               234.0,
+                               462.5]
+    }
+
+    expected_rolling_mean_df = pd.DataFrame(expected_rolling_mean_df)
+    return expected_rolling_mean_df
+
+
+@pytest.fixture
+def expected_rolling_sum_df() -> pd.DataFrame:
+    """
+    Creates a small dataframe of data that can be used for testing trailing
+    window and year-to-date sum aggregations by providing an expected test
+    case.
+
+    Arguments:
+        NONE
+
+    Returns:
+        Dataframe of generic test ridership data that includes the following:
+            - ROUTE: A subset of bus route numbers.
+            - YEAR: A subset of the years data was reported for.
+            - MONTH: A subset of the months data was reported for.
+            - DAY_TYPE: Each of the types of days that data was reported for
+                (Weekdays, Saturdays and Sunday Holidays).
+            - AVG_RIDES: A subset of ridership data.
+            - AVG_RIDES_SUM_1: The ridership of the current month.
+            - AVG_RIDES_SUM_2: The total ridership of the current and
+                previous month.
+
+    NOTE: The ridership numbers used for this test dataset were created
+        specifically for testing purposes instead of being taken from the
+        actual CTA dataset.
+
+    """
+    expected_rolling_sum_df = {
+        'ROUTE': ['1', '1', '1', '3', '3', '3', '9', '9', 'X21', 'X21'],
+        'YEAR': [2019, 2019, 2023, 2019, 2023, 2023, 2019, 2023, 2019, 2019],
+        'MONTH': [1, 2, 1, 1, 1, 2, 1, 1, 1, 2],
+        'DAY_TYPE': ['Weekday',
+                     'Weekday',
+                     'Weekday',
+                     'Saturday',
+                     'Saturday',
+                     'Saturday',
+                     'Weekday',
+                     'Weekday',
+                     'Sunday - Holiday',
+                     'Sunday - Holiday'],
+        'AVG_RIDES': [812, 1076, 363, 312, 266, 107, 1000, 93, 234, 691],
+        'AVG_RIDES_SUM_1': [812.0,
+                            1076.0,
+                            363.0,
+                            312.0,
+                            266.0,
+                            107.0,
+                            1000.0,
+                            93.0,
+                            234.0,
+                            691.0],
+        'AVG_RIDES_SUM_2': [812.0,
+                            1888.0,
+                            363.0,
+                            312.0,
+                            266.0,
+                            373.0,
+                            1000.0,
+                            93.0,
+                            234.0,
+                            925.0]
+    }
+
+    expected_rolling_sum_df = pd.DataFrame(expected_rolling_sum_df)
+    return expected_rolling_sum_df
+
+
+@pytest.fixture
+def expected_tiers_df() -> pd.DataFrame:
+    """
+    Creates a small dataframe of data that can be used for testing whether
+    rows are correctly assigned to ridership tiers by providing an expected
+    test case.
+
+    Arguments:
+        NONE
+
+    Returns:
+        Dataframe of generic test ridership data that includes the following:
+            - ROUTE: A subset of bus route numbers.
+            - YEAR: A subset of the years data was reported for.
+            - MONTH: A subset of the months data was reported for.
+            - DAY_TYPE: Each of the types of days that data was reported for
+                (Weekdays, Saturdays and Sunday Holidays).
+            - AVG_RIDES: A subset of ridership data.
+            - RIDERSHIP_TIER: The ridership tier of each route and day type.
+
+    NOTE: The ridership numbers used for this test dataset were created
+        specifically for testing purposes instead of being taken from the
+        actual CTA dataset.
+
+    """
+    expected_tiers_df = {
+        'ROUTE': ['1', '1', '1', '3', '3', '3', '9', '9', 'X21', 'X21'],
+        'YEAR': [2019, 2019, 2023, 2019, 2023, 2023, 2019, 2023, 2019, 2019],
+        'MONTH': [1, 2, 1, 1, 1, 2, 1, 1, 1, 2],
+        'DAY_TYPE': ['Weekday',
+                     'Weekday',
+                     'Weekday',
+                     'Saturday',
+                     'Saturday',
+                     'Saturday',
+                     'Weekday',
+                     'Weekday',
+                     'Sunday - Holiday',
+                     'Sunday - Holiday'],
+        'AVG_RIDES': [812, 1076, 363, 312, 266, 107, 1000, 93, 234, 691],
+        'RIDERSHIP_TIER': pd.Categorical(
+            ['high',
+             'high',
+             'high',
+             'low',
+             'low',
+             'low',
+             'medium',
+             'medium',
+             'low',
+             'low'],
+            categories=['low', 'medium', 'high'],
+            ordered=True)
+    }
+
+    expected_tiers_df = pd.DataFrame(expected_tiers_df)
+    return expected_tiers_df
+
+
+@pytest.fixture
+def expected_rollup_sum_df() -> pd.DataFrame:
+    """
+    Creates a small dataframe of data that can be used for testing whether
+    every level of a hierarchy of dimensions is correctly aggregated by
+    providing an expected test case.
+
+    Arguments:
+        NONE
+
+    Returns:
+        Dataframe of generic test ridership data that includes the following:
+            - YEAR: A subset of the years data was reported for.
+            - DAY_TYPE: Each of the types of days that data was reported for
+                (Weekdays, Saturdays and Sunday Holidays).
+            - ROUTE: A subset of bus route numbers.
+            - AVG_RIDES: A subset of ridership data.
+            - LEVEL: The dimensions each row was aggregated by.
+
+    NOTE: The ridership numbers used for this test dataset were created
+        specifically for testing purposes instead of being taken from the
+        actual CTA dataset.
+
+    """
+    expected_rollup_sum_df = {
+        'YEAR': pd.array([2019, 2019, 2019, 2019, 2023, 2023, 2023,
+                          2019, 2019, 2019, 2023, 2023,
+                          2019, 2023,
+                          None],
+                         dtype='Int64'),
+        'DAY_TYPE': ['Saturday',
+                     'Sunday - Holiday',
+                     'Weekday',
+                     'Weekday',
+                     'Saturday',
+                     'Weekday',
+                     'Weekday',
+                     'Saturday',
+                     'Sunday - Holiday',
+                     'Weekday',
+                     'Saturday',
+                     'Weekday',
+                     None,
+                     None,
+                     None],
+        'ROUTE': ['3', 'X21', '1', '9', '3', '1', '9',
+                  None, None, None, None, None,
+                  None, None,
+                  None],
+        'AVG_RIDES': [312, 925, 1888, 1000, 373, 363, 93,
+                      312, 925, 2888, 373, 456,
+                      4125, 829,
+                      4954],
+        'LEVEL': ['YEAR, DAY_TYPE, ROUTE',
+                  'YEAR, DAY_TYPE, ROUTE',
+                  'YEAR, DAY_TYPE, ROUTE',
+                  'YEAR, DAY_TYPE, ROUTE',
+                  'YEAR, DAY_TYPE, ROUTE',
+                  'YEAR, DAY_TYPE, ROUTE',
+                  'YEAR, DAY_TYPE, ROUTE',
+                  'YEAR, DAY_TYPE',
+                  'YEAR, DAY_TYPE',
+                  'YEAR, DAY_TYPE',
+                  'YEAR, DAY_TYPE',
+                  'YEAR, DAY_TYPE',
+                  'YEAR',
+                  'YEAR',
+                  'TOTAL']
+    }
+
+    expected_rollup_sum_df = pd.DataFrame(expected_rollup_sum_df)
+    return expected_rollup_sum_df
+
+
+@pytest.fixture
+def input_route_lifecycle_df() -> pd.DataFrame:
+    """
+    Creates a small dataframe of data covering routes that start, stop and
+    restart service that can be used for testing route lifecycle functions.
+
+    Arguments:
+        NONE
+
+    Returns:
+        Dataframe of generic test ridership data that includes the following:
+            - ROUTE: A subset of bus route numbers.
+            - YEAR: A subset of the years data was reported for.
+            - MONTH: A subset of the (numeric) months data was reported for.
+            - DAY_TYPE: Each of the types of days that data was reported for
+                (Weekdays, Saturdays and Sunday Holidays).
+            - AVG_RIDES: A subset of ridership data.
+
+    NOTE: The ridership numbers used for this test dataset were created
+        specifically for testing purposes instead of being taken from the
+        actual CTA dataset.
+
+    """
+    input_route_lifecycle_df = {
+        'ROUTE': ['1', '1', '1', '1', '1', '2', '2', '2', '3', '1'],
+        'YEAR': [2019, 2019, 2019, 2019, 2023, 2019, 2019, 2020, 2023, 2019],
+        'MONTH': [1, 2, 3, 6, 1, 11, 12, 1, 5, 2],
+        'DAY_TYPE': ['Weekday',
+                     'Weekday',
+                     'Weekday',
+                     'Weekday',
+                     'Weekday',
+                     'Weekday',
+                     'Weekday',
+                     'Weekday',
+                     'Saturday',
+                     'Weekday'],
+        'AVG_RIDES': [812, 1076, 363, 312, 266, 107, 1000, 93, 234, 812]
+    }
+
+    input_route_lifecycle_df = pd.DataFrame(input_route_lifecycle_df)
+    return input_route_lifecycle_df
+
+
+@pytest.fixture
+def expected_route_lifecycle_index() -> pd.DataFrame:
+    """
+    Creates a small dataframe of data that can be used for testing whether
+    spans of route service are correctly indexed by providing an expected
+    test case.
+
+    Arguments:
+        NONE
+
+    Returns:
+        Dataframe of spans of route service that includes the following:
+            - ROUTE: A subset of bus route numbers.
+            - DAY_TYPE: Each of the types of days that data was reported for
+                (Weekdays, Saturdays and Sunday Holidays).
+            - START_YEAR: The year each span of service started.
+            - START_MONTH: The month each span of service started.
+            - END_YEAR: The year of the last month of service in each span.
+            - END_MONTH: The last month of service in each span.
+
+    """
+    expected_route_lifecycle_index = {
+        'ROUTE': ['1', '1', '1', '2', '3'],
+        'DAY_TYPE': ['Weekday', 'Weekday', 'Weekday', 'Weekday', 'Saturday'],
+        'START_YEAR': [2019, 2019, 2023, 2019, 2023],
+        'START_MONTH': [1, 6, 1, 11, 5],
+        'END_YEAR': [2019, 2019, 2023, 2020, 2023],
+        'END_MONTH': [3, 6, 1, 1, 5]
+    }
+
+    expected_route_lifecycle_index = pd.DataFrame(
+        expected_route_lifecycle_index)
+    return expected_route_lifecycle_index
+
+
+@pytest.fixture
+def expected_active_route_count_df() -> pd.DataFrame:
+    """
+    Creates a small dataframe of data that can be used for testing whether
+    route counts have been correctly generated from a route lifecycle index.
+
+    Arguments:
+        NONE
+
+    Returns:
+        Dataframe of generic test ridership data that includes the following:
+            - YEAR: A subset of the years data was reported for.
+            - COUNT: The number of bus routes in operation for each year.
+
+    """
+    expected_active_route_count_df = {
+        'YEAR': [2019, 2020, 2023],
+        'COUNT': [2, 1, 2]
+    }
+
+    expected_active_route_count_df = pd.DataFrame(
+        expected_active_route_count_df)
+    return expected_active_route_count_df
+
+
+@pytest.fixture
+def expected_route_service_gaps_df() -> pd.DataFrame:
+    """
+    Creates a small dataframe of data that can be used for testing whether
+    gaps in route service are correctly identified by providing an expected
+    test case.
+
+    Arguments:
+        NONE
+
+    Returns:
+        Dataframe of gaps in route service that includes the following:
+            - ROUTE: A subset of bus route numbers.
+            - DAY_TYPE: Each of the types of days that data was reported for
+                (Weekdays, Saturdays and Sunday Holidays).
+            - GAP_START_YEAR: The year of the first month without service.
+            - GAP_START_MONTH: The first month without service.
+            - GAP_END_YEAR: The year of the last month without service.
+            - GAP_END_MONTH: The last month without service.
+
+    """
+    expected_route_service_gaps_df = {
+        'ROUTE': ['1', '1'],
+        'DAY_TYPE': ['Weekday', 'Weekday'],
+        'GAP_START_YEAR': [2019, 2019],
+        'GAP_START_MONTH': [4, 7],
+        'GAP_END_YEAR': [2019, 2022],
+        'GAP_END_MONTH': [5, 12]
+    }
+
+    expected_route_service_gaps_df = pd.DataFrame(
+        expected_route_service_gaps_df)
+    return expected_route_service_gaps_df
+
+
+@pytest.fixture
+def input_yearly_agg_df() -> pd.DataFrame:
+    """
+    Creates a small dataframe of yearly ridership by route and day type that
+    can be used for testing recovery ratios.
+
+    Arguments:
+        NONE
+
+    Returns:
+        Dataframe of generic test ridership data that includes the following:
+            - ROUTE: A subset of bus route numbers.
+            - YEAR: A subset of the years data was reported for.
+            - DAY_TYPE: Each of the types of days that data was reported for
+                (Weekdays, Saturdays and Sunday Holidays).
+            - AVG_RIDES: A subset of ridership data.
+
+    NOTE: The ridership numbers used for this test dataset were created
+        specifically for testing purposes instead of being taken from the
+        actual CTA dataset.
+
+    """
+    input_yearly_agg_df = {
+        'ROUTE': ['1', '1', '1', '3', '3', '9'],
+        'YEAR': [2019, 2021, 2023, 2019, 2023, 2021],
+        'DAY_TYPE': ['Weekday',
+                     'Weekday',
+                     'Weekday',
+                     'Saturday',
+                     'Saturday',
+                     'Weekday'],
+        'AVG_RIDES': [1000, 500, 800, 200, 100, 50]
+    }
+
+    input_yearly_agg_df = pd.DataFrame(input_yearly_agg_df)
+    return input_yearly_agg_df
+
+
+@pytest.fixture
+def expected_all_recovery_ratios_df() -> pd.DataFrame:
+    """
+    Creates a small dataframe of data that can be used for testing whether
+    recovery ratios are correctly calculated for every pair of years by
+    providing an expected test case.
+
+    Arguments:
+        NONE
+
+    Returns:
+        Dataframe of recovery ratios that includes the following:
+            - ROUTE: A subset of bus route numbers.
+            - DAY_TYPE: Each of the types of days that data was reported for
+                (Weekdays, Saturdays and Sunday Holidays).
+            - BASELINE_YEAR: The year recovery is measured against.
+            - COMPARISON_YEAR: The year recovery is measured for.
+            - PERCENT_RECOVERED: Ridership in the comparison year as a
+                percent of ridership in the baseline year.
+
+    """
+    expected_all_recovery_ratios_df = {
+        'ROUTE': ['1', '1', '3', '1'],
+        'DAY_TYPE': ['Weekday', 'Weekday', 'Saturday', 'Weekday'],
+        'BASELINE_YEAR': [2019, 2019, 2019, 2021],
+        'COMPARISON_YEAR': [2021, 2023, 2023, 2023],
+        'PERCENT_RECOVERED': [50.0, 80.0, 50.0, 160.0]
+    }
+
+    expected_all_recovery_ratios_df = pd.DataFrame(
+        expected_all_recovery_ratios_df)
+    return expected_all_recovery_ratios_df
+
+
+@pytest.fixture
+def expected_recovery_ratios_df() -> pd.DataFrame:
+    """
+    Creates a small dataframe of data that can be used for testing whether
+    recovery ratios are correctly calculated for a single pair of years by
+    providing an expected test case.
+
+    Arguments:
+        NONE
+
+    Returns:
+        Dataframe of recovery ratios between 2019 and 2023 that includes the
+        following:
+            - ROUTE: A subset of bus route numbers.
+            - DAY_TYPE: Each of the types of days that data was reported for
+                (Weekdays, Saturdays and Sunday Holidays).
+            - BASELINE_YEAR: The year recovery is measured against.
+            - COMPARISON_YEAR: The year recovery is measured for.
+            - PERCENT_RECOVERED: Ridership in the comparison year as a
+                percent of ridership in the baseline year.
+
+    """
+    expected_recovery_ratios_df = {
+        'ROUTE': ['1', '3'],
+        'DAY_TYPE': ['Weekday', 'Saturday'],
+        'BASELINE_YEAR': [2019, 2019],
+        'COMPARISON_YEAR': [2023, 2023],
+        'PERCENT_RECOVERED': [80.0, 50.0]
+    }
+
+    expected_recovery_ratios_df = pd.DataFrame(expected_recovery_ratios_df)
+    return expected_recovery_ratios_df
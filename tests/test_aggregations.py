@@ -6,7 +6,13 @@ import numpy as np
 import pandas as pd
 import pytest
 
-from aggregations import (aggregate_data, get_route_count)
+from aggregations import (aggregate_data,
+                          create_grouping_sets,
+                          create_recovery_ratios,
+                          create_rollup,
+                          create_rolling_aggregates,
+                          create_tiers,
+                          get_route_count)
 
 
 @pytest.mark.parametrize(
@@ -122,6 +128,95 @@ def test_aggregate_data_value_exceptions(
             agg_type=agg_type)
 
 
+@pytest.mark.parametrize(
+    "df,agg_cols,id_cols,agg_type,n_workers",
+    [('input_multi_route_agg_df',
+      ['MONTH'],
+      ['ROUTE', 'YEAR', 'DAY_TYPE'],
+      'sum',
+      2),
+     ('input_multi_route_agg_df',
+      ['MONTH', 'YEAR'],
+      ['ROUTE', 'DAY_TYPE'],
+      'mean',
+      3),
+     ('input_agg_df',
+      ['DAY'],
+      ['ROUTE', 'MONTH', 'YEAR', 'DAY_TYPE'],
+      'sum',
+      4)])
+def test_aggregate_data_parallel(
+        df: pd.DataFrame,
+        agg_cols: list[str],
+        id_cols: list[str],
+        agg_type: str,
+        n_workers: int,
+        request):
+    """
+    Tests the following:
+    1. Sum aggregation by year across multiple processes.
+    2. Mean aggregation by route across multiple processes.
+    3. Aggregation of data containing a single route (and therefore a single
+        shard).
+
+    Arguments:
+        df (DataFrame): Pandas dataframe to aggregate.
+        agg_cols (strList): The column to aggregate the data by.
+        id_cols (strList): The columns representing non-aggregated dimensions.
+        agg_type (str): The type of aggregation to perform on the data. Must
+            be one of either 'sum' or 'mean'.
+        n_workers (int): The number of processes to use for the aggregation.
+        request: A special fixture used to provide information regarding the
+            requesting test function. This is used to retrieve the value of
+            fixtures used in parameterized tests.
+
+    Returns:
+        NONE
+    """
+
+    df = request.getfixturevalue(df)
+
+    expected = aggregate_data(
+        df=df,
+        agg_cols=agg_cols,
+        id_cols=id_cols,
+        agg_type=agg_type)
+
+    test_df = aggregate_data(
+        df=df,
+        agg_cols=agg_cols,
+        id_cols=id_cols,
+        agg_type=agg_type,
+        n_workers=n_workers)
+
+    pd.testing.assert_frame_equal(test_df, expected)
+
+
+@pytest.mark.parametrize("n_workers", [0, -2])
+def test_aggregate_data_n_workers_value_exceptions(
+        input_agg_df: pd.DataFrame,
+        n_workers: int):
+    """
+    Tests the following:
+    1. Tests whether ValueErrors are raised if n_workers is less than one.
+
+    Arguments:
+        input_agg_df (DataFrame): Pandas dataframe to aggregate.
+        n_workers (int): The number of processes to use for the aggregation.
+
+    Returns:
+        NONE
+    """
+
+    with pytest.raises(ValueError):
+        aggregate_data(
+            df=input_agg_df,
+            agg_cols=['DAY'],
+            id_cols=['ROUTE', 'MONTH', 'YEAR', 'DAY_TYPE'],
+            agg_type='sum',
+            n_workers=n_workers)
+
+
 @pytest.mark.parametrize(
     "df,route_dims,count_dim,count_col,expected",
     [('input_route_count_df',
@@ -168,3 +263,526 @@ def test_get_route_count(
         count_col=count_col)
 
     pd.testing.assert_frame_equal(test_df, expected)
+
+
+@pytest.mark.parametrize(
+    "df,windows,agg_type,ytd_col,expected",
+    [('input_multi_route_agg_df',
+      [2],
+      'mean',
+      'YEAR',
+      'expected_rolling_mean_df'),
+     ('input_multi_route_agg_df',
+      [1, 2],
+      'sum',
+      None,
+      'expected_rolling_sum_df')])
+def test_create_rolling_aggregates(
+        df: pd.DataFrame,
+        windows: list[int],
+        agg_type: str,
+        ytd_col: str | None,
+        expected: pd.DataFrame,
+        request):
+    """
+    Tests the following:
+    1. Trailing window and year-to-date means by route and day type.
+    2. Trailing window sums by route and day type for multiple windows.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe to create rolling aggregates for.
+        windows (intList): The sizes of the trailing windows to create.
+        agg_type (str): The type of aggregation to perform on each window.
+        ytd_col (str): The name of the column that resets the year-to-date
+            aggregate.
+        expected (DataFrame): Dataframe with the expected rolling aggregates.
+        request: A special fixture used to provide information regarding the
+            requesting test function. This is used to retrieve the value of
+            fixtures used in parameterized tests.
+
+    Returns:
+        NONE
+    """
+
+    df = request.getfixturevalue(df)
+    expected = request.getfixturevalue(expected)
+
+    test_df = create_rolling_aggregates(
+        df=df,
+        id_cols=['ROUTE', 'DAY_TYPE'],
+        order_cols=['YEAR', 'MONTH'],
+        value_col='AVG_RIDES',
+        windows=windows,
+        agg_type=agg_type,
+        ytd_col=ytd_col)
+
+    pd.testing.assert_frame_equal(test_df, expected)
+
+
+def test_create_rolling_aggregates_missing_values():
+    """
+    Tests the following:
+    1. Tests whether missing values are left out of the windows of their own
+        group and do not affect other groups.
+    2. Tests whether windows are measured in months across gaps in service.
+
+    Arguments:
+        NONE
+
+    Returns:
+        NONE
+    """
+
+    df = pd.DataFrame({
+        'ROUTE': ['1', '1', '1', '2', '2', '2'],
+        'YEAR': [2019, 2019, 2019, 2019, 2019, 2021],
+        'MONTH': [1, 2, 3, 1, 2, 1],
+        'AVG_RIDES': [10.0, np.nan, 30.0, 5.0, 7.0, 9.0]})
+
+    test_df = create_rolling_aggregates(
+        df=df,
+        id_cols=['ROUTE'],
+        order_cols=['YEAR', 'MONTH'],
+        value_col='AVG_RIDES',
+        windows=[2, 12],
+        agg_type='mean')
+
+    np.testing.assert_array_equal(
+        test_df['AVG_RIDES_MEAN_2'].to_numpy(),
+        [10.0, 10.0, 30.0, 5.0, 6.0, 9.0])
+    np.testing.assert_array_equal(
+        test_df['AVG_RIDES_MEAN_12'].to_numpy(),
+        [10.0, 10.0, 20.0, 5.0, 6.0, 9.0])
+
+
+@pytest.mark.parametrize(
+    "windows,agg_type",
+    [([3, 12], 'median'),
+     ([0, 12], 'mean'),
+     ([-3], 'sum')])
+def test_create_rolling_aggregates_value_exceptions(
+        input_multi_route_agg_df: pd.DataFrame,
+        windows: list[int],
+        agg_type: str):
+    """
+    Tests the following:
+    1. Tests whether ValueErrors are raised if agg_type is not one of 'sum'
+        or 'mean'.
+    2. Tests whether ValueErrors are raised if a window is less than one.
+
+    Arguments:
+        input_multi_route_agg_df (DataFrame): Pandas dataframe to create
+            rolling aggregates for.
+        windows (intList): The sizes of the trailing windows to create.
+        agg_type (str): The type of aggregation to perform on each window.
+
+    Returns:
+        NONE
+    """
+
+    with pytest.raises(ValueError):
+        create_rolling_aggregates(
+            df=input_multi_route_agg_df,
+            id_cols=['ROUTE', 'DAY_TYPE'],
+            order_cols=['YEAR', 'MONTH'],
+            value_col='AVG_RIDES',
+            windows=windows,
+            agg_type=agg_type)
+
+
+@pytest.mark.parametrize(
+    "df,id_cols,value_col,tier_col,labels,expected",
+    [('input_multi_route_agg_df',
+      ['ROUTE', 'DAY_TYPE'],
+      'AVG_RIDES',
+      'RIDERSHIP_TIER',
+      ['low', 'medium', 'high'],
+      'expected_tiers_df')])
+def test_create_tiers(
+        df: pd.DataFrame,
+        id_cols: list[str],
+        value_col: str,
+        tier_col: str,
+        labels: list[str],
+        expected: pd.DataFrame,
+        request):
+    """
+    Tests the following:
+    1. Whether routes are assigned to low, medium and high ridership tiers.
+    2. Whether tiers match those created by pd.qcut over the route means of
+        every row.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe to assign tiers for.
+        id_cols (strList): The columns identifying each group.
+        value_col (str): The name of the column used to calculate the group
+            means.
+        tier_col (str): The name of the new column that will contain the
+            tiers.
+        labels (strList): The labels of each tier in ascending order.
+        expected (DataFrame): Dataframe with the expected tiers.
+        request: A special fixture used to provide information regarding the
+            requesting test function. This is used to retrieve the value of
+            fixtures used in parameterized tests.
+
+    Returns:
+        NONE
+    """
+
+    df = request.getfixturevalue(df)
+    expected = request.getfixturevalue(expected)
+
+    test_df = create_tiers(
+        df=df,
+        id_cols=id_cols,
+        value_col=value_col,
+        tier_col=tier_col,
+        labels=labels)
+
+    pd.testing.assert_frame_equal(test_df, expected)
+
+    route_means = df.groupby(id_cols)[value_col].transform('mean')
+    qcut_tiers = pd.qcut(x=route_means, q=len(labels), labels=labels)
+
+    pd.testing.assert_series_equal(
+        test_df[tier_col],
+        qcut_tiers,
+        check_names=False)
+
+
+def test_create_tiers_missing_ids(input_multi_route_agg_df: pd.DataFrame):
+    """
+    Tests the following:
+    1. Tests whether rows with a missing identifier are left without a tier.
+    2. Tests whether the tiers of the other rows are unchanged.
+
+    Arguments:
+        input_multi_route_agg_df (DataFrame): Pandas dataframe to assign
+            tiers for.
+
+    Returns:
+        NONE
+    """
+
+    missing_id_df = pd.concat(
+        [input_multi_route_agg_df,
+         pd.DataFrame({'ROUTE': [None],
+                       'YEAR': [2019],
+                       'MONTH': [3],
+                       'DAY_TYPE': ['Weekday'],
+                       'AVG_RIDES': [500]})],
+        ignore_index=True)
+
+    tier_args = dict(
+        id_cols=['ROUTE', 'DAY_TYPE'],
+        value_col='AVG_RIDES',
+        tier_col='RIDERSHIP_TIER',
+        labels=['low', 'medium', 'high'])
+
+    test_df = create_tiers(df=missing_id_df, **tier_args)
+    expected = create_tiers(df=input_multi_route_agg_df, **tier_args)
+
+    assert pd.isna(test_df['RIDERSHIP_TIER'].iloc[-1])
+    pd.testing.assert_series_equal(
+        test_df['RIDERSHIP_TIER'].iloc[:-1],
+        expected['RIDERSHIP_TIER'])
+
+
+@pytest.mark.parametrize(
+    "tier_col,labels",
+    [('AVG_RIDES', ['low', 'medium', 'high']),
+     ('RIDERSHIP_TIER', ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10'])])
+def test_create_tiers_value_exceptions(
+        input_multi_route_agg_df: pd.DataFrame,
+        tier_col: str,
+        labels: list[str]):
+    """
+    Tests the following:
+    1. Tests whether ValueErrors are raised if tier_col already exists.
+    2. Tests whether ValueErrors are raised if there are more tiers than can
+        be created from unique cut points.
+
+    Arguments:
+        input_multi_route_agg_df (DataFrame): Pandas dataframe to assign
+            tiers for.
+        tier_col (str): The name of the new column that will contain the
+            tiers.
+        labels (strList): The labels of each tier in ascending order.
+
+    Returns:
+        NONE
+    """
+
+    with pytest.raises(ValueError):
+        create_tiers(
+            df=input_multi_route_agg_df,
+            id_cols=['ROUTE', 'DAY_TYPE'],
+            value_col='AVG_RIDES',
+            tier_col=tier_col,
+            labels=labels)
+
+
+@pytest.mark.parametrize(
+    "df,agg_cols,id_cols,agg_type,expected",
+    [('input_multi_route_agg_df',
+      ['MONTH'],
+      ['YEAR', 'DAY_TYPE', 'ROUTE'],
+      'sum',
+      'expected_rollup_sum_df')])
+def test_create_rollup(
+        df: pd.DataFrame,
+        agg_cols: list[str],
+        id_cols: list[str],
+        agg_type: str,
+        expected: pd.DataFrame,
+        request):
+    """
+    Tests the following:
+    1. Sum aggregation for every level of a hierarchy from route, year and
+        day type down to a grand total.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe to aggregate.
+        agg_cols (strList): The columns to aggregate the data by.
+        id_cols (strList): The columns representing the hierarchy of
+            non-aggregated dimensions, ordered from coarsest to finest.
+        agg_type (str): The type of aggregation to perform on the data.
+        expected (DataFrame): Dataframe with the expected result of
+            aggregating the dataframe by each level of the hierarchy.
+        request: A special fixture used to provide information regarding the
+            requesting test function. This is used to retrieve the value of
+            fixtures used in parameterized tests.
+
+    Returns:
+        NONE
+    """
+
+    df = request.getfixturevalue(df)
+    expected = request.getfixturevalue(expected)
+
+    test_df = create_rollup(
+        df=df,
+        agg_cols=agg_cols,
+        id_cols=id_cols,
+        agg_type=agg_type)
+
+    pd.testing.assert_frame_equal(test_df, expected)
+
+
+@pytest.mark.parametrize(
+    "grouping_set,agg_cols,agg_type",
+    [(['ROUTE', 'YEAR', 'DAY_TYPE'], ['MONTH'], 'sum'),
+     (['YEAR', 'DAY_TYPE'], ['MONTH', 'ROUTE'], 'mean'),
+     (['ROUTE'], ['MONTH', 'YEAR', 'DAY_TYPE'], 'mean')])
+def test_create_grouping_sets(
+        input_multi_route_agg_df: pd.DataFrame,
+        grouping_set: list[str],
+        agg_cols: list[str],
+        agg_type: str):
+    """
+    Tests the following:
+    1. Whether each level of a set of grouping sets matches aggregating the
+        raw data by the same dimensions with aggregate_data.
+
+    Arguments:
+        input_multi_route_agg_df (DataFrame): Pandas dataframe to aggregate.
+        grouping_set (strList): The grouping set to compare with
+            aggregate_data.
+        agg_cols (strList): The columns to aggregate the data by.
+        agg_type (str): The type of aggregation to perform on the data.
+
+    Returns:
+        NONE
+    """
+
+    test_df = create_grouping_sets(
+        df=input_multi_route_agg_df,
+        agg_cols=agg_cols,
+        grouping_sets=[grouping_set, []],
+        agg_type=agg_type)
+
+    test_df = test_df[test_df['LEVEL'] == ', '.join(grouping_set)]
+    test_df = test_df.drop(columns=['LEVEL']).reset_index(drop=True)
+
+    expected = aggregate_data(
+        df=input_multi_route_agg_df,
+        agg_cols=agg_cols,
+        id_cols=grouping_set,
+        agg_type=agg_type)
+
+    pd.testing.assert_frame_equal(test_df, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize(
+    "agg_type,expected_rides",
+    [('sum', 4954.0),
+     ('mean', 495.4)])
+def test_create_grouping_sets_grand_total(
+        input_multi_route_agg_df: pd.DataFrame,
+        agg_type: str,
+        expected_rides: float):
+    """
+    Tests the following:
+    1. Whether a grand total can be created on its own.
+
+    Arguments:
+        input_multi_route_agg_df (DataFrame): Pandas dataframe to aggregate.
+        agg_type (str): The type of aggregation to perform on the data.
+        expected_rides (float): The expected aggregate of every row.
+
+    Returns:
+        NONE
+    """
+
+    test_df = create_grouping_sets(
+        df=input_multi_route_agg_df,
+        agg_cols=['ROUTE', 'YEAR', 'MONTH', 'DAY_TYPE'],
+        grouping_sets=[[]],
+        agg_type=agg_type)
+
+    expected = pd.DataFrame({'AVG_RIDES': [expected_rides],
+                             'LEVEL': ['TOTAL']})
+
+    pd.testing.assert_frame_equal(test_df, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize(
+    "grouping_sets,agg_type",
+    [([['YEAR'], []], 'median'),
+     ([], 'sum')])
+def test_create_grouping_sets_value_exceptions(
+        input_multi_route_agg_df: pd.DataFrame,
+        grouping_sets: list[list[str]],
+        agg_type: str):
+    """
+    Tests the following:
+    1. Tests whether ValueErrors are raised if agg_type is not one of 'sum'
+        or 'mean'.
+    2. Tests whether ValueErrors are raised if no grouping sets are
+        specified.
+
+    Arguments:
+        input_multi_route_agg_df (DataFrame): Pandas dataframe to aggregate.
+        grouping_sets (list): List of lists of columns to aggregate by.
+        agg_type (str): The type of aggregation to perform on the data.
+
+    Returns:
+        NONE
+    """
+
+    with pytest.raises(ValueError):
+        create_grouping_sets(
+            df=input_multi_route_agg_df,
+            agg_cols=['MONTH', 'ROUTE', 'DAY_TYPE'],
+            grouping_sets=grouping_sets,
+            agg_type=agg_type)
+
+
+@pytest.mark.parametrize(
+    "year_pairs,expected",
+    [(None, 'expected_all_recovery_ratios_df'),
+     ([(2019, 2023)], 'expected_recovery_ratios_df')])
+def test_create_recovery_ratios(
+        input_yearly_agg_df: pd.DataFrame,
+        year_pairs: list[tuple[int, int]] | None,
+        expected: pd.DataFrame,
+        request):
+    """
+    Tests the following:
+    1. Tests whether recovery ratios are calculated for every pair of years
+        if no pairs are specified.
+    2. Tests whether recovery ratios are only calculated for the specified
+        pairs of years.
+    3. Tests whether routes without values in both years of a pair are left
+        out.
+
+    Arguments:
+        input_yearly_agg_df (DataFrame): Dataframe of yearly ridership.
+        year_pairs (list): The (baseline, comparison) pairs of years.
+        expected (DataFrame): The expected test case.
+        request: Pytest request used to load fixtures by name.
+
+    Returns:
+        NONE
+    """
+
+    expected = request.getfixturevalue(expected)
+
+    test_df = create_recovery_ratios(
+        df=input_yearly_agg_df,
+        id_cols=['ROUTE', 'DAY_TYPE'],
+        value_col='AVG_RIDES',
+        year_pairs=year_pairs)
+
+    pd.testing.assert_frame_equal(test_df, expected)
+
+
+def test_create_recovery_ratios_zero_baseline():
+    """
+    Tests the following:
+    1. Tests whether routes with a baseline value of 0 are kept with a NaN
+        (0 / 0) or infinite ratio.
+    2. Tests whether routes without a value in the comparison year are left
+        out.
+
+    Arguments:
+        NONE
+
+    Returns:
+        NONE
+    """
+
+    input_df = pd.DataFrame({
+        'ROUTE': ['1', '1', '2', '2', '3', '3', '4'],
+        'YEAR': [2019, 2023, 2019, 2023, 2019, 2023, 2019],
+        'AVG_RIDES': [0.0, 0.0, 0.0, 50.0, 200.0, 100.0, 10.0]})
+
+    expected = pd.DataFrame({
+        'ROUTE': ['1', '2', '3'],
+        'BASELINE_YEAR': [2019, 2019, 2019],
+        'COMPARISON_YEAR': [2023, 2023, 2023],
+        'PERCENT_RECOVERED': [np.nan, np.inf, 50.0]})
+
+    test_df = create_recovery_ratios(
+        df=input_df,
+        id_cols=['ROUTE'],
+        value_col='AVG_RIDES',
+        year_pairs=[(2019, 2023)])
+
+    pd.testing.assert_frame_equal(test_df, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize(
+    "duplicate_rows,year_pairs",
+    [(True, None),
+     (False, [(2019, 2020)])])
+def test_create_recovery_ratios_value_exceptions(
+        input_yearly_agg_df: pd.DataFrame,
+        duplicate_rows: bool,
+        year_pairs: list[tuple[int, int]] | None):
+    """
+    Tests the following:
+    1. Tests whether ValueErrors are raised if the data contains more than
+        one row for a route and year.
+    2. Tests whether ValueErrors are raised if a year in 'year_pairs' is not
+        in the data.
+
+    Arguments:
+        input_yearly_agg_df (DataFrame): Dataframe of yearly ridership.
+        duplicate_rows (bool): Whether to repeat the rows of the data.
+        year_pairs (list): The (baseline, comparison) pairs of years.
+
+    Returns:
+        NONE
+    """
+
+    if duplicate_rows:
+        input_yearly_agg_df = pd.concat(
+            [input_yearly_agg_df, input_yearly_agg_df])
+
+    with pytest.raises(ValueError):
+        create_recovery_ratios(
+            df=input_yearly_agg_df,
+            id_cols=['ROUTE', 'DAY_TYPE'],
+            value_col='AVG_RIDES',
+            year_pairs=year_pairs)
@@ -0,0 +1,397 @@
+"""
+Description: Tests for running the transportation data analysis.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import (export_analysis_data,
+                      prep_heatmap_data,
+                      render_barcharts,
+                      render_heatmaps,
+                      run_analysis,
+                      save_analysis_dashboard)
+from constants import (AnalysisConfig,
+                       BarChartArguments,
+                       BumpChartArguments,
+                       BusDataArguments,
+                       DashboardArguments,
+                       HeatmapArguments,
+                       LineChartArguments,
+                       RendererArguments)
+from rendering import configure_chart_renderer
+
+
+def test_run_analysis(input_route_lifecycle_df: pd.DataFrame, tmp_path):
+    """
+    Tests the following:
+    1. Tests whether the analysis can be run on a dataframe that is already
+        loaded.
+    2. Tests whether only the stages required by the selected chart families
+        are run.
+    3. Tests whether intermediate dataframes and output paths are returned.
+
+    Arguments:
+        input_route_lifecycle_df (DataFrame): Small dataframe of generic
+            ridership data.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    output_dir = f'{tmp_path}/'
+
+    results = run_analysis(
+        df_or_path=input_route_lifecycle_df,
+        output_dir=output_dir,
+        config=AnalysisConfig(chart_families=['area']))
+
+    assert results['areachart_paths'] == [
+        os.path.join(output_dir, 'route_count_1999_2023.png')]
+    assert os.path.isfile(results['areachart_paths'][0])
+    assert results['route_count_df']['COUNT'].tolist() == [2, 1, 2]
+    assert 'heatmap_dfs' not in results
+    assert 'heatmap_paths' not in results
+
+
+def test_run_analysis_cache_renderer_args(
+        input_route_lifecycle_df: pd.DataFrame,
+        tmp_path):
+    """
+    Tests the following:
+    1. Tests whether cached charts are created again if the settings of the
+        renderer change.
+
+    Arguments:
+        input_route_lifecycle_df (DataFrame): Small dataframe of generic
+            ridership data.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    output_dir = tmp_path / 'output'
+    output_dir.mkdir()
+
+    image_widths = []
+
+    for scale_factor in [1.0, 2.0]:
+        results = run_analysis(
+            df_or_path=input_route_lifecycle_df,
+            output_dir=f'{output_dir}/',
+            config=AnalysisConfig(
+                chart_families=['area'],
+                cache_dir=str(tmp_path / 'cache'),
+                renderer_args=RendererArguments(scale_factor=scale_factor)))
+
+        with open(results['areachart_paths'][0], 'rb') as file:
+            image_widths.append(int.from_bytes(file.read(24)[16:20], 'big'))
+
+    configure_chart_renderer()
+
+    assert image_widths[1] == 2 * image_widths[0]
+
+
+def test_render_heatmaps_missing_values(tmp_path):
+    """
+    Tests the following:
+    1. Tests whether heatmap pages without any values keep the default color
+        scale instead of a scale with an undefined domain.
+
+    Arguments:
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    heatmap_df = pd.DataFrame({
+        'ROUTE': ['1', '2'],
+        'YEAR': [2019, 2019],
+        'MONTH': ['January', 'January'],
+        'DAY_TYPE': ['Weekday', 'Weekday'],
+        'RIDERSHIP_TIER': ['medium', 'medium'],
+        'AVG_RIDES': [np.nan, np.nan]})
+
+    results = render_heatmaps(
+        heatmap_dfs=[heatmap_df],
+        output_dir=f'{tmp_path}/',
+        heatmap_args=HeatmapArguments(facets_per_page=1),
+        output_format='json',
+        renderer_args=RendererArguments(output_format='json'))
+    configure_chart_renderer()
+
+    page_paths = [path for path in results['heatmap_paths']
+                  if '_page_' in path]
+    assert len(page_paths) == 2
+
+    for page_path in page_paths:
+        with open(page_path) as file:
+            color_scale = json.load(file)['encoding']['color']['scale']
+        assert 'domain' not in color_scale
+
+
+@pytest.mark.parametrize(
+    "day_types,periods,expected",
+    [(['Weekday'], ['2020_2023'],
+      {'weekday_ridership_barchart_2020_2023.json': 8.0}),
+     (['Saturday'], ['1999_2009', '2010_2019'],
+      {'saturday_ridership_barchart_1999_2009.json': 3.0,
+       'saturday_ridership_barchart_2010_2019.json': 5.0}),
+     (None, ['1999_2008'], {})])
+def test_render_barcharts_selection(
+        day_types: list[str] | None,
+        periods: list[str] | None,
+        expected: dict,
+        tmp_path):
+    """
+    Tests the following:
+    1. Tests whether bar charts are selected by the day types and years in
+        their data.
+    2. Tests whether each bar chart is saved under the name of the day type
+        in its data, regardless of the order of the day types.
+    3. Tests whether bar charts are only selected by a period that contains
+        every year they show.
+
+    Arguments:
+        day_types (strList): The day types to create charts for.
+        periods (strList): The periods to create charts for.
+        expected (dict): The expected rides in each chart keyed by file name.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    # Saturday comes before Weekday, as in data aggregated by day type.
+    period_years = [[1999, 2023], [1999, 2009], [2010, 2019], [2020, 2023]]
+    barchart_dfs = [
+        pd.DataFrame({'ROUTE': ['1', '1'],
+                      'YEAR': [str(year) for year in years],
+                      'DAY_TYPE': [day_type, day_type],
+                      'AVG_RIDES': [2 * period + rides] * 2})
+        for period, years in enumerate(period_years)
+        for rides, day_type in enumerate(['Saturday', 'Weekday'], start=1)]
+
+    results = render_barcharts(
+        barchart_dfs=barchart_dfs,
+        output_dir=f'{tmp_path}/',
+        barchart_args=BarChartArguments(),
+        day_types=day_types,
+        periods=periods,
+        output_format='json',
+        renderer_args=RendererArguments(output_format='json'))
+    configure_chart_renderer()
+
+    chart_rides = {}
+    for barchart_path in results['barchart_paths']:
+        with open(barchart_path) as file:
+            chart_spec = json.load(file)
+        chart_rides[os.path.basename(barchart_path)] = (
+            chart_spec['data']['values'][0]['AVG_RIDES'])
+
+    assert chart_rides == expected
+
+
+def test_prep_heatmap_data_selection(input_df: pd.DataFrame):
+    """
+    Tests the following:
+    1. Tests whether ridership tiers are not created if no heatmap matches
+        the selected periods.
+
+    Arguments:
+        input_df (DataFrame): Small dataframe of generic ridership data.
+
+    Returns:
+        NONE
+    """
+
+    results = prep_heatmap_data(
+        bus_data=input_df,
+        bus_data_args=BusDataArguments(),
+        periods=['1900_1910'])
+
+    assert results == {'heatmap_dfs': [], 'tiered_bus_data': None}
+
+
+def test_export_analysis_data(
+        input_route_lifecycle_df: pd.DataFrame,
+        tmp_path):
+    """
+    Tests the following:
+    1. Tests whether the prepared data is saved as CSV files.
+    2. Tests whether no visualizations are created.
+
+    Arguments:
+        input_route_lifecycle_df (DataFrame): Small dataframe of generic
+            ridership data.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    data_file_paths = export_analysis_data(
+        df_or_path=input_route_lifecycle_df,
+        output_dir=f'{tmp_path}/')
+
+    assert set(data_file_paths) == {'agg_year', 'route_index',
+                                    'route_count_df'}
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        os.path.basename(path) for path in data_file_paths.values())
+
+    route_count_df = pd.read_csv(data_file_paths['route_count_df'])
+    assert route_count_df['COUNT'].tolist() == [2, 1, 2]
+
+
+def test_save_analysis_dashboard(
+        input_df: pd.DataFrame,
+        tmp_path):
+    """
+    Tests the following:
+    1. Tests whether one dashboard is created instead of separate
+        visualizations.
+    2. Tests whether the data is embedded once and the day types in the
+        data can be selected.
+    3. Tests whether yearly ridership and rankings are calculated in
+        advance.
+
+    Arguments:
+        input_df (DataFrame): Small dataframe of generic ridership data.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    dashboard_path = save_analysis_dashboard(
+        df_or_path=input_df,
+        output_dir=f'{tmp_path}/',
+        config=AnalysisConfig(dashboard_args=DashboardArguments(
+            output_file='dashboard.json')))
+
+    assert dashboard_path == f'{tmp_path}/dashboard.json'
+    assert [file_name for file_name in os.listdir(tmp_path)
+            if not file_name.startswith('.')] == ['dashboard.json']
+
+    with open(dashboard_path) as file:
+        spec = json.load(file)
+
+    assert sorted(spec['datasets']) == ['monthly_ridership',
+                                        'yearly_ridership']
+    assert len(spec['datasets']['monthly_ridership']) == len(input_df)
+
+    yearly_ridership = pd.DataFrame(spec['datasets']['yearly_ridership'])
+    assert yearly_ridership['AVG_RIDES'].sum() == input_df['AVG_RIDES'].sum()
+    assert yearly_ridership.loc[
+        yearly_ridership['ROUTE'] == '100', 'RANK'].tolist() == [2]
+    assert yearly_ridership['RIDERSHIP_TIER_RANK'].eq(1).all()
+
+    params = {param['name']: param for param in spec['params']}
+    assert params['day_type']['bind']['options'] == [
+        'Weekday', 'Saturday', 'Sunday - Holiday']
+    assert params['start_year']['value'] == 2001
+    assert params['end_year']['value'] == 2022
+
+
+def test_save_analysis_dashboard_value_exceptions(
+        input_df: pd.DataFrame,
+        tmp_path):
+    """
+    Tests the following:
+    1. Tests whether ValueErrors are raised if a day type in the
+        configuration is not in the bus data.
+
+    Arguments:
+        input_df (DataFrame): Small dataframe of generic ridership data.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    with pytest.raises(ValueError):
+        save_analysis_dashboard(
+            df_or_path=input_df,
+            output_dir=f'{tmp_path}/',
+            config=AnalysisConfig(day_types=['Holiday']))
+
+
+@pytest.mark.parametrize(
+    "bumpchart_rankings,shared",
+    [(0, True),
+     (1, False)])
+def test_run_analysis_bumpchart_rankings(
+        bumpchart_rankings: int,
+        shared: bool,
+        input_route_lifecycle_df: pd.DataFrame,
+        tmp_path):
+    """
+    Tests the following:
+    1. Tests whether bump charts use the rankings of the line charts if both
+        rank routes the same way.
+    2. Tests whether bump charts create their own rankings otherwise.
+
+    Arguments:
+        bumpchart_rankings (int): The number of routes ranked in each bump
+            chart.
+        shared (bool): Whether the bump charts rank routes the same way as
+            the line charts.
+        input_route_lifecycle_df (DataFrame): Small dataframe of generic
+            ridership data.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    results = run_analysis(
+        df_or_path=input_route_lifecycle_df,
+        output_dir=f'{tmp_path}/',
+        config=AnalysisConfig(
+            chart_families=['bump'],
+            rrtsa_args=LineChartArguments(num_rankings=0),
+            bumpchart_args=BumpChartArguments(
+                num_rankings=bumpchart_rankings),
+            renderer_args=RendererArguments(output_format='json')))
+
+    for linechart_df, bumpchart_df in zip(results['linechart_dfs'],
+                                          results['bumpchart_dfs']):
+        if not shared:
+            linechart_df = linechart_df[
+                linechart_df['RANK'] <= bumpchart_rankings]
+
+        assert pd.api.types.is_string_dtype(bumpchart_df['YEAR'])
+        assert bumpchart_df['ROUTE'].tolist() == linechart_df['ROUTE'].tolist()
+        assert bumpchart_df['RANK'].tolist() == linechart_df['RANK'].tolist()
+
+    assert len(results['bumpchart_paths']) == len(results['bumpchart_dfs'])
+
+
+def test_run_analysis_value_exceptions(
+        input_route_lifecycle_df: pd.DataFrame,
+        tmp_path):
+    """
+    Tests the following:
+    1. Tests whether ValueErrors are raised if a chart family is unknown.
+
+    Arguments:
+        input_route_lifecycle_df (DataFrame): Small dataframe of generic
+            ridership data.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    with pytest.raises(ValueError):
+        run_analysis(
+            df_or_path=input_route_lifecycle_df,
+            output_dir=f'{tmp_path}/',
+            config=AnalysisConfig(chart_families=['pie']))
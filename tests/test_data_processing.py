@@ -7,9 +7,13 @@ import pandas as pd
 import pytest
 
 from data_processing import (change_column_datatype,
+                             create_facet_pages,
                              create_rankings,
+                             is_selected_data,
+                             select_chart_data,
                              split_df,
-                             subset_dataframes_by_value)
+                             subset_dataframes_by_value,
+                             validate_bus_data)
 
 
 @pytest.mark.parametrize(
@@ -346,3 +350,247 @@ def test_subset_dataframes_by_value_value_exceptions(
             operator=operator,
             target_col=target_col,
             filter_val=filter_val)
+
+
+@pytest.mark.parametrize(
+    "df,drop_rows,drop_cols,expected",
+    [('input_route_lifecycle_df', [9], [], []),
+     ('input_route_lifecycle_df',
+      [],
+      [],
+      ['1 rows repeat a route, year, month and day type']),
+     ('input_route_lifecycle_df',
+      [9],
+      ['AVG_RIDES'],
+      ["Missing columns ['AVG_RIDES']"]),
+     ('input_df', [], [], ['The values of MONTH are not numeric'])])
+def test_validate_bus_data(
+        df: pd.DataFrame,
+        drop_rows: list[int],
+        drop_cols: list[str],
+        expected: list[str],
+        request):
+    """
+    Tests the following:
+    1. Tests whether no problems are found in valid data.
+    2. Tests whether repeated rows, missing columns and non-numeric values
+        are reported.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe of ridership data.
+        drop_rows (intList): Rows to remove from 'df' before validating.
+        drop_cols (strList): Columns to remove from 'df' before validating.
+        expected (strList): The expected test case.
+        request: Pytest request used to load fixtures by name.
+
+    Returns:
+        NONE
+    """
+
+    df = request.getfixturevalue(df)
+    df = df.drop(index=drop_rows, columns=drop_cols)
+
+    problems = validate_bus_data(
+        df=df,
+        columns={'ROUTE': False,
+                 'YEAR': True,
+                 'MONTH': True,
+                 'DAY_TYPE': False,
+                 'AVG_RIDES': True},
+        day_types=['Weekday', 'Saturday', 'Sunday - Holiday'])
+
+    assert problems == expected
+
+
+@pytest.mark.parametrize(
+    "df,columns,sum_col,expected",
+    [('input_df',
+      ['YEAR', 'AVG_RIDES', 'YEAR'],
+      None,
+      {'YEAR': [2022, 2001, 2022, 2001], 'AVG_RIDES': [812, 1076, 363, 312]}),
+     ('input_df',
+      ['YEAR', 'AVG_RIDES'],
+      'AVG_RIDES',
+      {'YEAR': [2022, 2001], 'AVG_RIDES': [1175, 1388]}),
+     ('input_df',
+      ['ROUTE', 'AVG_RIDES'],
+      'AVG_RIDES',
+      {'ROUTE': ['1', '97', '100', 'X21'],
+       'AVG_RIDES': [812, 1076, 363, 312]})])
+def test_select_chart_data(
+        df: pd.DataFrame,
+        columns: list[str],
+        sum_col: str,
+        expected: dict,
+        request):
+    """
+    Tests the following:
+    1. Tests whether only the specified columns are kept, once each.
+    2. Tests whether rows sharing every other column are summed in the order
+        they first appear.
+    3. Tests whether rows are unchanged if no rows need to be summed.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe of ridership data.
+        columns (strList): The columns to keep.
+        sum_col (str): The column to sum.
+        expected (dict): The expected test case.
+        request: Pytest request used to load fixtures by name.
+
+    Returns:
+        NONE
+    """
+
+    df = request.getfixturevalue(df)
+
+    chart_df = select_chart_data(df=df, columns=columns, sum_col=sum_col)
+
+    pd.testing.assert_frame_equal(
+        chart_df.reset_index(drop=True),
+        pd.DataFrame(expected))
+
+
+def test_select_chart_data_value_exceptions(input_df: pd.DataFrame):
+    """
+    Tests the following:
+    1. Tests whether ValueErrors are raised if the column to sum is not one
+        of the selected columns.
+
+    Arguments:
+        input_df (DataFrame): Small dataframe of generic ridership data.
+
+    Returns:
+        NONE
+    """
+
+    with pytest.raises(ValueError):
+        select_chart_data(
+            df=input_df,
+            columns=['ROUTE', 'YEAR'],
+            sum_col='AVG_RIDES')
+
+
+@pytest.mark.parametrize(
+    "page_size,expected",
+    [(2, [['1', '100'], ['97', 'X21']]),
+     (4, [['1', '97', '100', 'X21']]),
+     (10, [['1', '97', '100', 'X21']])])
+def test_create_facet_pages(
+        page_size: int,
+        expected: list[list[str]],
+        input_df: pd.DataFrame):
+    """
+    Tests the following:
+    1. Tests whether facet values are split into pages of at most
+        'page_size' values in ascending order.
+    2. Tests whether a single page is returned if every facet value fits on
+        one page.
+
+    Arguments:
+        page_size (int): The maximum number of facet values on each page.
+        expected (list): The expected facet values of each page.
+        input_df (DataFrame): Small dataframe of generic ridership data.
+
+    Returns:
+        NONE
+    """
+
+    pages = create_facet_pages(
+        df=input_df,
+        facet_col='ROUTE',
+        page_size=page_size)
+
+    assert [page['ROUTE'].tolist() for page in pages] == expected
+    assert sum(len(page) for page in pages) == len(input_df)
+
+
+def test_create_facet_pages_value_exceptions(input_df: pd.DataFrame):
+    """
+    Tests the following:
+    1. Tests whether ValueErrors are raised if the value of 'page_size' is
+        less than one.
+
+    Arguments:
+        input_df (DataFrame): Small dataframe of generic ridership data.
+
+    Returns:
+        NONE
+    """
+
+    with pytest.raises(ValueError):
+        create_facet_pages(df=input_df, facet_col='ROUTE', page_size=0)
+
+
+@pytest.mark.parametrize(
+    "df,day_types,periods,years,expected",
+    [(pd.DataFrame({'DAY_TYPE': ['Weekday'], 'YEAR': [2005]}),
+      None, None, None, True),
+     (pd.DataFrame({'DAY_TYPE': ['Sunday - Holiday'], 'YEAR': ['2005']}),
+      ['Sunday'], ['1999_2009'], None, True),
+     (pd.DataFrame({'DAY_TYPE': ['Saturday'], 'YEAR': [2005]}),
+      ['Weekday', 'Sunday - Holiday'], None, None, False),
+     (pd.DataFrame({'DAY_TYPE': ['Weekday', 'Weekday'], 'YEAR': [2005, 2021]}),
+      None, ['2020_2023'], None, False),
+     (pd.DataFrame({'DAY_TYPE': ['Weekday', 'Weekday'], 'YEAR': [2005, 2021]}),
+      None, ['1999_2023'], None, True),
+     (pd.DataFrame({'YEAR': ['1999', '2023']}),
+      ['Weekday'], ['1999_2023'], None, True),
+     (pd.DataFrame({'DAY_TYPE': ['Weekday']}),
+      None, ['2020_2023'], [2019, 2023], False),
+     (pd.DataFrame({'DAY_TYPE': ['Weekday']}),
+      None, ['2010_2023'], [2019, 2023], True),
+     (pd.DataFrame({'DAY_TYPE': [], 'YEAR': []}),
+      ['Weekday'], None, None, False)])
+def test_is_selected_data(
+        df: pd.DataFrame,
+        day_types: list[str] | None,
+        periods: list[str] | None,
+        years: list[int] | None,
+        expected: bool):
+    """
+    Tests the following:
+    1. Tests whether all data is selected if no day types or periods are
+        specified.
+    2. Tests whether data is selected by the day types it contains, comparing
+        only the first word of each day type.
+    3. Tests whether data is only selected by a period that contains every
+        year it shows, including years given separately from the data.
+    4. Tests whether data without a day type column is not filtered by day
+        type.
+    5. Tests whether empty data is not selected for any day type.
+
+    Arguments:
+        df (DataFrame): The data of a chart.
+        day_types (strList): The day types to select.
+        periods (strList): The periods to select.
+        years (intList): The years the chart shows.
+        expected (bool): The expected test case.
+
+    Returns:
+        NONE
+    """
+
+    assert is_selected_data(
+        df=df,
+        day_types=day_types,
+        periods=periods,
+        years=years) == expected
+
+
+def test_is_selected_data_value_exceptions():
+    """
+    Tests the following:
+    1. Tests whether ValueErrors are raised if a period is not written as two
+        years joined by an underscore.
+
+    Arguments:
+        NONE
+
+    Returns:
+        NONE
+    """
+
+    with pytest.raises(ValueError):
+        is_selected_data(
+            df=pd.DataFrame({'YEAR': [2005]}),
+            periods=['2005'])
@@ -2,35 +2,49 @@
 Description: Tests for file io functions.
 """
 
+import json
+
 import pytest
 
-from file_io import (create_absolute_file_paths)
+from file_io import (create_absolute_file_paths,
+                     create_page_file_paths,
+                     find_output_file_path,
+                     save_page_index)
 
 
 @pytest.mark.parametrize(
-    "file_list,file_path,expected",
+    "file_list,file_path,extension,expected",
     [(["file1.csv",
        "file2.csv",
        "file3.csv"],
        "/dir1/",
+      None,
       ["/dir1/file1.csv",
        "/dir1/file2.csv",
        "/dir1/file3.csv"]),
-     (["file1.csv"], "/dir1/", "/dir1/file1.csv")])
+     (["file1.csv"], "/dir1/", None, "/dir1/file1.csv"),
+     (["file1.png", "file.2.png"],
+      "/dir1/",
+      "json",
+      ["/dir1/file1.json", "/dir1/file.2.json"])])
 def test_create_absolute_file_paths(
         file_list: list[str],
         file_path: str,
+        extension: str,
         expected: list[str]) -> list[str] | str:
     """
     Tests the following:
     1. Tests whether specified files were correctly joined with a
         corresponding absolute file path.
+    2. Tests whether the extension of each file is replaced if specified.
 
     Arguments:
         file_list (strList): List of files to join with a specified absolute
             path.
         file_path (str): The file path to join the files specified in
             'file_list' to.
+        extension (str): The extension to replace the extension of each file
+            with.
         expected (StrList): The expected test case.
 
     Returns:
@@ -39,7 +53,8 @@ def test_create_absolute_file_paths(
     """
     test_file_paths = create_absolute_file_paths(
         file_list=file_list,
-        file_path=file_path)
+        file_path=file_path,
+        extension=extension)
 
     assert test_file_paths == expected
 
@@ -113,3 +128,108 @@ def test_create_absolute_file_paths_value_exceptions(
             file_list=file_list,
             file_path=file_path)
 
+
+@pytest.mark.parametrize(
+    "labels,expected",
+    [(["Weekday", "1999_2009"], "/dir1/weekday_ridership_barchart_1999_2009.png"),
+     (["Sunday - Holiday", "1999_2009"],
+      "/dir1/sunday_ridership_barchart_1999_2009.png"),
+     (["saturday", "2010_2019"],
+      "/dir1/saturday_ridership_barchart_2010_2019.png")])
+def test_find_output_file_path(
+        labels: list[str],
+        expected: str):
+    """
+    Tests the following:
+    1. Tests whether the file whose name contains every label is found,
+        regardless of the order of the file names.
+    2. Tests whether only the first word of each label is compared and
+        comparisons are not case sensitive.
+
+    Arguments:
+        labels (strList): The labels of the chart.
+        expected (str): The expected test case.
+
+    Returns:
+        NONE
+
+    """
+
+    file_paths = ["/dir1/saturday_ridership_barchart_2010_2019.png",
+                  "/dir1/sunday_ridership_barchart_1999_2009.png",
+                  "/dir1/weekday_ridership_barchart_1999_2009.png"]
+
+    assert find_output_file_path(
+        file_paths=file_paths,
+        labels=labels) == expected
+
+
+def test_find_output_file_path_value_exceptions():
+    """
+    Tests the following:
+    1. Tests whether a ValueError is raised if no file name contains every
+        label.
+
+    Arguments:
+        NONE
+
+    Returns:
+        NONE
+
+    """
+
+    with pytest.raises(ValueError):
+        find_output_file_path(
+            file_paths=["/dir1/weekday_ridership_barchart_1999_2009.png"],
+            labels=["Weekday", "2020_2023"])
+
+
+def test_create_page_file_paths():
+    """
+    Tests the following:
+    1. Tests whether a numbered file path is created for each page.
+
+    Arguments:
+        NONE
+
+    Returns:
+        NONE
+    """
+
+    page_paths = create_page_file_paths(
+        file_path='/dir1/weekday_ridership_heatmap_1999_2023_low.png',
+        n_pages=2)
+
+    assert page_paths == [
+        '/dir1/weekday_ridership_heatmap_1999_2023_low_page_1.png',
+        '/dir1/weekday_ridership_heatmap_1999_2023_low_page_2.png']
+
+
+def test_save_page_index(tmp_path):
+    """
+    Tests the following:
+    1. Tests whether the file and facet values of each page are saved next
+        to the pages.
+
+    Arguments:
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    file_path = str(tmp_path / 'heatmap.png')
+    page_paths = create_page_file_paths(file_path=file_path, n_pages=2)
+
+    index_path = save_page_index(
+        file_path=file_path,
+        page_paths=page_paths,
+        page_facets=[['1', '2'], ['3']])
+
+    assert index_path == str(tmp_path / 'heatmap_index.json')
+
+    with open(index_path) as file:
+        assert json.load(file) == {
+            'chart': 'heatmap.png',
+            'pages': [{'file': 'heatmap_page_1.png', 'facets': ['1', '2']},
+                      {'file': 'heatmap_page_2.png', 'facets': ['3']}]}
@@ -0,0 +1,176 @@
+"""
+Description: Tests for functions that instrument analysis steps.
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from instrumentation import (instrument,
+                             save_run_report,
+                             start_run_report,
+                             stop_run_report)
+
+
+@instrument
+def filter_even_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Instrumented function that keeps every other row of a dataframe.
+
+    Arguments:
+        df (DataFrame): The dataframe to filter.
+
+    Returns:
+        Dataframe containing the even rows of 'df'.
+    """
+
+    return df.iloc[::2]
+
+
+@instrument(name='allocate', kind='stage')
+def allocate_and_filter(df: pd.DataFrame) -> dict:
+    """
+    Instrumented function that allocates memory and calls another
+    instrumented function.
+
+    Arguments:
+        df (DataFrame): The dataframe to filter.
+
+    Returns:
+        Dictionary containing the filtered dataframe.
+    """
+
+    buffer = bytearray(2_000_000)
+    filtered = filter_even_rows(df=df)
+    del buffer
+
+    return {'filtered': filtered}
+
+
+@pytest.fixture
+def run_report() -> dict:
+    """
+    Records a run report for two calls of instrumented functions.
+
+    Arguments:
+        NONE
+
+    Returns:
+        Dictionary containing the run report.
+    """
+
+    df = pd.DataFrame({'VALUE': range(10)})
+
+    start_run_report()
+    try:
+        allocate_and_filter(df=df)
+    finally:
+        run_report = stop_run_report()
+
+    return run_report
+
+
+def test_instrument_records(run_report: dict):
+    """
+    Tests the following:
+    1. Tests whether a record is created for every instrumented call,
+        including nested calls.
+    2. Tests whether rows in and out are counted from dataframe arguments and
+        results.
+    3. Tests whether the peak memory of a call includes the memory allocated
+        by the functions it calls.
+
+    Arguments:
+        run_report (dict): The recorded run report.
+
+    Returns:
+        NONE
+    """
+
+    records = {record['name']: record for record in run_report['records']}
+
+    assert set(records) == {'test_instrumentation.filter_even_rows',
+                            'allocate'}
+
+    inner_record = records['test_instrumentation.filter_even_rows']
+    outer_record = records['allocate']
+
+    assert inner_record['kind'] == 'function'
+    assert outer_record['kind'] == 'stage'
+    assert (inner_record['rows_in'], inner_record['rows_out']) == (10, 5)
+    assert (outer_record['rows_in'], outer_record['rows_out']) == (10, 5)
+    assert outer_record['peak_memory'] >= 2_000_000
+    assert outer_record['peak_memory'] >= inner_record['peak_memory']
+    assert outer_record['wall_time'] >= inner_record['wall_time']
+    assert run_report['summary']['allocate']['calls'] == 1
+
+
+def test_run_report_peak_memory():
+    """
+    Tests the following:
+    1. Tests whether the peak memory of the run includes calls made before
+        the last instrumented call.
+
+    Arguments:
+        NONE
+
+    Returns:
+        NONE
+    """
+
+    df = pd.DataFrame({'VALUE': range(10)})
+
+    start_run_report()
+    try:
+        allocate_and_filter(df=df)
+        filter_even_rows(df=df)
+    finally:
+        run_report = stop_run_report()
+
+    records = {record['name']: record for record in run_report['records']}
+
+    assert run_report['peak_memory'] >= 2_000_000
+    assert run_report['peak_memory'] >= records['allocate']['peak_memory']
+
+
+def test_instrument_disabled():
+    """
+    Tests the following:
+    1. Tests whether instrumented functions return their usual result while
+        no run report is being recorded.
+    2. Tests whether stopping a run report that was never started returns
+        None.
+
+    Arguments:
+        NONE
+
+    Returns:
+        NONE
+    """
+
+    df = pd.DataFrame({'VALUE': range(4)})
+
+    pd.testing.assert_frame_equal(filter_even_rows(df=df), df.iloc[::2])
+    assert stop_run_report() is None
+
+
+def test_save_run_report(run_report: dict, tmp_path):
+    """
+    Tests the following:
+    1. Tests whether a run report is saved as a JSON file.
+
+    Arguments:
+        run_report (dict): The recorded run report.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    output_path = str(tmp_path / 'reports' / 'run_report.json')
+
+    save_run_report(run_report=run_report, output_path=output_path)
+
+    with open(output_path) as file:
+        assert json.load(file) == run_report
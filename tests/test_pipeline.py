@@ -0,0 +1,682 @@
+"""
+Description: Tests for functions that define and run analysis stages.
+"""
+
+import functools
+import importlib
+import os
+import sys
+import threading
+
+import pandas as pd
+import pytest
+
+import pipeline
+from pipeline import (Stage,
+                      fingerprint_value,
+                      load_run_manifest,
+                      run_stages,
+                      select_stages,
+                      validate_stages)
+
+
+def add_values(x: int, y: int) -> dict:
+    """
+    Stage function that adds two values.
+
+    Arguments:
+        x (int): The first value.
+        y (int): The second value.
+
+    Returns:
+        Dictionary containing the sum of both values.
+    """
+
+    return {'total': x + y}
+
+
+def double_value(total: int) -> dict:
+    """
+    Stage function that doubles a value.
+
+    Arguments:
+        total (int): The value to double.
+
+    Returns:
+        Dictionary containing the doubled value.
+    """
+
+    return {'doubled': total * 2}
+
+
+def square_value(total: int) -> dict:
+    """
+    Stage function that squares a value.
+
+    Arguments:
+        total (int): The value to square.
+
+    Returns:
+        Dictionary containing the squared value.
+    """
+
+    return {'squared': total ** 2}
+
+
+@pytest.fixture
+def stages() -> list[Stage]:
+    """
+    Creates a small set of stages in which two independent stages depend on
+    a single upstream stage.
+
+    Arguments:
+        NONE
+
+    Returns:
+        List of stages.
+    """
+
+    stages = [
+        Stage(name='double',
+              func=double_value,
+              inputs=['total'],
+              outputs=['doubled']),
+        Stage(name='square',
+              func=square_value,
+              inputs=['total'],
+              outputs=['squared']),
+        Stage(name='add',
+              func=add_values,
+              inputs=['x', 'y'],
+              outputs=['total'])]
+
+    return stages
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_run_stages(stages: list[Stage], max_workers: int):
+    """
+    Tests the following:
+    1. Whether stages run in dependency order regardless of the order they
+        are listed in.
+    2. Whether the outputs of every stage are returned when running stages
+        one at a time and concurrently.
+
+    Arguments:
+        stages (StageList): The stages to run.
+        max_workers (int): The maximum number of stages to run at the same
+            time.
+
+    Returns:
+        NONE
+    """
+
+    values = run_stages(
+        stages=stages,
+        initial_values={'x': 2, 'y': 3},
+        max_workers=max_workers)
+
+    assert values == {'x': 2, 'y': 3, 'total': 5, 'doubled': 10,
+                      'squared': 25}
+
+
+def test_run_stages_concurrently():
+    """
+    Tests the following:
+    1. Whether independent stages run at the same time. Each stage waits for
+        the other to start, so the test fails if they run one after another.
+
+    Arguments:
+        NONE
+
+    Returns:
+        NONE
+    """
+
+    barrier = threading.Barrier(parties=2, timeout=10)
+
+    def first_stage(value_1: int) -> dict:
+        barrier.wait()
+        return {'result_1': value_1}
+
+    def second_stage(value_2: int) -> dict:
+        barrier.wait()
+        return {'result_2': value_2}
+
+    stages = [
+        Stage(name='first',
+              func=first_stage,
+              inputs=['value_1'],
+              outputs=['result_1']),
+        Stage(name='second',
+              func=second_stage,
+              inputs=['value_2'],
+              outputs=['result_2'])]
+
+    values = run_stages(
+        stages=stages,
+        initial_values={'value_1': 1, 'value_2': 2},
+        max_workers=2)
+
+    assert values['result_1'] == 1
+    assert values['result_2'] == 2
+
+
+@pytest.mark.parametrize(
+    "invalid_stages,initial_values",
+    [([Stage(name='add', func=add_values, inputs=['x', 'y'],
+             outputs=['total']),
+       Stage(name='add', func=add_values, inputs=['x', 'y'],
+             outputs=['other_total'])],
+      ['x', 'y']),
+     ([Stage(name='add', func=add_values, inputs=['x', 'y'],
+             outputs=['total']),
+       Stage(name='add_again', func=add_values, inputs=['x', 'y'],
+             outputs=['total'])],
+      ['x', 'y']),
+     ([Stage(name='add', func=add_values, inputs=['x', 'y'],
+             outputs=['total'])],
+      ['x']),
+     ([Stage(name='double', func=double_value, inputs=['total'],
+             outputs=['doubled']),
+       Stage(name='add', func=add_values, inputs=['x', 'doubled'],
+             outputs=['total'])],
+      ['x'])])
+def test_validate_stages_value_exceptions(
+        invalid_stages: list[Stage],
+        initial_values: list[str]):
+    """
+    Tests the following:
+    1. Tests whether ValueErrors are raised if stage names are not unique.
+    2. Tests whether ValueErrors are raised if a value is produced by more
+        than one stage.
+    3. Tests whether ValueErrors are raised if an input is never produced.
+    4. Tests whether ValueErrors are raised if stages contain a cycle.
+
+    Arguments:
+        invalid_stages (StageList): The stages to validate.
+        initial_values (strList): The names of values that are available
+            before any stage runs.
+
+    Returns:
+        NONE
+    """
+
+    with pytest.raises(ValueError):
+        validate_stages(stages=invalid_stages, initial_values=initial_values)
+
+
+@pytest.mark.parametrize(
+    "targets,expected_names",
+    [(['double'], ['double', 'add']),
+     (['add'], ['add']),
+     (['square', 'double'], ['double', 'square', 'add'])])
+def test_select_stages(
+        stages: list[Stage],
+        targets: list[str],
+        expected_names: list[str]):
+    """
+    Tests the following:
+    1. Tests whether the target stages and the stages they depend on are
+        selected in their original order.
+    2. Tests whether stages that the targets do not depend on are removed.
+
+    Arguments:
+        stages (StageList): The stages to select from.
+        targets (strList): The names of the stages to run.
+        expected_names (strList): The expected test case.
+
+    Returns:
+        NONE
+    """
+
+    selected = select_stages(stages=stages, targets=targets)
+
+    assert [stage.name for stage in selected] == expected_names
+
+
+def test_select_stages_value_exceptions(stages: list[Stage]):
+    """
+    Tests the following:
+    1. Tests whether ValueErrors are raised if a target is not the name of a
+        stage.
+
+    Arguments:
+        stages (StageList): The stages to select from.
+
+    Returns:
+        NONE
+    """
+
+    with pytest.raises(ValueError):
+        select_stages(stages=stages, targets=['cube'])
+
+
+def test_run_stages_key_exceptions():
+    """
+    Tests the following:
+    1. Tests whether a KeyError is raised if a stage does not return one of
+        its outputs.
+
+    Arguments:
+        NONE
+
+    Returns:
+        NONE
+    """
+
+    stages = [Stage(name='add',
+                    func=add_values,
+                    inputs=['x', 'y'],
+                    outputs=['sum'])]
+
+    with pytest.raises(KeyError):
+        run_stages(stages=stages, initial_values={'x': 1, 'y': 2})
+
+
+@pytest.mark.parametrize("use_memory_cache", [False, True])
+def test_run_stages_cache(
+        stages: list[Stage],
+        use_memory_cache: bool,
+        tmp_path):
+    """
+    Tests the following:
+    1. Whether stages with unchanged inputs reuse cached outputs instead of
+        running again.
+    2. Whether only the stages downstream of a changed input run again.
+    3. Whether both caching on disk and caching in memory behave the same.
+
+    Arguments:
+        stages (StageList): The stages to run.
+        use_memory_cache (bool): Whether to cache in memory instead of on
+            disk.
+        tmp_path: A pytest fixture providing a temporary directory.
+
+    Returns:
+        NONE
+    """
+
+    calls = []
+
+    def count_calls(stage: Stage) -> Stage:
+        func = stage.func
+
+        def counted_func(**kwargs) -> dict:
+            calls.append(stage.name)
+            return func(**kwargs)
+
+        stage.func = counted_func
+        return stage
+
+    stages = [count_calls(stage) for stage in stages]
+
+    if use_memory_cache:
+        cache_kwargs = {'memory_cache': {}}
+    else:
+        cache_kwargs = {'cache_dir': str(tmp_path)}
+
+    first_values = run_stages(
+        stages=stages,
+        initial_values={'x': 2, 'y': 3},
+        **cache_kwargs)
+    assert sorted(calls) == ['add', 'double', 'square']
+
+    calls.clear()
+    second_values = run_stages(
+        stages=stages,
+        initial_values={'x': 2, 'y': 3},
+        **cache_kwargs)
+    assert calls == []
+    assert second_values == first_values
+
+    # Changing an input that does not change the sum only reruns the first
+    # stage since the inputs of the remaining stages are unchanged.
+    calls.clear()
+    third_values = run_stages(
+        stages=stages,
+        initial_values={'x': 1, 'y': 4},
+        **cache_kwargs)
+    assert calls == ['add']
+    assert third_values['squared'] == 25
+
+
+@pytest.mark.parametrize("use_memory_cache", [True, False])
+def test_run_stages_rerun_stages(
+        stages: list[Stage],
+        use_memory_cache: bool,
+        tmp_path):
+    """
+    Tests the following:
+    1. Whether stages that must be rerun ignore cached outputs while the
+        remaining stages reuse theirs.
+
+    Arguments:
+        stages (StageList): The stages to run.
+        use_memory_cache (bool): Whether to cache in memory instead of on
+            disk.
+        tmp_path: A pytest fixture providing a temporary directory.
+
+    Returns:
+        NONE
+    """
+
+    calls = []
+
+    def count_calls(stage: Stage) -> Stage:
+        func = stage.func
+
+        def counted_func(**kwargs) -> dict:
+            calls.append(stage.name)
+            return func(**kwargs)
+
+        stage.func = counted_func
+        return stage
+
+    stages = [count_calls(stage) for stage in stages]
+
+    if use_memory_cache:
+        cache_kwargs = {'memory_cache': {}}
+    else:
+        cache_kwargs = {'cache_dir': str(tmp_path)}
+
+    run_stages(
+        stages=stages,
+        initial_values={'x': 2, 'y': 3},
+        **cache_kwargs)
+
+    calls.clear()
+    values = run_stages(
+        stages=stages,
+        initial_values={'x': 2, 'y': 3},
+        rerun_stages=['square'],
+        **cache_kwargs)
+
+    assert calls == ['square']
+    assert values['squared'] == 25
+
+
+def test_run_stages_cache_code_changes(tmp_path, monkeypatch):
+    """
+    Tests the following:
+    1. Whether cached outputs are not reused after a module called by a
+        stage changes, even if the stage function itself is unchanged.
+
+    Arguments:
+        tmp_path: A pytest fixture providing a temporary directory.
+        monkeypatch: A pytest fixture for temporarily changing sys.path.
+
+    Returns:
+        NONE
+    """
+
+    code_dir = tmp_path / 'code'
+    code_dir.mkdir()
+    (code_dir / 'helper_module.py').write_text(
+        'def scale(x):\n    return x * 2\n')
+    (code_dir / 'stage_module.py').write_text(
+        'from helper_module import scale\n\n\n'
+        'def scale_stage(x):\n    return {"scaled": scale(x)}\n')
+    monkeypatch.syspath_prepend(str(code_dir))
+
+    def run_scale_stage() -> int:
+        for module_name in ['helper_module', 'stage_module']:
+            sys.modules.pop(module_name, None)
+        pipeline._get_code_fingerprint.cache_clear()
+
+        stage_module = importlib.import_module('stage_module')
+        return run_stages(
+            stages=[Stage(name='scale',
+                          func=stage_module.scale_stage,
+                          inputs=['x'],
+                          outputs=['scaled'])],
+            initial_values={'x': 3},
+            cache_dir=str(tmp_path / 'cache'))['scaled']
+
+    assert run_scale_stage() == 6
+
+    (code_dir / 'helper_module.py').write_text(
+        'def scale(x):\n    return x * 3\n')
+
+    assert run_scale_stage() == 9
+
+
+def test_run_stages_cache_constant_changes(tmp_path, monkeypatch):
+    """
+    Tests the following:
+    1. Whether editing a dataclass in a data-only module only reruns the
+        stages that take it as an input.
+    2. Whether editing a value in a data-only module reruns the stages that
+        use it.
+
+    Arguments:
+        tmp_path: A pytest fixture providing a temporary directory.
+        monkeypatch: A pytest fixture for temporarily changing sys.path.
+
+    Returns:
+        NONE
+    """
+
+    code_dir = tmp_path / 'code'
+    code_dir.mkdir()
+    constants_source = (
+        'from dataclasses import dataclass\n\n'
+        'file_names = {"double": "double.txt"}\n\n\n'
+        '@dataclass\n'
+        'class TitleArguments:\n'
+        '    title: str = "Doubled"\n')
+    (code_dir / 'constants_module.py').write_text(constants_source)
+    (code_dir / 'stage_module.py').write_text(
+        'from constants_module import file_names\n\n\n'
+        'def double_stage(x):\n'
+        '    return {"doubled": x * 2, "file_name": file_names["double"]}\n'
+        '\n\n'
+        'def title_stage(doubled, title_args):\n'
+        '    return {"titled": f"{title_args.title}: {doubled}"}\n')
+    monkeypatch.syspath_prepend(str(code_dir))
+
+    calls = []
+
+    def count_calls(stage: Stage) -> Stage:
+        func = stage.func
+
+        @functools.wraps(func)
+        def counted_func(**kwargs) -> dict:
+            calls.append(stage.name)
+            return func(**kwargs)
+
+        stage.func = counted_func
+        return stage
+
+    def run_title_stages() -> str:
+        for module_name in ['constants_module', 'stage_module']:
+            sys.modules.pop(module_name, None)
+        pipeline._get_code_fingerprint.cache_clear()
+        calls.clear()
+
+        constants_module = importlib.import_module('constants_module')
+        stage_module = importlib.import_module('stage_module')
+        stages = [Stage(name='double',
+                        func=stage_module.double_stage,
+                        inputs=['x'],
+                        outputs=['doubled', 'file_name']),
+                  Stage(name='title',
+                        func=stage_module.title_stage,
+                        inputs=['doubled', 'title_args'],
+                        outputs=['titled'])]
+        return run_stages(
+            stages=[count_calls(stage) for stage in stages],
+            initial_values={'x': 3,
+                            'title_args': constants_module.TitleArguments()},
+            cache_dir=str(tmp_path / 'cache'))['titled']
+
+    assert run_title_stages() == 'Doubled: 6'
+    assert sorted(calls) == ['double', 'title']
+
+    (code_dir / 'constants_module.py').write_text(
+        constants_source.replace('"Doubled"', '"Twice"'))
+
+    assert run_title_stages() == 'Twice: 6'
+    assert calls == ['title']
+
+    (code_dir / 'constants_module.py').write_text(
+        constants_source.replace('double.txt', 'twice.txt'))
+
+    run_title_stages()
+    assert calls == ['double']
+
+
+def test_run_stages_cache_file_outputs(tmp_path):
+    """
+    Tests the following:
+    1. Whether a stage that writes files runs again if its files were
+        deleted since the previous run.
+
+    Arguments:
+        tmp_path: A pytest fixture providing a temporary directory.
+
+    Returns:
+        NONE
+    """
+
+    output_path = os.path.join(str(tmp_path), 'output.txt')
+    calls = []
+
+    def write_file(text: str) -> dict:
+        calls.append(text)
+        with open(output_path, 'w') as file:
+            file.write(text)
+        return {'output_paths': [output_path]}
+
+    stages = [Stage(name='write',
+                    func=write_file,
+                    inputs=['text'],
+                    outputs=['output_paths'],
+                    file_outputs=['output_paths'])]
+    cache_dir = os.path.join(str(tmp_path), 'cache')
+
+    for _ in range(2):
+        run_stages(
+            stages=stages,
+            initial_values={'text': 'bus'},
+            cache_dir=cache_dir)
+    assert calls == ['bus']
+
+    os.remove(output_path)
+    run_stages(
+        stages=stages,
+        initial_values={'text': 'bus'},
+        cache_dir=cache_dir)
+    assert calls == ['bus', 'bus']
+    assert os.path.isfile(output_path)
+
+
+@pytest.mark.parametrize(
+    "value,same_value,different_value",
+    [(pd.DataFrame({'ROUTE': ['1', '3'], 'AVG_RIDES': [812, 1076]}),
+      pd.DataFrame({'ROUTE': ['1', '3'], 'AVG_RIDES': [812, 1076]}),
+      pd.DataFrame({'ROUTE': ['1', '3'], 'AVG_RIDES': [812, 1077]})),
+     ([1, 'a', {'b': 2}],
+      [1, 'a', {'b': 2}],
+      [1, 'a', {'b': 3}]),
+     (pd.DataFrame({'YEAR': [2019]}),
+      pd.DataFrame({'YEAR': [2019]}),
+      pd.DataFrame({'YEAR': ['2019']}))])
+def test_fingerprint_value(value, same_value, different_value):
+    """
+    Tests the following:
+    1. Whether equal dataframes have the same fingerprint and dataframes
+        with different values do not.
+    2. Whether nested lists and dictionaries are compared by content.
+    3. Whether dataframes with different data types have different
+        fingerprints.
+
+    Arguments:
+        value: The value to fingerprint.
+        same_value: A value equal to 'value'.
+        different_value: A value that differs from 'value'.
+
+    Returns:
+        NONE
+    """
+
+    assert fingerprint_value(value) == fingerprint_value(same_value)
+    assert fingerprint_value(value) != fingerprint_value(different_value)
+
+
+def test_run_stages_resume(stages: list[Stage], tmp_path):
+    """
+    Tests the following:
+    1. Whether the run manifest records completed and failed stages.
+    2. Whether resuming a failed run reuses the checkpoints of completed
+        stages and only runs the stages that did not complete.
+
+    Arguments:
+        stages (StageList): The stages to run.
+        tmp_path: A pytest fixture providing a temporary directory.
+
+    Returns:
+        NONE
+    """
+
+    calls = []
+    fail_square = [True]
+
+    def count_calls(stage: Stage) -> Stage:
+        func = stage.func
+
+        def counted_func(**kwargs) -> dict:
+            calls.append(stage.name)
+            if stage.name == 'square' and fail_square[0]:
+                raise RuntimeError('Square failed')
+            return func(**kwargs)
+
+        stage.func = counted_func
+        return stage
+
+    stages = [count_calls(stage) for stage in stages]
+    checkpoint_dir = str(tmp_path)
+
+    with pytest.raises(RuntimeError):
+        run_stages(
+            stages=stages,
+            initial_values={'x': 2, 'y': 3},
+            checkpoint_dir=checkpoint_dir)
+
+    run_manifest = load_run_manifest(checkpoint_dir=checkpoint_dir)
+    assert run_manifest['status'] == 'failed'
+    assert run_manifest['stages']['add']['status'] == 'completed'
+    assert run_manifest['stages']['square']['status'] == 'failed'
+
+    calls.clear()
+    fail_square[0] = False
+    values = run_stages(
+        stages=stages,
+        initial_values={'x': 2, 'y': 3},
+        checkpoint_dir=checkpoint_dir,
+        resume=True)
+
+    assert 'add' not in calls
+    assert 'square' in calls
+    assert values['squared'] == 25
+    assert load_run_manifest(checkpoint_dir=checkpoint_dir)['status'] == \
+        'completed'
+
+
+def test_run_stages_resume_value_exceptions(stages: list[Stage]):
+    """
+    Tests the following:
+    1. Whether ValueErrors are raised if a run is resumed without a
+        checkpoint directory.
+
+    Arguments:
+        stages (StageList): The stages to run.
+
+    Returns:
+        NONE
+    """
+
+    with pytest.raises(ValueError):
+        run_stages(
+            stages=stages,
+            initial_values={'x': 2, 'y': 3},
+            resume=True)
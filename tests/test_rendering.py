@@ -0,0 +1,269 @@
+"""
+Description: Tests for functions that render charts in parallel.
+"""
+
+import json
+import os
+
+import altair as alt
+import pandas as pd
+import pytest
+
+from constants import RendererArguments
+from rendering import (ChartRenderer,
+                       render_charts,
+                       shutdown_render_executor)
+
+
+def write_chart(output_path: str, text: str) -> None:
+    """
+    Chart function that writes text to a file instead of plotting data.
+
+    Arguments:
+        output_path (str): The file path to write to.
+        text (str): The text to write. Raises a ValueError if empty.
+
+    Returns:
+        None
+    """
+
+    if not text:
+        raise ValueError("No text to write")
+
+    with open(output_path, 'w') as file:
+        file.write(text)
+
+
+@pytest.fixture(autouse=True)
+def render_executor():
+    """
+    Shuts down the shared pool of rendering processes after each test.
+
+    Arguments:
+        NONE
+
+    Returns:
+        NONE
+    """
+
+    yield
+    shutdown_render_executor()
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_render_charts(n_workers: int, tmp_path):
+    """
+    Tests the following:
+    1. Tests whether every chart is created in one or more processes.
+    2. Tests whether output paths are returned in the order of the chart
+        arguments.
+
+    Arguments:
+        n_workers (int): The number of processes used to create charts.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    chart_kwargs = [{'output_path': str(tmp_path / f'chart_{i}.txt'),
+                     'text': f'chart {i}'}
+                    for i in range(4)]
+
+    output_paths = render_charts(
+        chart_func=write_chart,
+        chart_kwargs=chart_kwargs,
+        n_workers=n_workers)
+
+    assert output_paths == [kwargs['output_path'] for kwargs in chart_kwargs]
+
+    for i, output_path in enumerate(output_paths):
+        with open(output_path) as file:
+            assert file.read() == f'chart {i}'
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_render_charts_runtime_exceptions(n_workers: int, tmp_path):
+    """
+    Tests the following:
+    1. Tests whether RuntimeErrors are raised if a chart fails.
+    2. Tests whether the remaining charts are still created if a chart fails.
+
+    Arguments:
+        n_workers (int): The number of processes used to create charts.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    chart_kwargs = [{'output_path': str(tmp_path / f'chart_{i}.txt'),
+                     'text': f'chart {i}' if i != 1 else ''}
+                    for i in range(3)]
+
+    with pytest.raises(RuntimeError, match='chart_1.txt'):
+        render_charts(
+            chart_func=write_chart,
+            chart_kwargs=chart_kwargs,
+            n_workers=n_workers)
+
+    assert os.path.isfile(chart_kwargs[0]['output_path'])
+    assert os.path.isfile(chart_kwargs[2]['output_path'])
+
+
+def test_render_charts_value_exceptions():
+    """
+    Tests the following:
+    1. Tests whether ValueErrors are raised if the value of 'n_workers' is
+        less than one.
+
+    Arguments:
+        NONE
+
+    Returns:
+        NONE
+    """
+
+    with pytest.raises(ValueError):
+        render_charts(chart_func=write_chart, chart_kwargs=[], n_workers=0)
+
+
+def test_chart_renderer_save(input_df: pd.DataFrame, tmp_path):
+    """
+    Tests the following:
+    1. Tests whether charts saved by the renderer are identical to charts
+        saved by altair.
+
+    Arguments:
+        input_df (DataFrame): Small dataframe of generic ridership data.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    chart = alt.Chart(input_df).mark_bar().encode(
+        x='AVG_RIDES:Q',
+        y='ROUTE:O')
+
+    altair_path = str(tmp_path / 'altair_chart.png')
+    renderer_path = str(tmp_path / 'renderer_chart.png')
+
+    chart.save(altair_path)
+
+    renderer = ChartRenderer()
+    renderer.warm_up()
+    renderer.save_batch(charts=[(chart, renderer_path)])
+
+    with open(altair_path, 'rb') as altair_file, \
+            open(renderer_path, 'rb') as renderer_file:
+        assert altair_file.read() == renderer_file.read()
+
+
+@pytest.mark.parametrize(
+    "output_format,expected_start",
+    [('svg', '<svg'),
+     ('html', '<!DOCTYPE html>'),
+     ('json', '{')])
+def test_chart_renderer_save_output_formats(
+        output_format: str,
+        expected_start: str,
+        input_df: pd.DataFrame,
+        tmp_path):
+    """
+    Tests the following:
+    1. Tests whether charts are saved in the format of the output path.
+    2. Tests whether JSON files contain the Vega-Lite specification of the
+        chart.
+
+    Arguments:
+        output_format (str): The format to save the chart in.
+        expected_start (str): The expected start of the saved file.
+        input_df (DataFrame): Small dataframe of generic ridership data.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    chart = alt.Chart(input_df).mark_bar().encode(
+        x='AVG_RIDES:Q',
+        y='ROUTE:O')
+
+    output_path = str(tmp_path / f'chart.{output_format}')
+    ChartRenderer().save(chart=chart, output_path=output_path)
+
+    with open(output_path, encoding='utf-8') as file:
+        output = file.read()
+
+    assert output.startswith(expected_start)
+    if output_format == 'json':
+        assert json.loads(output) == chart.to_dict()
+
+
+def test_chart_renderer_save_unchanged(input_df: pd.DataFrame, tmp_path):
+    """
+    Tests the following:
+    1. Tests whether a chart identical to an existing output is not saved
+        again.
+    2. Tests whether a chart is saved again if its data changed or its
+        output file was changed.
+    3. Tests whether charts are always saved if unchanged charts are not
+        skipped.
+
+    Arguments:
+        input_df (DataFrame): Small dataframe of generic ridership data.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    chart = alt.Chart(input_df).mark_bar().encode(
+        x='AVG_RIDES:Q',
+        y='ROUTE:O')
+    changed_chart = alt.Chart(input_df.iloc[:2]).mark_bar().encode(
+        x='AVG_RIDES:Q',
+        y='ROUTE:O')
+
+    output_path = str(tmp_path / 'chart.json')
+    renderer = ChartRenderer()
+
+    assert renderer.save(chart=chart, output_path=output_path)
+    assert not renderer.save(chart=chart, output_path=output_path)
+    assert renderer.save(chart=changed_chart, output_path=output_path)
+
+    with open(output_path, 'w') as file:
+        file.write('{}')
+
+    assert renderer.save(chart=changed_chart, output_path=output_path)
+    assert ChartRenderer(
+        renderer_args=RendererArguments(skip_unchanged=False)).save(
+        chart=changed_chart,
+        output_path=output_path)
+
+
+def test_chart_renderer_save_value_exceptions(
+        input_df: pd.DataFrame,
+        tmp_path):
+    """
+    Tests the following:
+    1. Tests whether ValueErrors are raised if the output path is not in a
+        supported format.
+
+    Arguments:
+        input_df (DataFrame): Small dataframe of generic ridership data.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    chart = alt.Chart(input_df).mark_bar().encode(
+        x='AVG_RIDES:Q',
+        y='ROUTE:O')
+
+    with pytest.raises(ValueError):
+        ChartRenderer().save(
+            chart=chart,
+            output_path=str(tmp_path / 'chart.jpg'))
@@ -0,0 +1,164 @@
+"""
+Description: Tests for route lifecycle functions.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from route_lifecycle import (count_active_routes,
+                             create_route_lifecycle_index,
+                             get_route_service_gaps,
+                             get_routes_active_in_years)
+
+
+@pytest.mark.parametrize(
+    "df,id_cols,expected",
+    [('input_route_lifecycle_df',
+      ['ROUTE', 'DAY_TYPE'],
+      'expected_route_lifecycle_index')])
+def test_create_route_lifecycle_index(
+        df: pd.DataFrame,
+        id_cols: list[str],
+        expected: pd.DataFrame,
+        request):
+    """
+    Tests the following:
+    1. Whether consecutive months of service are combined into a single span
+        and gaps in service start a new span.
+
+    Arguments:
+        df (DataFrame): Pandas dataframe of ridership data.
+        id_cols (strList): The columns identifying each route.
+        expected (DataFrame): Dataframe with the expected spans of service.
+        request: A special fixture used to provide information regarding the
+            requesting test function. This is used to retrieve the value of
+            fixtures used in parameterized tests.
+
+    Returns:
+        NONE
+    """
+
+    df = request.getfixturevalue(df)
+    expected = request.getfixturevalue(expected)
+
+    test_df = create_route_lifecycle_index(df=df, id_cols=id_cols)
+
+    pd.testing.assert_frame_equal(test_df, expected)
+
+
+def test_create_route_lifecycle_index_type_exceptions(
+        input_route_count_df: pd.DataFrame):
+    """
+    Tests the following:
+    1. Tests whether a TypeError is raised if months are not numeric.
+
+    Arguments:
+        input_route_count_df (DataFrame): Pandas dataframe of ridership data
+            containing month names.
+
+    Returns:
+        NONE
+    """
+
+    with pytest.raises(TypeError):
+        create_route_lifecycle_index(
+            df=input_route_count_df,
+            id_cols=['ROUTE'])
+
+
+def test_count_active_routes(
+        input_route_lifecycle_df: pd.DataFrame,
+        expected_active_route_count_df: pd.DataFrame):
+    """
+    Tests the following:
+    1. Whether bus route counts by year are correctly calculated from a
+        route lifecycle index.
+
+    Arguments:
+        input_route_lifecycle_df (DataFrame): Pandas dataframe of ridership
+            data.
+        expected_active_route_count_df (DataFrame): Dataframe with the
+            expected number of routes in service each year.
+
+    Returns:
+        NONE
+    """
+
+    route_index = create_route_lifecycle_index(
+        df=input_route_lifecycle_df,
+        id_cols=['ROUTE', 'DAY_TYPE'])
+
+    test_df = count_active_routes(
+        route_index=route_index,
+        route_col='ROUTE',
+        count_col='COUNT')
+
+    pd.testing.assert_frame_equal(test_df, expected_active_route_count_df)
+
+
+@pytest.mark.parametrize(
+    "years,expected_routes",
+    [([2019, 2023], ['1']),
+     ([2019], ['1', '2']),
+     ([2020, 2023], [])])
+def test_get_routes_active_in_years(
+        input_route_lifecycle_df: pd.DataFrame,
+        years: list[int],
+        expected_routes: list[str]):
+    """
+    Tests the following:
+    1. Whether only routes in service in both years are returned.
+    2. Whether routes in service for part of a single year are returned.
+    3. Whether no routes are returned if none were in service in every year.
+
+    Arguments:
+        input_route_lifecycle_df (DataFrame): Pandas dataframe of ridership
+            data.
+        years (intList): The years in which routes must have been in service.
+        expected_routes (strList): The routes expected to be returned.
+
+    Returns:
+        NONE
+    """
+
+    route_index = create_route_lifecycle_index(
+        df=input_route_lifecycle_df,
+        id_cols=['ROUTE', 'DAY_TYPE'])
+
+    test_df = get_routes_active_in_years(
+        route_index=route_index,
+        id_cols=['ROUTE', 'DAY_TYPE'],
+        years=years)
+
+    assert list(test_df.columns) == ['ROUTE', 'DAY_TYPE']
+    assert list(test_df['ROUTE']) == expected_routes
+
+
+def test_get_route_service_gaps(
+        input_route_lifecycle_df: pd.DataFrame,
+        expected_route_service_gaps_df: pd.DataFrame):
+    """
+    Tests the following:
+    1. Whether gaps between spans of service for the same route are found,
+        including gaps spanning multiple years.
+
+    Arguments:
+        input_route_lifecycle_df (DataFrame): Pandas dataframe of ridership
+            data.
+        expected_route_service_gaps_df (DataFrame): Dataframe with the
+            expected gaps in service.
+
+    Returns:
+        NONE
+    """
+
+    route_index = create_route_lifecycle_index(
+        df=input_route_lifecycle_df,
+        id_cols=['ROUTE', 'DAY_TYPE'])
+
+    test_df = get_route_service_gaps(
+        route_index=route_index,
+        id_cols=['ROUTE', 'DAY_TYPE'])
+
+    pd.testing.assert_frame_equal(test_df, expected_route_service_gaps_df)
@@ -0,0 +1,113 @@
+"""
+Description: Tests for functions that create visualizations.
+"""
+
+import json
+
+import altair as alt
+import pandas as pd
+
+from constants import RendererArguments
+from rendering import configure_chart_renderer
+import visualizations
+from visualizations import create_linechart, create_shared_dataset
+
+
+def test_create_shared_dataset(input_df: pd.DataFrame, tmp_path):
+    """
+    Tests the following:
+    1. Tests whether the rows of every chart are saved once in one file.
+    2. Tests whether each chart is given a filter selecting its rows.
+    3. Tests whether charts whose rows cannot be selected by a filter, or
+        that repeat rows, are given None.
+
+    Arguments:
+        input_df (DataFrame): Small dataframe of generic ridership data.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    output_path = str(tmp_path / 'shared_data.json')
+    dfs = [input_df,
+           input_df[input_df['YEAR'] == 2022],
+           input_df.iloc[:1],
+           pd.concat([input_df.iloc[:1], input_df.iloc[:1]])]
+
+    shared_data = create_shared_dataset(
+        dfs=dfs,
+        columns=['ROUTE', 'AVG_RIDES'],
+        subset_cols=['YEAR'],
+        output_path=output_path)
+
+    with open(output_path) as file:
+        assert json.load(file) == (
+            input_df[['ROUTE', 'AVG_RIDES', 'YEAR']].to_dict(orient='records'))
+
+    assert shared_data[0]['url'] == 'shared_data.json'
+    assert shared_data[0]['filter'] == {
+        'and': [{'field': 'YEAR', 'oneOf': [2022, 2001]}]}
+    assert shared_data[1]['filter'] == {
+        'and': [{'field': 'YEAR', 'equal': 2022}]}
+    assert shared_data[0]['version'] == shared_data[1]['version']
+    assert shared_data[2] is None
+    assert shared_data[3] is None
+
+
+def test_create_linechart_templates(input_df: pd.DataFrame, tmp_path):
+    """
+    Tests the following:
+    1. Tests whether charts with the same settings are built from one
+        template keyed by the settings only.
+    2. Tests whether charts built from a template have the same data and
+        encodings as charts built by altair.
+
+    Arguments:
+        input_df (DataFrame): Small dataframe of generic ridership data.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    chart_args = {'x_value': 'YEAR',
+                  'y_value': 'AVG_RIDES',
+                  'color_values': 'ROUTE',
+                  'title': 'Ridership',
+                  'scheme': 'category20',
+                  'x_value_type': 'ordinal',
+                  'y_value_type': 'quantitative',
+                  'x_axis_title': 'Year',
+                  'y_axis_title': 'Average Rides',
+                  'color_title': 'Route'}
+    dfs = [input_df, input_df.iloc[:2]]
+    output_paths = [str(tmp_path / f'chart_{i}.json') for i in range(2)]
+
+    visualizations._chart_templates.clear()
+    configure_chart_renderer(RendererArguments(output_format='json'))
+    try:
+        for df, output_path in zip(dfs, output_paths):
+            create_linechart(data=df, output_path=output_path, **chart_args)
+    finally:
+        configure_chart_renderer()
+
+    assert len(visualizations._chart_templates) == 1
+    assert set(json.loads(next(iter(visualizations._chart_templates))[1])) \
+        == set(chart_args)
+
+    for df, output_path in zip(dfs, output_paths):
+        chart = alt.Chart(df[['ROUTE', 'YEAR', 'AVG_RIDES']]).mark_line(
+            point=True).encode(
+            x=alt.X('YEAR', type='ordinal', title='Year'),
+            y=alt.Y('AVG_RIDES', type='quantitative', title='Average Rides'),
+            color=alt.Color('ROUTE',
+                            title='Route',
+                            scale=alt.Scale(scheme='category20'))
+        ).properties(title='Ridership')
+        expected = chart.to_dict()
+        expected['data'] = {'values': next(iter(
+            expected.pop('datasets').values()))}
+
+        with open(output_path) as file:
+            assert json.load(file) == expected
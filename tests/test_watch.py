@@ -0,0 +1,142 @@
+"""
+Description: Tests for functions that rerun the analysis when the bus data
+changes.
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from constants import AnalysisConfig
+from watch import (get_file_mtimes,
+                   get_input_files,
+                   load_input_files,
+                   watch_analysis)
+
+
+@pytest.fixture
+def input_dir(input_route_lifecycle_df: pd.DataFrame, tmp_path) -> str:
+    """
+    Saves the route lifecycle test data as two CSV files in a directory.
+
+    Arguments:
+        input_route_lifecycle_df (DataFrame): Small dataframe of generic
+            ridership data.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        The absolute file path to the directory.
+    """
+
+    input_dir = tmp_path / 'input'
+    input_dir.mkdir()
+
+    input_route_lifecycle_df.iloc[:5].to_csv(
+        input_dir / 'ridership_a.csv', index=False)
+    input_route_lifecycle_df.iloc[5:9].to_csv(
+        input_dir / 'ridership_b.csv', index=False)
+    (input_dir / 'notes.txt').write_text('not bus data')
+
+    return str(input_dir)
+
+
+def test_get_input_files(input_dir: str):
+    """
+    Tests the following:
+    1. Tests whether every CSV file in a directory is found in order.
+    2. Tests whether a single file path is returned as is.
+
+    Arguments:
+        input_dir (str): Directory containing the test CSV files.
+
+    Returns:
+        NONE
+    """
+
+    csv_paths = [os.path.join(input_dir, 'ridership_a.csv'),
+                 os.path.join(input_dir, 'ridership_b.csv')]
+
+    assert get_input_files(input_path=input_dir) == csv_paths
+    assert get_input_files(input_path=csv_paths[1]) == csv_paths[1:]
+
+
+def test_get_input_files_file_not_found_exceptions(tmp_path):
+    """
+    Tests the following:
+    1. Tests whether FileNotFoundErrors are raised if the input path does
+        not exist.
+
+    Arguments:
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    with pytest.raises(FileNotFoundError):
+        get_input_files(input_path=str(tmp_path / 'missing.csv'))
+
+
+def test_load_input_files(
+        input_dir: str,
+        input_route_lifecycle_df: pd.DataFrame):
+    """
+    Tests the following:
+    1. Tests whether all files are combined into one dataframe.
+    2. Tests whether files that have not been modified are not read again.
+
+    Arguments:
+        input_dir (str): Directory containing the test CSV files.
+        input_route_lifecycle_df (DataFrame): Small dataframe of generic
+            ridership data.
+
+    Returns:
+        NONE
+    """
+
+    file_mtimes = get_file_mtimes(get_input_files(input_path=input_dir))
+    loaded_files = {}
+
+    bus_data = load_input_files(
+        file_mtimes=file_mtimes,
+        loaded_files=loaded_files)
+
+    assert list(bus_data.columns) == list(input_route_lifecycle_df.columns)
+    assert (bus_data['AVG_RIDES'].tolist()
+            == input_route_lifecycle_df['AVG_RIDES'].iloc[:9].tolist())
+
+    first_dfs = {path: df for path, (_, df) in loaded_files.items()}
+    load_input_files(file_mtimes=file_mtimes, loaded_files=loaded_files)
+
+    for path, (_, df) in loaded_files.items():
+        assert df is first_dfs[path]
+
+
+def test_watch_analysis(input_dir: str, tmp_path):
+    """
+    Tests the following:
+    1. Tests whether the analysis is run on the combined files of a watched
+        directory.
+
+    Arguments:
+        input_dir (str): Directory containing the test CSV files.
+        tmp_path (Path): Temporary directory provided by pytest.
+
+    Returns:
+        NONE
+    """
+
+    output_dir = tmp_path / 'output'
+    output_dir.mkdir()
+
+    watch_analysis(
+        input_path=input_dir,
+        output_dir=f'{output_dir}/',
+        config=AnalysisConfig(chart_families=['area']),
+        interval=0.01,
+        max_runs=1)
+
+    assert ([file_name for file_name in os.listdir(output_dir)
+             if not file_name.startswith('.')]
+            == ['route_count_1999_2023.png'])